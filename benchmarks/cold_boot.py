@@ -0,0 +1,31 @@
+# /mnt/home2/mud/benchmarks/cold_boot.py
+# Boots fresh interpreters eagerly and lazily and reports the median wall time of each.
+# Run from anywhere: python benchmarks/cold_boot.py [runs]
+
+from harness import ROOT, report
+import json
+import os
+import subprocess
+import sys
+
+STARTUP = os.path.join(ROOT, "systems", "startup.py")
+
+def main(runs: int = 3):
+    results = {}
+    for mode in ("eager", "lazy"):
+        times = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, STARTUP, "--boot", mode], cwd=ROOT,
+                                 capture_output=True, text=True, timeout=300)
+            if out.returncode != 0:
+                raise RuntimeError(f"{mode} boot failed: {out.stderr.strip()[-500:]}")
+            times.append(json.loads(out.stdout.strip().splitlines()[-1])["seconds"])
+        results[mode] = sorted(times)[len(times) // 2]
+    return report("cold boot", [
+        ("eager boot seconds", results["eager"]),
+        ("lazy boot seconds", results["lazy"]),
+        ("speedup", results["eager"] / results["lazy"] if results["lazy"] else 0.0),
+    ])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
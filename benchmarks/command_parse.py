@@ -0,0 +1,46 @@
+# /mnt/home2/mud/benchmarks/command_parse.py
+# Times verb resolution through the cached per-player table against rebuilding it for every command.
+# Run from anywhere: python benchmarks/command_parse.py [rounds]
+
+from harness import load_driver, load_plugin, report
+import sys
+import time
+
+COMMANDS = ["look", "n", "get sword", "l", "inventory", "sw", "drop sword", "say hello"]
+
+def build_room(mud):
+    room = mud.MudObject("bench_room", "Benchmark room")
+    player = mud.MudObject("bench_player", "tester")
+    player.location = room
+    for i in range(40):
+        room.add_action(f"verb{i}", lambda obj, caller, arg: "")
+    for verb in ("look", "get", "drop", "inventory", "say", "north", "southwest"):
+        room.add_action(verb, lambda obj, caller, arg: "")
+    return player
+
+def main(rounds: int = 1000):
+    mud = load_driver()
+    dispatcher = load_plugin("systems.command_dispatch").command_dispatcher
+    player = build_room(mud)
+    verbs = [command.split()[0] for command in COMMANDS]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for verb in verbs:
+            dispatcher.resolve(player, verb)
+    cached = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for verb in verbs:
+            table = dispatcher.tables[player]
+            table.own_dirty = table.local_dirty = True
+            dispatcher.resolve(player, verb)
+    rebuilt = time.perf_counter() - start
+    lookups = rounds * len(verbs)
+    return report("command parse", [
+        ("cached usec/command", cached * 1e6 / lookups),
+        ("rebuilt usec/command", rebuilt * 1e6 / lookups),
+        ("speedup", rebuilt / cached if cached else 0.0),
+    ])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,25 @@
+# /mnt/home2/mud/benchmarks/copyover_snapshot.py
+# Times the copyover world snapshot alone, for checking the stall budget without restarting.
+# Run from anywhere: python benchmarks/copyover_snapshot.py
+
+from harness import load_driver, load_plugin, report
+import pickle
+import time
+
+def main():
+    mud = load_driver()
+    copyover = load_plugin("systems.copyover").copyover
+    start = time.perf_counter()
+    image = copyover.snapshot([])
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(image)
+    return report("copyover snapshot", [
+        ("objects", float(len(mud.driver.objects))),
+        ("image bytes", float(len(image))),
+        ("snapshot msec", elapsed * 1000),
+        ("image load msec", (time.perf_counter() - start) * 1000),
+    ])
+
+if __name__ == "__main__":
+    main()
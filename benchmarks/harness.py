@@ -0,0 +1,56 @@
+# /mnt/home2/mud/benchmarks/harness.py
+# Imported to: the other benchmarks/*.py scripts
+# Imports from: driver.py
+
+from typing import Any, Iterable, List, Tuple
+import asyncio
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)  # Plugins import the driver relatively, so the tree loads as one package
+
+def load_driver() -> Any:
+    """Imports the driver from this tree as a package. The driver takes the running event loop as it's
+    built, so outside a coroutine it is imported on a fresh loop that then stays the current one."""
+    parent = os.path.dirname(ROOT)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+    os.chdir(ROOT)
+    name = f"{PACKAGE}.driver"
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+
+        async def load():
+            return importlib.import_module(name)
+
+        module = loop.run_until_complete(load())
+        asyncio.set_event_loop(loop)  # Under the event loop policy the driver installed on import
+        return module
+    return importlib.import_module(name)
+
+def load_plugin(name: str) -> Any:
+    """Loads one systems or efuns plugin, running its init, and returns the module. Inits that start
+    background tasks need a running loop, so outside a coroutine the load runs on the driver's loop."""
+    driver = load_driver().driver
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+
+        async def load():
+            return driver.load_plugin(name)
+
+        return asyncio.get_event_loop().run_until_complete(load())
+    return driver.load_plugin(name)
+
+def report(title: str, rows: Iterable[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    rows = list(rows)
+    print(title)
+    for label, value in rows:
+        print(f"  {label}: {value:.3f}" if isinstance(value, float) else f"  {label}: {value}")
+    return rows
@@ -0,0 +1,94 @@
+# /mnt/home2/mud/benchmarks/journal.py
+# Replays the crash cases the journal format must survive, then times delta saves against full rewrites.
+# Run from anywhere: python benchmarks/journal.py [size_bytes]
+
+from harness import load_plugin, report
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+def check_crash_safety(Journal):
+    results = []
+    scratch = tempfile.mkdtemp()
+    try:
+        journal = Journal(os.path.join(scratch, "player"))
+        state = {"attrs": {"hp": 10, "gp": 5}, "race": "human", "spells": {}}
+        journal.save(state)
+        state["attrs"]["hp"] = 7
+        journal.save(state)
+        with open(journal.log_path, "ab") as f:
+            f.write(b'{"set":[["attrs","hp",1')
+        results.append(("torn final record ignored", Journal(journal.path).load() == state))
+        results.append(("torn record truncated", open(journal.log_path, "rb").read().endswith(b"}\n")))
+        state["spells"]["missile"] = 3
+        del state["attrs"]["gp"]
+        journal.save(state)
+        journal.set_aside()
+        state["race"] = "dwarf"
+        journal.save(state)
+        results.append(("save while folding", Journal(journal.path).load() == state))
+        folded = Journal(journal.path)._snapshot()
+        with open(journal.path, "w") as f:
+            json.dump(folded, f)
+        results.append(("crash between snapshot and removal", Journal(journal.path).load() == state))
+        journal.fold()
+        results.append(("fold keeps the record", Journal(journal.path).load() == state))
+        journal.compact()
+        results.append(("compaction keeps the record", Journal(journal.path).load() == state))
+        state["race"] = "elf"
+        journal.save(state)
+        results.append(("delta after compaction", Journal(journal.path).load() == state))
+        state["spells"] = []
+        journal.save(state)
+        results.append(("dict field replaced", Journal(journal.path).load() == state))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return report("journal crash safety", results)
+
+def benchmark_save(Journal, size: int, rounds: int = 20):
+    items = max(1, size // 200)
+    state = {
+        "attrs": {f"attr_{i}": i for i in range(items // 10)},
+        "dynamic_load": {f"item_{i}": {"path": f"/obj/item_{i}", "data": "x" * 150} for i in range(items)},
+        "spells": {}, "version": "bench",
+    }
+    scratch = tempfile.mkdtemp()
+    try:
+        journal = Journal(os.path.join(scratch, "player"))
+        journal.save(state)
+        first = journal.appended
+        start = time.perf_counter()
+        for i in range(rounds):
+            state["attrs"]["attr_0"] = i
+            state["dynamic_load"][f"item_{i}"]["data"] = str(i)
+            journal.save(state)
+        delta = time.perf_counter() - start
+        written = journal.appended - first
+        start = time.perf_counter()
+        for i in range(rounds):
+            state["attrs"]["attr_0"] = -i
+            with open(journal.path + ".full", "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+        full = time.perf_counter() - start
+        full_bytes = os.path.getsize(journal.path + ".full")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return report("journal save", [
+        ("record bytes", float(full_bytes)),
+        ("full rewrite msec/save", full * 1000 / rounds),
+        ("delta msec/save", delta * 1000 / rounds),
+        ("delta bytes/save", written / rounds),
+        ("speedup", full / delta if delta else 0.0),
+    ])
+
+def main(size: int = 5 * 1024 * 1024):
+    Journal = load_plugin("systems.journal").Journal
+    return check_crash_safety(Journal) + benchmark_save(Journal, size)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 1024 * 1024)
@@ -0,0 +1,43 @@
+# /mnt/home2/mud/benchmarks/login_burst.py
+# Queues a burst of password checks at once and measures how late a probe task wakes meanwhile.
+# Run from anywhere: python benchmarks/login_burst.py [count]
+
+from harness import load_plugin, report
+import asyncio
+import sys
+import time
+
+async def run(count: int, probe: float):
+    login = load_plugin("systems.login_handler")
+    stored = login.hash_password("benchmark")
+    lags = []
+    running = True
+
+    async def probe_loop():
+        loop = asyncio.get_running_loop()
+        while running:
+            start = loop.time()
+            await asyncio.sleep(probe)
+            lags.append(loop.time() - start - probe)
+
+    prober = asyncio.create_task(probe_loop())
+    start = time.perf_counter()
+    queue = login.login_handler.queue
+    await asyncio.gather(*(queue.submit(login.PRIORITY_LOGIN, login.verify_password, "benchmark", stored)
+                           for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await prober
+    lags.sort()
+    return report("login burst", [
+        ("logins", float(count)),
+        ("seconds", elapsed),
+        ("median loop lag msec", lags[len(lags) // 2] * 1000 if lags else 0.0),
+        ("worst loop lag msec", lags[-1] * 1000 if lags else 0.0),
+    ])
+
+def main(count: int = 1000, probe: float = 0.01):
+    return asyncio.run(run(count, probe))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
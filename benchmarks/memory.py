@@ -0,0 +1,64 @@
+# /mnt/home2/mud/benchmarks/memory.py
+# Reports average bytes per instance for the core object layouts and the slotted hot records,
+# and bytes per clone for a few everyday item blueprints.
+# Run from anywhere: python benchmarks/memory.py [count]
+
+from harness import load_driver, load_plugin, report
+import sys
+import tracemalloc
+
+RECORDS = [("systems.tactics", "Tactics", ()), ("systems.living", "living_data", ()),
+           ("systems.taskmaster", "tasker_result", (0, 0, 0))]
+BLUEPRINTS = [("coin", "gold coin", "coins"), ("arrow", "arrow", "arrows"), ("bread", "loaf of bread", "loaves")]
+
+def clone_memory(mud, blueprint, count: int) -> int:
+    """Returns the average bytes allocated per clone of blueprint."""
+    before = tracemalloc.get_traced_memory()[0]
+    clones = [blueprint.clone() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    for clone in clones:
+        mud.driver.objects.pop(clone.oid, None)
+    return used // max(1, count)
+
+def clone_memory_report(mud, count: int) -> list:
+    """Reports bytes per clone for the everyday item blueprints."""
+    module = load_plugin("systems.object")
+    if module is None:
+        return []  # Its load failure is already logged
+    rows = []
+    for name, short, plural in BLUEPRINTS:
+        blueprint = module.Object(f"/obj/{name}", name)
+        blueprint.short_d = short
+        blueprint.plural_d = plural
+        blueprint.id_handler.set_name(name)
+        blueprint.id_handler.add_plural(plural)
+        rows.append((f"{name} bytes per clone", clone_memory(mud, blueprint, count)))
+    return rows
+
+def main(count: int = 100000):
+    mud = load_driver()
+    samples = [
+        ("MudObject", lambda i: mud.MudObject(f"bench_{i}", "thing")),
+        ("Player", lambda i: mud.Player(None)),
+    ]
+    for module_name, class_name, args in RECORDS:
+        module = load_plugin(module_name)
+        if module is None:
+            continue  # Its load failure is already logged
+        cls = getattr(module, class_name)
+        samples.append((class_name, lambda i, cls=cls, args=args: cls(*args)))
+    rows = []
+    tracemalloc.start()
+    try:
+        for label, make in samples:
+            before = tracemalloc.get_traced_memory()[0]
+            live = [make(i) for i in range(count)]
+            rows.append((f"{label} bytes", (tracemalloc.get_traced_memory()[0] - before) // count))
+            del live
+        rows.extend(clone_memory_report(mud, min(count, 1000)))
+    finally:
+        tracemalloc.stop()
+    return report("memory per instance", rows)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,52 @@
+# /mnt/home2/mud/benchmarks/render.py
+# Times rendering one message per recipient from option snapshots against compiling their options every time.
+# Run from anywhere: python benchmarks/render.py [recipients]
+
+from harness import load_driver, load_plugin, report
+import sys
+import time
+
+MESSAGE = "%^BOLD%^%^SAY%^Tester says: %^RESET%^the orc is %^RED%^behind%^RESET%^ you."
+TERMINALS = ["ansi", "xterm", "dumb"]
+
+def build_players(mud, count: int):
+    players = []
+    for i in range(count):
+        player = mud.Player(None)
+        player.attrs = {"term_type": TERMINALS[i % len(TERMINALS)],
+                        "colours": {"say": "bold green"} if i % 4 == 0 else {}}
+        players.append(player)
+    return players
+
+def main(count: int = 200, rounds: int = 100, event: str = "say"):
+    mud = load_driver()
+    options = load_plugin("systems.options").options_handler
+    recipients = build_players(mud, count)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for player in recipients:
+            snapshot = options.snapshot(player)
+            if not snapshot.earmuffed(event):
+                snapshot.render(MESSAGE)
+    cached = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for player in recipients:
+            options.interned.pop(options.snapshot(player).key, None)
+            snapshot = options.compile(player)
+            if not snapshot.earmuffed(event):
+                snapshot.render(MESSAGE)
+    compiled = time.perf_counter() - start
+    for player in recipients:
+        options.recompile(player)
+    renders = max(1, rounds * len(recipients))
+    return report("option rendering", [
+        ("recipients", float(len(recipients))),
+        ("distinct snapshots", float(len({options.snapshot(player).key for player in recipients}))),
+        ("snapshot usec/recipient", cached * 1e6 / renders),
+        ("compiled usec/recipient", compiled * 1e6 / renders),
+        ("speedup", compiled / cached if cached else 0.0),
+    ])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
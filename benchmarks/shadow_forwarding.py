@@ -0,0 +1,47 @@
+# /mnt/home2/mud/benchmarks/shadow_forwarding.py
+# Times a shadowed method call through the compiled chain against per-call override introspection.
+# Run from anywhere: python benchmarks/shadow_forwarding.py [rounds]
+
+from harness import load_driver, load_plugin, report
+import asyncio
+import sys
+import time
+
+async def run(rounds: int):
+    mud = load_driver()
+    shadow_module = load_plugin("systems.shadow")
+    handler = shadow_module.shadow_handler
+    obj = mud.MudObject("shadow_bench", "bench")
+    shadow = shadow_module.Shadow("shadow_bench_shadow")
+    shadow.override_method("query_name", lambda target: target.name)
+    overrides = shadow.overrides
+    handler.attach(obj, shadow)
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            obj.query_name()
+        installed = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await handler.call(obj, "query_name")
+        compiled = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            if "query_name" in overrides:
+                func = overrides["query_name"]
+                await func(obj) if asyncio.iscoroutinefunction(func) else func(obj)
+        introspected = time.perf_counter() - start
+    finally:
+        handler.detach(obj, shadow)
+    return report("shadow forwarding", [
+        ("installed usec/call", installed * 1e6 / rounds),
+        ("handler usec/call", compiled * 1e6 / rounds),
+        ("introspected usec/call", introspected * 1e6 / rounds),
+        ("speedup", introspected / installed if installed else 0.0),
+    ])
+
+def main(rounds: int = 100000):
+    return asyncio.run(run(rounds))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,77 @@
+# /mnt/home2/mud/benchmarks/telnet.py
+# Fuzzes the telnet parser with randomly split streams, then measures parse and MCCP2 encode throughput.
+# Run from anywhere: python benchmarks/telnet.py [megabytes]
+
+from harness import load_plugin, report
+import random
+import sys
+import time
+
+def fuzz(t, rounds: int = 500, seed: int = 0):
+    rng = random.Random(seed)
+    pieces = [b"look\r\n", b"say hi", b"\n", t.IAC_BYTE * 2, t.negotiate(t.DO, t.MCCP2), t.negotiate(t.WILL, t.NAWS),
+              t.subnegotiate(t.NAWS, bytes((0, 120, 0, 40))), t.subnegotiate(t.GMCP, b'Core.Hello {"client": "x"}'),
+              bytes((t.IAC, t.SB, t.TTYPE, t.TTYPE_IS)) + b"MUDLET" + bytes((t.IAC, t.SE)), bytes((t.IAC, t.NOP)),
+              t.subnegotiate(t.MSDP, t.encode_msdp({"HEALTH": 10, "LIST": [1, 2], "T": {"a": "b"}})),
+              bytes((t.IAC, t.SB, t.GMCP)) + b"broken", bytes((t.IAC,)), b"\xc3\xa9\r\n", b"\x00\x01\xfe"]
+    mismatches = 0
+    errors = 0
+    for _ in range(rounds):
+        stream = b"".join(rng.choice(pieces) for _ in range(rng.randint(1, 40)))
+        if rng.random() < 0.3:
+            stream += bytes(rng.getrandbits(8) for _ in range(rng.randint(1, 64)))
+        try:
+            whole = t.TelnetParser().feed(stream)
+            parser = t.TelnetParser()
+            split = []
+            pos = 0
+            while pos < len(stream):
+                step = rng.randint(1, 17)
+                split += parser.feed(memoryview(stream)[pos:pos + step])
+                pos += step
+            if split != whole:
+                mismatches += 1
+            session = t.TelnetSession()
+            session.feed(stream)
+            session.wire(session.encode_text("ok\n"))
+        except Exception:
+            errors += 1
+    for value in [{"A": "1"}, {"A": ["1", "2"], "B": {"C": "3"}}, {"EMPTY": ""}]:
+        if t.decode_msdp(t.encode_msdp(value)) != value:
+            mismatches += 1
+    return report("telnet fuzz", [("rounds", rounds), ("split mismatches", mismatches), ("exceptions", errors)])
+
+def throughput(t, megabytes: int):
+    chunk = (b"kill the orc with my sword\r\n" * 40 + t.negotiate(t.DO, t.NAWS)
+             + t.subnegotiate(t.NAWS, bytes((0, 80, 0, 24)))) * 4
+    reads = [chunk[i:i + 1024] for i in range(0, len(chunk), 1024)]
+    total = megabytes * 1024 * 1024
+    parser = t.TelnetParser()
+    done = 0
+    start = time.perf_counter()
+    while done < total:
+        for read in reads:
+            parser.feed(read)
+        done += len(chunk)
+    parsed = time.perf_counter() - start
+    session = t.TelnetSession(offer=False)
+    session.start_compression()
+    payload = session.encode_text("The orc swings its club at you but misses.\n" * 20)
+    done = 0
+    start = time.perf_counter()
+    while done < total:
+        session.wire(payload)
+        done += len(payload)
+    encoded = time.perf_counter() - start
+    return report("telnet throughput", [
+        ("parse MB/s", megabytes / parsed if parsed else 0.0),
+        ("encode+mccp2 MB/s", megabytes / encoded if encoded else 0.0),
+        ("mccp2 ratio", session.bytes_out / session.raw_out if session.raw_out else 0.0),
+    ])
+
+def main(megabytes: int = 16):
+    t = load_plugin("systems.telnet")
+    return fuzz(t) + throughput(t, megabytes)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
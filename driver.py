@@ -1,11 +1,10 @@
 # /mnt/home2/mud/driver.py
 import asyncio
 import telnetlib3
-import zlib
 import json
 import logging
 import sqlite3
-from typing import Dict, Callable, Any, Optional
+from typing import Dict, Callable, Any, List, Optional, Tuple
 from websockets.server import serve
 import aiohttp
 from ssl import create_default_context
@@ -21,6 +20,8 @@ from heapq import heappush, heappop
 import time
 import redis  # For clustering
 import hashlib
+import itertools
+from collections import deque
 
 # Use uvloop for faster event loop
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -39,9 +40,118 @@ logger = logging.getLogger("PyMudDriver")
 
 # Call stack for this_object(), previous_object()
 call_stack = []
+clone_ids = itertools.count(1)
+MISSING = object()
+
+class PromotedAttrs(dict):
+    """An attrs dict whose hot keys are stored in same-named slots on the owner."""
+    __slots__ = ("owner", "promoted")
+
+    def __init__(self, owner: Any, promoted: Tuple[str, ...], data: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.owner = owner
+        self.promoted = frozenset(promoted)
+        if data:
+            self.update(data)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.promoted:
+            value = getattr(self.owner, key, MISSING)
+            if value is MISSING:
+                raise KeyError(key)
+            return value
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.promoted:
+            setattr(self.owner, key, value)
+        else:
+            dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str):
+        if key in self.promoted:
+            if getattr(self.owner, key, MISSING) is MISSING:
+                raise KeyError(key)
+            delattr(self.owner, key)
+        else:
+            dict.__delitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.promoted:
+            return getattr(self.owner, key, MISSING) is not MISSING
+        return dict.__contains__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.promoted:
+            value = getattr(self.owner, key, MISSING)
+            return default if value is MISSING else value
+        return dict.get(self, key, default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self.promoted:
+            value = self.get(key, MISSING)
+            if value is MISSING:
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            delattr(self.owner, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def update(self, other: Any = (), **kwargs: Any):
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def _promoted_items(self) -> List[Tuple[str, Any]]:
+        return [(key, value) for key in self.promoted
+                if (value := getattr(self.owner, key, MISSING)) is not MISSING]
+
+    def items(self):
+        return list(dict.items(self)) + self._promoted_items()
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._promoted_items())
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.copy() == (other.copy() if isinstance(other, PromotedAttrs) else other)
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Promoted values travel in the owner's slots, so only the plain keys go with the dict
+        return (PromotedAttrs, (self.owner, tuple(self.promoted), dict(dict.items(self))))
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
 
 # Base MUD Object
 class MudObject:
+    # Core fields live in slots; __dict__ is only allocated once something else is set
+    __slots__ = ("oid", "name", "actions", "attrs", "location", "euid", "shared_actions", "__dict__", "__weakref__")
+
     def __init__(self, oid: str, name: str, euid: str = "root"):
         self.oid = oid
         self.name = name
@@ -49,16 +159,29 @@ class MudObject:
         self.attrs: Dict[str, Any] = {}
         self.location: Optional["MudObject"] = None
         self.euid = euid
+        self.shared_actions = False  # True while actions is still the blueprint's dict
 
     def add_action(self, verb: str, func: Callable):
+        if self.shared_actions:
+            self.actions = dict(self.actions)
+            self.shared_actions = False
         self.actions[verb] = func
+        dispatcher = driver.handler("command_dispatcher", load=False)
+        if dispatcher is not None:
+            dispatcher.source_changed(self)
 
     async def call(self, verb: str, caller: "Player", arg: str = None) -> str:
         global call_stack
         call_stack.append(self)
         try:
-            if verb in self.actions:
-                return await self.actions[verb](self, caller, arg)
+            func = self.actions.get(verb) or driver.actions_for(self).get(verb)
+            if self.__dict__.get("shadow") is not None:  # Shadowed verbs and methods reach the outermost shadow
+                if func:
+                    func = driver.shadow_handler.resolve_action(self, func)
+                elif verb in driver.shadow_handler.chains[self].table:
+                    return await driver.shadow_handler.call(self, verb, caller, arg)
+            if func:
+                return await func(self, caller, arg)
             return await driver.notify_fail(caller, f"{verb} not recognized.")
         finally:
             call_stack.pop()
@@ -70,9 +193,10 @@ class MudObject:
         return self.attrs.get(key, default)
 
     def clone(self) -> "MudObject":
-        new_oid = f"{self.oid}_clone_{id(self)}"
+        new_oid = f"{self.oid}_clone_{next(clone_ids)}"
         clone = MudObject(new_oid, self.name, self.euid)
-        clone.actions = self.actions.copy()
+        clone.actions = self.actions  # Shared until either side calls add_action
+        clone.shared_actions = self.shared_actions = True
         clone.attrs = self.attrs.copy()
         driver.objects[new_oid] = clone
         return clone
@@ -80,10 +204,24 @@ class MudObject:
     def destruct(self):
         if self.oid in driver.objects:
             del driver.objects[self.oid]
+            # Only plugins already running can hold anything for this object, so nothing is loaded here
+            containment, expiry, lighting = (driver.handler(name, load=False) for name in ("containment", "expiry", "lighting"))
+            if containment is not None:
+                containment.forget(self)
+            if expiry is not None:
+                expiry.cancel_owner(self)
+            if hasattr(self, "forget_effects"):
+                self.forget_effects()
+            if lighting is not None:
+                lighting.forget(self)
             driver.save_object(self)
 
 # Player Class
 class Player:
+    __slots__ = ("writer", "protocol", "location", "compress", "gmcp_enabled", "msdp_enabled", "atcp_enabled",
+                 "msdp_data", "ip_address", "last_active", "pk_flagged", "telnet", "input_lines", "msdp_reported",
+                 "__dict__", "__weakref__")
+
     def __init__(self, writer, protocol: str = "telnet"):
         self.writer = writer
         self.protocol = protocol
@@ -96,35 +234,78 @@ class Player:
         self.ip_address = None
         self.last_active = time.time()
         self.pk_flagged = False
+        self.telnet = None  # TelnetSession once the telnet plugin is loaded
+        self.input_lines = deque()  # Complete lines read but not yet handled
+        self.msdp_reported = set()  # MSDP variables the client asked to have reported
+
+    def sync_telnet(self):
+        """Mirrors negotiated options onto the player and writes any negotiation replies."""
+        session = self.telnet
+        self.compress = session.compressing
+        self.gmcp_enabled = session.gmcp
+        self.msdp_enabled = session.msdp
+        self.atcp_enabled = session.atcp
+        out = session.wire()
+        if out:
+            self.writer.write(out)
+
+    def receive_msdp(self, variables: Dict):
+        for name in ("REPORT", "UNREPORT"):
+            requested = variables.get(name, [])
+            for var in requested if isinstance(requested, list) else [requested]:
+                if name == "REPORT":
+                    self.msdp_reported.add(var)
+                else:
+                    self.msdp_reported.discard(var)
+
+    async def read_line(self) -> Optional[str]:
+        """Returns the next input line, or None once the connection has closed."""
+        if self.protocol != "telnet":
+            return await self.writer.recv()
+        while not self.input_lines:
+            data = await self.writer.read(4096)
+            if not data:
+                return None
+            if self.telnet is None:
+                return data.decode("utf-8", "replace").strip()
+            for event in self.telnet.feed(data):
+                if event[0] == "line":
+                    self.input_lines.append(event[1])
+                elif event[0] == "msdp":
+                    self.receive_msdp(event[1])
+            self.sync_telnet()
+            await self.writer.drain()
+        return self.input_lines.popleft()
 
     async def send(self, msg: str):
-        data = f"\033[38;2;255;255;255m{msg}\033[0m".encode("utf-8")  # RGB colors
-        if self.compress:
-            data = zlib.compress(data)
+        options = driver.handler("options_handler") if "%^" in msg else None
+        if options is not None:
+            msg = options.snapshot(self).render(msg)  # Colour codes as this player's options have them
+        text = f"\033[38;2;255;255;255m{msg}\033[0m"  # RGB colors
         if self.protocol == "telnet":
-            self.writer.write(data + b"\r\n")
-            await self.writer.drain()
+            if self.telnet:
+                self.writer.write(self.telnet.wire(self.telnet.encode_text(text + "\n")))
+            else:
+                self.writer.write(text.encode("utf-8") + b"\r\n")
+            sessions = driver.handler("sessions", load=False)
+            if sessions is not None and self in sessions.sessions:
+                sessions.wake(self)  # The session's writer stage drains, so a slow client can't stall the caller
+            else:
+                await self.writer.drain()
         elif self.protocol == "websocket":
             await self.writer.send(msg)
-        if self.gmcp_enabled:
-            await self.send_gmcp({"event": "output", "message": msg})
-        if self.msdp_enabled:
-            self.msdp_data["last_message"] = msg
-            await self.send_msdp(self.msdp_data)
-        if self.atcp_enabled:
-            await self.send_atcp({"message": msg})
-
-    async def send_gmcp(self, data: Dict):
-        if self.gmcp_enabled:
-            await self.writer.write(f"\xff\xfa\x90{json.dumps(data)}\xff\xf0".encode())
+
+    async def send_gmcp(self, data: Dict, package: str = "Core.Output"):
+        if self.gmcp_enabled and self.telnet:
+            self.writer.write(self.telnet.wire(self.telnet.gmcp_frame(package, data)))
 
     async def send_msdp(self, data: Dict):
-        if self.msdp_enabled:
-            await self.writer.write(f"\xff\xfa\x69{json.dumps(data)}\xff\xf0".encode())
+        if self.msdp_enabled and self.telnet:
+            self.writer.write(self.telnet.wire(self.telnet.msdp_frame(data)))
 
-    async def send_atcp(self, data: Dict):
-        if self.atcp_enabled:
-            await self.writer.write(f"\xff\xfa\xc8{json.dumps(data)}\xff\xf0".encode())
+    async def send_atcp(self, data: Dict, package: str = "Core.Output"):
+        if self.atcp_enabled and self.telnet:
+            self.writer.write(self.telnet.wire(self.telnet.atcp_frame(package, data)))
 
     async def prompt(self):
         await self.send("> ")
@@ -143,9 +324,31 @@ class PyMudDriver:
         self.redis = redis.Redis(host='localhost', port=6379, db=0)  # Clustering
         self.last_verb = None
         self.start_time = time.time()
+        self.declared_actions: Dict[str, Tuple[Callable, Any]] = {}  # {verb: (func, class or classes it applies to)}
+        self.class_actions: Dict[type, Dict[str, Callable]] = {}  # {class: declared actions that apply to it}
         self.init_db()
+        # Plugins import the driver relatively, so they load under the same package as this module
+        self.startup = importlib.import_module(f"{__package__}.systems.startup" if __package__ else "systems.startup").Startup(self)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes nothing has set yet: the plugin that sets it is imported on first use.
+        # A plugin that fails to load is logged by startup and reads as a missing attribute.
+        startup = self.__dict__.get("startup")
+        if startup is None or name.startswith("_") or not startup.load_provider(name):
+            raise AttributeError(name)
+        return self.__dict__[name]
+
+    def handler(self, name: str, load: bool = True) -> Any:
+        """Returns the plugin attribute driver.<name>, or None if its plugin is missing or broken.
+        With load=False a plugin that hasn't loaded yet isn't loaded for this, e.g. when forgetting state."""
+        found = self.__dict__.get(name)
+        if found is None and load and self.startup.load_provider(name):
+            found = self.__dict__[name]
+        return found
+
     def load_plugins(self):
-        for plugin in [
+        """Boots the plugin graph: plugins that run loops load now, the rest when first used."""
+        self.startup.boot([
             "systems.combat", "systems.skills_handler", "systems.tactics", "systems.inventory_handler",
             "systems.soul_handler", "systems.term_handler", "systems.network_handler", "systems.quests_handler",
             "systems.crafting_handler", "systems.zones", "systems.living", "systems.parser",
@@ -153,8 +356,24 @@ class PyMudDriver:
             "systems.terrain_handler", "systems.login_handler", "systems.ritual_handler", "systems.spell_handler",
             "efuns.core", "efuns.network", "efuns.parser", "efuns.communication", "efuns.combat",
             "efuns.skills", "efuns.tools"
-        ]:
-        self.load_plugin(plugin)
+        ] + [name for name, info in self.startup.plugins.items() if info.eager])
+
+    def declare_action(self, verb: str, func: Callable, applies: Any = None):
+        """Gives verb to every object of the class(es) in applies, or to all objects if None,
+        without visiting them; an action added to one object still takes precedence."""
+        self.declared_actions[verb] = (func, applies)
+        self.class_actions.clear()
+        if "command_dispatcher" in self.__dict__:
+            self.command_dispatcher.invalidate()
+
+    def actions_for(self, obj: Any) -> Dict[str, Callable]:
+        """Returns the declared actions that apply to obj, worked out once per class."""
+        cls = type(obj)
+        found = self.class_actions.get(cls)
+        if found is None:
+            found = self.class_actions[cls] = {verb: func for verb, (func, applies) in self.declared_actions.items()
+                                               if applies is None or issubclass(cls, applies)}
+        return found
 
     def init_db(self):
         self.db.execute("CREATE TABLE IF NOT EXISTS objects (oid TEXT PRIMARY KEY, data TEXT)")
@@ -240,7 +459,12 @@ class PyMudDriver:
         player = Player(writer, "telnet")
         self.players[writer] = player
         player.ip_address = writer.transport.get_extra_info('peername')[0]
-        writer.write(b"\xff\xfb\x01\xff\xfb\x03\033[1z<MXP>\xff\xfb\x5a\xff\xfb\xc9\xff\xfb\x90\xff\xfb\xc8")
+        telnet = self.handler("telnet")
+        if telnet is not None:
+            player.telnet = telnet.session()  # Offers MCCP2, GMCP, MSDP, ATCP, CHARSET and asks for NAWS, TTYPE
+            writer.write(player.telnet.wire() + b"\033[1z<MXP>")
+        else:
+            writer.write(b"\xff\xfb\x03\033[1z<MXP>")
         await writer.drain()
         await self.handle_login(player)
 
@@ -250,49 +474,74 @@ class PyMudDriver:
         player.ip_address = websocket.remote_address[0]
         await self.handle_login(player)
 
+    async def send_intro(self, player: Player):
+        """Paces the arrival text with one task rather than a call_out per line."""
+        for line in ("A portal shimmers before you...", "You emerge as a spirit in the Ethereal Veil...",
+                     "Choose your path [race/class]..."):
+            await asyncio.sleep(5)
+            if player.writer not in self.players:
+                return
+            await player.send(line)
+
     async def handle_login(self, player: Player):
-        await player.send("Welcome to the Realms, traveler, under the gaze of Mystra...")
-        await self.call_out(5, player.send, "A portal shimmers before you...")
-        await self.call_out(10, player.send, "You emerge as a spirit in the Ethereal Veil...")
-        await self.call_out(15, player.send, "Choose your path [race/class]...")
-        player.location = self.objects["ethereal_veil_start"]
-        await player.send(await player.location.call("look", player))
+        login_handler = self.handler("login_handler")
+        if login_handler is not None:
+            # Name, password and character creation, throttled per address and hashed off the loop
+            if not await login_handler.handle_login(player):
+                await self.disconnect(player)
+                return
+        else:
+            await player.send("Welcome to the Realms, traveler, under the gaze of Mystra...")
+            asyncio.create_task(self.send_intro(player))
+            player.location = self.objects["ethereal_veil_start"]
+            await player.send(await player.location.call("look", player))
+        await self.play(player)
+
+    async def play(self, player: Player):
+        """Runs a logged-in player's commands until the connection closes."""
         await player.prompt()
-
+        sessions = self.handler("sessions")
+        if sessions is not None:
+            # Reading, execution and output run as separate stages with a bounded, rate limited queue
+            await sessions.run(player)
+            await self.disconnect(player)
+            return
         while True:
             try:
-                if player.protocol == "telnet":
-                    data = await player.writer.read(1024)
-                    if not data:
-                        break
-                    if data.startswith(telnetlib3.IAC):
-                        if data[1:3] == telnetlib3.DO + b"\x5a":
-                            player.compress = True
-                        elif data[1:3] == telnetlib3.DO + b"\xc9":
-                            player.msdp_enabled = True
-                        elif data[1:3] == telnetlib3.DO + b"\x90":
-                            player.gmcp_enabled = True
-                        elif data[1:3] == telnetlib3.DO + b"\xc8":
-                            player.atcp_enabled = True
-                        continue
-                    cmd = data.decode("utf-8").strip().split()
-                else:
-                    message = await player.writer.recv()
-                    cmd = message.strip().split()
-
-                if cmd:
-                    self.last_verb, *args = cmd
-                    arg = " ".join(args) if args else None
-                    response = await player.location.call(self.last_verb, player, arg)
-                    await player.send(response)
+                line = await player.read_line()
+                if line is None:
+                    break
+                if line.strip():
+                    await self.execute(player, line)
                 await player.prompt()
             except Exception as e:
                 logger.error(f"Client error: {e}")
                 break
+        await self.disconnect(player)
+
+    async def execute(self, player: Player, line: str):
+        """Runs one command line for player and sends the response."""
+        cmd = line.strip().split()
+        if not cmd:
+            return
+        self.last_verb, *args = cmd
+        arg = " ".join(args) if args else None
+        dispatcher = self.handler("command_dispatcher")
+        if dispatcher is not None:
+            response = await dispatcher.dispatch(player, self.last_verb, arg)
+        else:
+            response = await player.location.call(self.last_verb, player, arg)
+        await player.send(response)
+
+    async def disconnect(self, player: Player):
         if player.protocol == "telnet":
             player.writer.close()
             await player.writer.wait_closed()
-        del self.players[player.writer]
+        self.players.pop(player.writer, None)
+        for name in ("command_dispatcher", "oob", "options_handler"):
+            found = self.handler(name, load=False)  # Nothing to forget in a plugin that never loaded
+            if found is not None:
+                found.forget(player)
 
     async def rest_api(self):
         async with aiohttp.web.Application() as app:
@@ -305,10 +554,7 @@ class PyMudDriver:
             await site.start()
 
     def load_plugin(self, module_name: str):
-        module = importlib.import_module(module_name)
-        self.plugins[module_name] = module
-        if hasattr(module, "init"):
-            module.init(self)
+        return self.startup.load(module_name)
 
     async def profile(self, func: Callable, *args):
         profiler = cProfile.Profile()
@@ -323,19 +569,22 @@ class PyMudDriver:
         self.load_object("ethereal_veil_start", MudObject, "Ethereal Veil Start")
         self.objects["ethereal_veil_start"].add_action("look", lambda obj, caller, arg: "A misty expanse under Mystra's gaze...")
 
-        # Initialize weather and events
-        await importlib.import_module("systems.weather").init(self)
-        await importlib.import_module("systems.events").init(self)
-
-        # SSL Context
-        ssl_context = create_default_context()
-        ssl_context.load_cert_chain("cert.pem", "key.pem")
+        # Initialize weather and events, then the plugins that run from boot; the rest load on first use
+        self.load_plugin("systems.weather")
+        self.load_plugin("systems.events")
+        self.load_plugin("systems.copyover")
+        self.load_plugins()
+        resumed = None
+        if os.environ.get("MUD_COPYOVER"):
+            # Started by a copyover: take over the old process's sockets and world before listening
+            resumed = await self.copyover.receive()
 
         # Servers
-        telnet_server = await telnetlib3.create_server(self.telnet_handler, port=4000, host="::", ssl=ssl_context)
-        ws_server = await serve(self.websocket_handler, "::", 4001, ssl=ssl_context)
+        await self.listen(resumed.listeners if resumed else None)
         rest_task = self.loop.create_task(self.rest_api())
         heartbeat_task = self.loop.create_task(self.heartbeat())
+        if resumed:
+            await self.copyover.resume(resumed)
 
         # Crash Recovery
         def handle_signal(sig, frame):
@@ -343,9 +592,30 @@ class PyMudDriver:
             self.db.commit()
             asyncio.get_event_loop().stop()
         signal.signal(signal.SIGINT, handle_signal)
+        self.loop.add_signal_handler(signal.SIGUSR2, lambda: self.loop.create_task(self.copyover.copyover()))
+
+        logger.info("PyMudDriver running: Telnet@4000 (TLS), Telnet@4002, WS@4001, REST@8080")
+        await asyncio.gather(self.servers["telnet"].serve_forever(), self.servers["plain"].serve_forever(),
+                             self.servers["websocket"], rest_task, heartbeat_task)
 
-        logger.info("PyMudDriver running: Telnet@4000, WS@4001, REST@8080")
-        await asyncio.gather(telnet_server.serve_forever(), ws_server, rest_task, heartbeat_task)
+    async def listen(self, sockets: Optional[Dict[str, Any]] = None):
+        """Starts the telnet and websocket servers, on sockets handed over by a copyover if given."""
+        ssl_context = create_default_context()
+        ssl_context.load_cert_chain("cert.pem", "key.pem")
+        if sockets:
+            telnet_server = await telnetlib3.create_server(self.telnet_handler, host=None, port=None,
+                                                           sock=sockets["telnet"], ssl=ssl_context)
+            if "plain" in sockets:
+                plain_server = await telnetlib3.create_server(self.telnet_handler, host=None, port=None, sock=sockets["plain"])
+            else:
+                plain_server = await telnetlib3.create_server(self.telnet_handler, port=4002, host="::")
+            ws_server = await serve(self.websocket_handler, sock=sockets["websocket"], ssl=ssl_context)
+        else:
+            telnet_server = await telnetlib3.create_server(self.telnet_handler, port=4000, host="::", ssl=ssl_context)
+            # Plain telnet for clients without TLS; these are the connections a copyover carries across
+            plain_server = await telnetlib3.create_server(self.telnet_handler, port=4002, host="::")
+            ws_server = await serve(self.websocket_handler, "::", 4001, ssl=ssl_context)
+        self.servers = {"telnet": telnet_server, "plain": plain_server, "websocket": ws_server}
 
 # Global driver instance
 driver = PyMudDriver()
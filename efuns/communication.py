@@ -33,10 +33,12 @@ async def tell(player: Player, target: str, msg: str):
     if not target_obj:
         await player.send(f"No one named {target} is online.")
         return
-    await target_obj.send(f"{player.name} tells you: {msg}")
+    if not await driver.options_handler.tell_players([target_obj], f"%^TELL%^{player.name} tells you: {msg}%^RESET%^", "tell", player):
+        await player.send(f"{target_obj.name} has earmuffs on for tells.")
+        return
     await player.send(f"You tell {target}: {msg}")
 
 async def shout(player: Player, msg: str):
     """Shout a message to all players."""
-    for p in driver.players.values():
-        await p.send(f"{player.name} shouts: {msg}")
+    await driver.options_handler.tell_players(list(driver.players.values()), f"%^SHOUT%^{player.name} shouts: {msg}%^RESET%^",
+                                              "shout", player)
@@ -16,14 +16,11 @@ def add_action(obj: MudObject, verb: str, func: Callable):
 
 def move_object(obj: MudObject, destination: Optional[MudObject]):
     """Move an object to a new location."""
-    if obj.location:
-        obj.location.attrs.get("contents", []).remove(obj.oid)
-    obj.location = destination
-    if destination:
-        contents = destination.attrs.get("contents", [])
-        contents.append(obj.oid)
-        destination.attrs["contents"] = contents
+    source = obj.location
+    driver.containment.move(obj, destination)
     driver.save_object(obj)
+    if source and source is not destination:
+        driver.save_object(source)
     if destination:
         driver.save_object(destination)
 
@@ -65,8 +62,7 @@ async def catch(func: Callable, *args) -> tuple[Any, Optional[str]]:
 
 def shadow(obj: MudObject, func: Callable):
     """Shadow an object's method with a new function."""
-    # Simplified shadowing - extend as needed
-    obj.actions["shadowed"] = func
+    return driver.shadow_handler.shadow_function(obj, func)
 
 def seteuid(obj: MudObject, euid: str):
     """Set the effective user ID of an object."""
@@ -1,10 +1,16 @@
 # /mnt/home2/mud/efuns/parser.py
+from typing import Optional
 from ..driver import driver, Player
 
 def query_verb() -> Optional[str]:
     """Get the last verb executed."""
     return driver.query_verb()
 
+async def command(player: Player, line: str) -> str:
+    """Parse and run a command line as if the player typed it."""
+    verb, _, arg = line.strip().partition(" ")
+    return await driver.command_dispatcher.dispatch(player, verb, arg or None)
+
 async def notify_fail(player: Player, msg: str) -> str:
     """Notify a player of a failed action."""
     return await driver.notify_fail(player, msg)
@@ -6,6 +6,8 @@ import random
 import math
 
 class Armour:
+    __slots__ = ("oid", "name", "attrs")
+
     def __init__(self, oid: str, name: str, ac: Dict[str, int], coverage: Dict[str, float], weight: int, condition: int = 100):
         self.oid = oid
         self.name = name
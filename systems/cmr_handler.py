@@ -1,10 +1,11 @@
 # /mnt/home2/mud/systems/cmr_handler.py
 # Imported to: object.py
-# Imports from: driver.py, cmr_library.py
+# Imports from: driver.py, cmr_library.py, vocabulary.py
 
 from typing import Dict, List, Tuple, Optional
 from ..driver import driver, MudObject, Player
 from .cmr_library import CMRLibraryHandler
+from .vocabulary import vocabulary
 import json
 import os
 
@@ -25,7 +26,9 @@ class CMRHandler:
         self.colour_details: Dict[str, Tuple[int, int, int]] = {}  # (fine, crude, crafts_thresh)
         self.material_names: List[str] = []
         self.material_details: Dict[str, Tuple[int, int, int, int]] = {}  # (colour, type, skill_reqd, skill_thresh)
+        self.material_words: Dict[int, Tuple[str, str]] = {}  # {token: (adjective, ansi colour)}, built on first lookup
         self.load_cmr_handler()
+        vocabulary.load_cmr(self.colour_names, self.material_names)
 
     def load_cmr_handler(self):
         if os.path.exists(SAVE_FILE) and os.path.getsize(SAVE_FILE) > 0:
@@ -51,6 +54,7 @@ class CMRHandler:
             return "colour already exists"
         self.colour_names.append(word)
         self.colour_details[word] = (fine, crude, crafts_thresh)
+        vocabulary.set_kind(word, "colour")
         self.save_cmr_handler()
         return f"the colour {word}, a shade of {('pure' if fine == crude else MODIFIERS[fine])} {COLOURS[crude]}, with threshold of {crafts_thresh} crafts.points"
 
@@ -62,6 +66,7 @@ class CMRHandler:
             return False
         self.colour_names.remove(word)
         self.colour_details.pop(word, None)
+        vocabulary.set_kind(word, None)
         self.save_cmr_handler()
         return True
 
@@ -69,7 +74,7 @@ class CMRHandler:
         return self.colour_names.copy()
 
     def identify_colour(self, word: str, player: Optional[Player]) -> str:
-        if word not in self.colour_names:
+        if word not in self.colour_details:
             return "unknown colour"
         if not player:
             return word
@@ -86,6 +91,8 @@ class CMRHandler:
             return "material already exists"
         self.material_names.append(word)
         self.material_details[word] = (colour, type_, skill_reqd, skill_thresh)
+        vocabulary.set_kind(word, "material")
+        self.material_words.pop(vocabulary.intern(word), None)
         self.save_cmr_handler()
         text = " that is always recognised" if not skill_reqd else \
                " that is recognised through knowledge" if skill_reqd == LEARNT else \
@@ -100,6 +107,8 @@ class CMRHandler:
             return False
         self.material_names.remove(word)
         self.material_details.pop(word, None)
+        vocabulary.set_kind(word, None)
+        self.material_words.pop(vocabulary.intern(word), None)
         self.save_cmr_handler()
         return True
 
@@ -107,7 +116,7 @@ class CMRHandler:
         return self.material_names.copy()
 
     def identify_material(self, word: str, player: Optional[Player], article: bool) -> str:
-        if word not in self.material_names:
+        if word not in self.material_details:
             return "unknown material"
         colour, type_, skill_reqd, skill_thresh = self.material_details[word]
         prefix = f"a{'n' if colour == 9 else ''} " if article else ""
@@ -120,17 +129,24 @@ class CMRHandler:
         bonus = player.skills_handler.query_skill_bonus(SKILLS[skill_reqd]) if 0 <= skill_reqd < len(SKILLS) else 0
         return word if bonus > skill_thresh else f"{prefix}{COLOURS[colour]} {MATERIALS[type_]}"
 
+    def resolve_material(self, word: str) -> Optional[Tuple[str, str]]:
+        """Returns (adjective, ansi colour) for a material, worked out once per word."""
+        if vocabulary.query_kind(word) != "material":
+            return None
+        token = vocabulary.intern(word)
+        found = self.material_words.get(token)
+        if found is None:
+            colour, type_, _, _ = self.material_details[word]
+            found = self.material_words[token] = (vocabulary.canonical(f"{COLOURS[colour]} {MATERIAL_ADJECTIVES[type_]}"), ANSI_COLOURS[colour])
+        return found
+
     def query_material_adjective(self, word: str) -> str:
-        if word not in self.material_names:
-            return "an unknown material"
-        colour, type_, _, _ = self.material_details[word]
-        return f"{COLOURS[colour]} {MATERIAL_ADJECTIVES[type_]}"
+        found = self.resolve_material(word)
+        return found[0] if found else "an unknown material"
 
     def query_material_ansi_colour(self, word: str) -> str:
-        if word not in self.material_names:
-            return ""
-        colour, _, _, _ = self.material_details[word]
-        return ANSI_COLOURS[colour]
+        found = self.resolve_material(word)
+        return found[1] if found else ""
 
 async def init(driver_instance):
     global CMR_HANDLER
@@ -15,8 +15,13 @@ import asyncio
 import random
 import math
 import json
+import time
+
+EAGER = True  # Loaded at boot, not on first use: its verbs and hunt loop must exist before anyone fights
 
 class CombatSpecial:
+    __slots__ = ("id", "type_", "events", "callback", "data")
+
     def __init__(self, special_id: int, type_: int, events: int, callback: Callable, data: dict):
         self.id = special_id
         self.type_ = type_  # T_OFFENSIVE, T_DEFENSIVE, T_CONTINUOUS
@@ -25,6 +30,16 @@ class CombatSpecial:
         self.data = data
 
 class Attack:
+    __slots__ = ("attacker", "opponent", "defender", "person_hit", "attacker_tactics", "attacker_specials",
+                 "attacker_concentrating", "attacker_defecit", "attacker_last_opponent",
+                 "attacker_last_weapon", "attacker_last_action", "attacker_last_result", "defender_tactics",
+                 "defender_specials", "defender_concentrating", "defender_defecit", "defender_last_opponent",
+                 "defender_last_action", "defender_last_result", "attack_weapon", "attack_data",
+                 "attack_skill", "attack_modifier", "attack_cost", "defense_action", "defense_weapon",
+                 "defense_limb", "defense_skill", "defense_modifier", "defense_cost", "distance", "target_zone",
+                 "result", "degree", "damage", "armour_stopped", "stopped_by", "attack_messages",
+                 "defense_messages", "repeat")
+
     def __init__(self, attacker: Player, opponent: Optional[MudObject] = None):
         self.attacker = attacker
         self.opponent = opponent
@@ -52,6 +67,7 @@ class Attack:
         self.attack_cost = 0
         self.defense_action = "none"
         self.defense_weapon = None
+        self.defense_limb = None
         self.defense_skill = "fighting.combat.dodge"
         self.defense_modifier = 0
         self.defense_cost = 0
@@ -117,11 +133,22 @@ class CombatHandler:
 
     async def init(self, driver_instance):
         self.driver = driver_instance
-        for obj in self.driver.objects.values():
-            if hasattr(obj, "add_action"):
-                obj.add_action("attack", self.attack)
-                obj.add_action("flee", self.flee)
-                obj.add_action("surrender", self.surrender)
+        driver_instance.combat_handler = self
+        self.driver.declare_action("attack", self.attack, MudObject)
+        self.driver.declare_action("flee", self.flee, MudObject)
+        self.driver.declare_action("surrender", self.surrender, MudObject)
+        asyncio.create_task(self.hunt_loop())
+
+    def __migrate__(self, fresh: "CombatHandler"):
+        """Keeps fights, hunts and surrenders across a reload; tables defined in code come from the new version."""
+        self.damage_types = fresh.damage_types
+
+    async def hunt_loop(self):
+        """Steps hunters towards their prey every combat round."""
+        while True:
+            await asyncio.sleep(self.COMBAT_SPEED)
+            if self.hunting:
+                await self.hunt()
 
     async def attack(self, attacker: MudObject, player: Player, target_name: str) -> str:
         if not isinstance(player, Player) or not player.location:
@@ -147,6 +174,8 @@ class CombatHandler:
         if target_oid:
             target = self.driver.objects[target_oid]
             self.stop_fight(player, target)
+            if not isinstance(target, Player):
+                self.start_hunting(target, player)  # NPCs follow whoever runs from them
             await player.send("You flee, shadows of Faerûn cloaking your retreat!")
             return await player.location.call("move", player, "random")
         return "No combat to flee from!"
@@ -205,8 +234,36 @@ class CombatHandler:
             attacker.attrs["action_defecit"] = (self.MAX_ACTION_DEFECIT - self.MIN_ACTION_DEFECIT) // 3
 
         self.combatants[attacker.oid] = opponent.oid
+        if hasattr(self.driver, "oob"):
+            self.driver.oob.publish(attacker, "Char.Combat", {"target": opponent.name})
         return True
 
+    def start_hunting(self, hunter: MudObject, prey: MudObject):
+        """Marks hunter as chasing prey for HUNTING_TIME seconds."""
+        self.combatants[hunter.oid] = prey.oid
+        self.hunting[hunter.oid] = int(time.time()) + self.HUNTING_TIME
+
+    async def hunt(self):
+        """Moves every hunting NPC one step towards its prey along cached routes."""
+        now = int(time.time())
+        chases = []
+        for oid, until in list(self.hunting.items()):
+            hunter = self.driver.objects.get(oid)
+            prey = self.driver.objects.get(self.combatants.get(oid, ""))
+            if not hunter or not prey or until < now:
+                del self.hunting[oid]
+                continue
+            if isinstance(hunter, Player) or not hunter.location or not prey.location or hunter.location == prey.location:
+                continue
+            chases.append((hunter, hunter.location.oid, prey.location.oid))
+        if not chases or not hasattr(self.driver, "pathfinding"):
+            return
+        routes = self.driver.pathfinding.batch_routes([(src, dest) for _, src, dest in chases])
+        for hunter, src, dest in chases:
+            route = routes.get((src, dest))
+            if route:
+                await hunter.exit_command(route[0])
+
     def pk_check(self, attacker: MudObject, opponent: MudObject) -> bool:
         return False  # Expand for FR-specific PK rules if needed
 
@@ -734,6 +791,8 @@ async def prepare_messages(self, att: Attack) -> Attack:
                 del self.hunting[d.oid]
             self.surrender_to[d.oid] = [s for s in self.surrender_to.get(d.oid, []) if s != opponent.oid]
             self.surrender_from[d.oid] = [s for s in self.surrender_from.get(d.oid, []) if s != obj.oid]
+            if hasattr(self.driver, "oob"):
+                self.driver.oob.publish(d, "Char.Combat", {"target": None})
 
     async def event_surrender(self, victim: Player, attacker: MudObject):
         mercy = attacker.attrs.get("tactics", Tactics()).mercy
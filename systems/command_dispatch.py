@@ -0,0 +1,176 @@
+# /mnt/home2/mud/systems/command_dispatch.py
+# Imported to: driver.py, parser.py
+# Imports from: driver.py
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..driver import driver, MudObject
+
+# Same table as room.SHORTEN, reversed so "n" reaches the "north" action
+LENGTHEN = {"n": "north", "ne": "northeast", "e": "east", "se": "southeast", "s": "south",
+            "sw": "southwest", "w": "west", "nw": "northwest", "u": "up", "d": "down"}
+EXIT = None  # Entry func marking a room exit rather than an action
+
+class VerbTrie:
+    def __init__(self):
+        self.root: Dict[str, Any] = {}  # {char: child node}; "" holds the verb ending here
+        self.counts: Dict[int, int] = {}  # {id(node): verbs at or below it}
+
+    def add(self, verb: str):
+        node = self.root
+        path = [node]
+        for char in verb:
+            node = node.setdefault(char, {})
+            path.append(node)
+        if "" in node:
+            return
+        node[""] = verb
+        for step in path:
+            self.counts[id(step)] = self.counts.get(id(step), 0) + 1
+
+    def complete(self, prefix: str) -> Optional[str]:
+        """Returns the only verb starting with prefix, or None if there are none or several."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        while self.counts.get(id(node)) == 1:
+            if "" in node:
+                return node[""]
+            node = next(child for key, child in node.items() if key)
+        return None
+
+class CommandTable:
+    def __init__(self):
+        self.own: Dict[str, List[Tuple[MudObject, Optional[Callable]]]] = {}  # Player and carried items
+        self.local: Dict[str, List[Tuple[MudObject, Optional[Callable]]]] = {}  # Room, its exits and contents
+        self.room: Optional[MudObject] = None
+        self.own_dirty = True
+        self.local_dirty = True
+        self.merged: Dict[str, List[Tuple[MudObject, Optional[Callable]]]] = {}
+        self.trie: Optional[VerbTrie] = None
+
+class CommandDispatcher:
+    def __init__(self):
+        self.tables: Dict[Any, CommandTable] = {}  # {player: merged action table}
+        self.watchers: Dict[int, set] = {}  # {id(source object): players whose table uses it}
+        self.rebuilds = 0
+        self.dispatched = 0
+
+    def _collect(self, table: Dict, sources: List[MudObject]):
+        """Adds the actions of each source to table, keeping earlier sources first."""
+        for obj in sources:
+            own = getattr(obj, "actions", {})
+            for verb, func in own.items():
+                table.setdefault(verb, []).append((obj, func))
+            for verb, func in driver.actions_for(obj).items():
+                if verb not in own:
+                    table.setdefault(verb, []).append((obj, func))
+
+    def _watch(self, player: Any, sources: List[MudObject]):
+        for obj in sources:
+            self.watchers.setdefault(id(obj), set()).add(player)
+
+    def table_for(self, player: Any) -> CommandTable:
+        """Returns the player's action table, rebuilding only the stale halves."""
+        table = self.tables.get(player)
+        if table is None:
+            table = self.tables[player] = CommandTable()
+        room = player.location
+        if room is not table.room:
+            table.room = room
+            table.local_dirty = True
+        if not (table.own_dirty or table.local_dirty):
+            return table
+        if table.own_dirty:
+            sources = [player] + list(getattr(player, "inventory", []))
+            table.own = {}
+            self._collect(table.own, sources)
+            self._watch(player, sources)
+            table.own_dirty = False
+        if table.local_dirty:
+            table.local = {}
+            sources = []
+            if room:
+                sources = [room] + [ob for ob in getattr(room, "inventory", []) if ob is not player]
+                self._collect(table.local, sources)
+                if hasattr(room, "query_exit_verbs"):
+                    for verb in room.query_exit_verbs():
+                        table.local.setdefault(verb, []).append((room, EXIT))
+            self._watch(player, sources)
+            table.local_dirty = False
+        table.merged = dict(table.local)
+        for verb, entries in table.own.items():
+            table.merged[verb] = entries + table.local.get(verb, [])
+        table.trie = None
+        self.rebuilds += 1
+        return table
+
+    def source_changed(self, obj: MudObject):
+        """Marks tables stale after obj gains or loses actions, exits or inventory."""
+        for player in self.watchers.pop(id(obj), ()):
+            table = self.tables.get(player)
+            if not table:
+                continue
+            if obj is player or obj in getattr(player, "inventory", []):
+                table.own_dirty = True
+            else:
+                table.local_dirty = True
+
+    def invalidate(self):
+        """Marks every table stale, e.g. after an action is declared for a whole class."""
+        for table in self.tables.values():
+            table.own_dirty = table.local_dirty = True
+
+    def forget(self, player: Any):
+        """Drops a disconnected player's table."""
+        self.tables.pop(player, None)
+
+    def resolve(self, player: Any, verb: str) -> Tuple[str, List[Tuple[MudObject, Optional[Callable]]]]:
+        """Expands aliases and abbreviations, returning (verb, handlers)."""
+        table = self.table_for(player)
+        room = player.location
+        if room and hasattr(room, "expand_alias"):
+            verb = room.expand_alias(verb)
+        entries = table.merged.get(verb)
+        if entries:
+            return verb, entries
+        long_verb = LENGTHEN.get(verb)
+        if long_verb and long_verb in table.merged:
+            return long_verb, table.merged[long_verb]
+        if table.trie is None:
+            table.trie = VerbTrie()
+            for known in table.merged:
+                table.trie.add(known)
+        full = table.trie.complete(verb)
+        if full:
+            return full, table.merged[full]
+        return verb, []
+
+    async def dispatch(self, player: Any, verb: str, arg: Optional[str] = None) -> str:
+        """Runs a command through the player's merged action table."""
+        self.dispatched += 1
+        verb, entries = self.resolve(player, verb)
+        driver.last_verb = verb
+        for obj, func in entries:
+            if func is EXIT:
+                if hasattr(player, "exit_command") and await player.exit_command(verb):
+                    return ""
+                continue
+            result = await obj.call(verb, player, arg)
+            if result:
+                return result
+        return await driver.notify_fail(player, f"{verb} not recognized.")
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("command tables", len(self.tables)),
+            ("table rebuilds", self.rebuilds),
+            ("commands dispatched", self.dispatched),
+        ]
+
+command_dispatcher = CommandDispatcher()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.command_dispatcher = command_dispatcher
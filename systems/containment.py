@@ -0,0 +1,202 @@
+# /mnt/home2/mud/systems/containment.py
+# Imported to: description.py, export_inventory.py, inventory.py, living.py, light.py, misc.py, driver.py, core.py
+# Imports from: driver.py
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..driver import driver, MudObject
+from .lighting import lighting
+
+class Contents:
+    """Insertion-ordered set of contained objects, readable like the old inventory list."""
+    __slots__ = ("items",)
+
+    def __init__(self, items: Any = ()):
+        self.items: Dict[MudObject, None] = dict.fromkeys(items)
+
+    def add(self, item: MudObject) -> bool:
+        if item in self.items:
+            return False
+        self.items[item] = None
+        return True
+
+    def discard(self, item: MudObject) -> bool:
+        if item not in self.items:
+            return False
+        del self.items[item]
+        return True
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.items
+
+    def __iter__(self) -> Iterator[MudObject]:
+        return iter(list(self.items))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def __getitem__(self, index: Any) -> Any:
+        return list(self.items)[index]
+
+    def copy(self) -> List[MudObject]:
+        return list(self.items)
+
+    def __repr__(self) -> str:
+        return f"Contents({list(self.items)!r})"
+
+def own_weight(thing: MudObject) -> int:
+    """Weight of an object by itself, not counting anything inside it."""
+    query = getattr(thing, "query_weight", None)
+    if query:
+        return query() or 0
+    return thing.attrs.get("weight", 0)
+
+def own_light(thing: MudObject) -> int:
+    """Light an object gives off by itself."""
+    query = getattr(thing, "query_my_light", None)
+    if query:
+        return query() or 0
+    return thing.attrs.get("light", 0)
+
+class ContainmentTree:
+    def __init__(self):
+        self.children: Dict[MudObject, Contents] = {}  # {container: its contents}
+        self.parent: Dict[MudObject, MudObject] = {}  # {object: container holding it}
+        self.own: Dict[MudObject, Tuple[int, int]] = {}  # {object: (weight, light)} when it was last counted
+        self.inner_weight: Dict[MudObject, int] = {}  # {container: weight of everything inside}
+        self.inner_light: Dict[MudObject, int] = {}  # {container: light given off by everything inside}
+        self.moves = 0
+        self.propagations = 0
+
+    def contents(self, container: MudObject) -> Contents:
+        """Returns the live contents set of a container, creating it if needed."""
+        found = self.children.get(container)
+        if found is None:
+            found = self.children[container] = Contents()
+        return found
+
+    def query_parent(self, thing: MudObject) -> Optional[MudObject]:
+        return self.parent.get(thing)
+
+    def _mirror(self, container: MudObject) -> Dict[str, None]:
+        """Returns the saved oid set in attrs["contents"], upgrading old list saves."""
+        oids = container.attrs.get("contents")
+        if not isinstance(oids, dict):
+            oids = container.attrs["contents"] = dict.fromkeys(oids or [])
+        return oids
+
+    def _propagate(self, container: Optional[MudObject], weight: int, light: int):
+        """Adds a weight and light delta to a container and every container above it."""
+        while container is not None:
+            self.inner_weight[container] = self.inner_weight.get(container, 0) + weight
+            if light:
+                self.inner_light[container] = self.inner_light.get(container, 0) + light
+                lighting.invalidate(container)
+            self.propagations += 1
+            container = self.parent.get(container)
+
+    def _totals(self, thing: MudObject) -> Tuple[int, int]:
+        """Returns (complete weight, total light) of an object and its contents."""
+        weight, light = self.own[thing]
+        return weight + self.inner_weight.get(thing, 0), light + self.inner_light.get(thing, 0)
+
+    def add(self, container: MudObject, thing: MudObject) -> bool:
+        """Puts thing into container, taking it out of wherever it was first."""
+        if self.parent.get(thing) is container:
+            return False
+        ancestor = container
+        while ancestor is not None:
+            if ancestor is thing:
+                return False  # Would put a container inside itself
+            ancestor = self.parent.get(ancestor)
+        self.remove(thing)
+        self.own[thing] = (own_weight(thing), own_light(thing))
+        self.contents(container).add(thing)
+        self.parent[thing] = container
+        self._mirror(container)[thing.oid] = None
+        thing.location = container
+        self._propagate(container, *self._totals(thing))
+        self.moves += 1
+        return True
+
+    def remove(self, thing: MudObject, container: Optional[MudObject] = None) -> bool:
+        """Takes thing out of its container; if container is given it must be the one holding it."""
+        current = self.parent.get(thing)
+        if current is None or (container is not None and current is not container):
+            return False
+        weight, light = self._totals(thing)
+        self._propagate(current, -weight, -light)
+        del self.parent[thing]
+        del self.own[thing]
+        self.children[current].discard(thing)
+        self._mirror(current).pop(thing.oid, None)
+        if thing.location is current:
+            thing.location = None
+        return True
+
+    def move(self, thing: MudObject, destination: Optional[MudObject]) -> bool:
+        """Moves thing to destination, or out of the tree when destination is None."""
+        if destination is None:
+            self.remove(thing)
+            thing.location = None
+            return True
+        return self.add(destination, thing)
+
+    def refresh(self, thing: MudObject):
+        """Re-reads an object's own weight and light, passing any change up the tree."""
+        lighting.invalidate(thing)
+        old = self.own.get(thing)
+        if old is None:
+            return
+        new = (own_weight(thing), own_light(thing))
+        if new != old:
+            self.own[thing] = new
+            self._propagate(self.parent[thing], new[0] - old[0], new[1] - old[1])
+
+    def forget(self, thing: MudObject):
+        """Drops a destructed object and the links to whatever it held."""
+        self.remove(thing)
+        for item in self.children.pop(thing, ()):
+            self.parent.pop(item, None)
+            self.own.pop(item, None)
+            if item.location is thing:
+                item.location = None
+        self.inner_weight.pop(thing, None)
+        self.inner_light.pop(thing, None)
+
+    def query_inner_weight(self, container: MudObject) -> int:
+        return self.inner_weight.get(container, 0)
+
+    def query_inner_light(self, container: MudObject) -> int:
+        return self.inner_light.get(container, 0)
+
+    def query_complete_weight(self, thing: MudObject) -> int:
+        """Own weight plus the cached weight of everything inside."""
+        return own_weight(thing) + self.inner_weight.get(thing, 0)
+
+    def all_inventory(self, container: MudObject) -> List[MudObject]:
+        """Returns everything inside container at any depth, each level in insertion order."""
+        found = []
+        stack = [container]
+        while stack:
+            level = self.children.get(stack.pop())
+            if level:
+                found.extend(level.items)
+                stack.extend(reversed(level.items))
+        return found
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("containers", len(self.children)),
+            ("contained objects", len(self.parent)),
+            ("moves", self.moves),
+            ("aggregate updates", self.propagations),
+        ]
+
+containment = ContainmentTree()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.containment = containment
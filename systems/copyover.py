@@ -0,0 +1,376 @@
+# /mnt/home2/mud/systems/copyover.py
+# Imported to: driver.py
+# Imports from: driver.py, telnet.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from ..driver import driver, logger, MudObject, Player
+from .telnet import MCCP2
+from heapq import heappush
+import asyncio
+import importlib
+import io
+import json
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import time
+
+COPYOVER_SOCKET = "/mnt/home2/mud/copyover.sock"  # UNIX socket the sockets are handed over on
+COPYOVER_IMAGE = "/mnt/home2/mud/copyover.img"  # World image written by the old process
+BOOT_TIMEOUT = 60  # Seconds the new process may take to import and connect; the world keeps running meanwhile
+READY_TIMEOUT = 15  # Seconds the new process may take to restore the image and listen
+MAX_FDS = 4096  # Most sockets one handoff carries
+COMBAT_STATE = ("combatants", "hunting", "surrender_to", "surrender_from")
+
+class WorldPickler(pickle.Pickler):
+    """Writes objects in driver.objects and handed-over players as references, not copies."""
+    def __init__(self, file: Any, players: Dict[Any, int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.players = players  # {player: index in the handoff}
+
+    def persistent_id(self, obj: Any) -> Any:
+        if isinstance(obj, MudObject) and driver.objects.get(obj.oid) is obj:
+            return obj.oid
+        if isinstance(obj, Player):
+            index = self.players.get(obj)
+            return ("player", -1 if index is None else index)
+        return None
+
+class WorldUnpickler(pickle.Unpickler):
+    def __init__(self, file: Any, players: List[Optional[Player]]):
+        super().__init__(file)
+        self.players = players
+
+    def persistent_load(self, pid: Any) -> Any:
+        if isinstance(pid, tuple):
+            return self.players[pid[1]] if pid[1] >= 0 else None
+        return driver.objects.get(pid)
+
+def dumps(value: Any, players: Dict[Any, int]) -> bytes:
+    buffer = io.BytesIO()
+    WorldPickler(buffer, players).dump(value)
+    return buffer.getvalue()
+
+class Connection:
+    """A telnet client socket taken over from the old process, shaped like the writer the driver reads from."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.transport = writer.transport
+
+    async def read(self, size: int) -> bytes:
+        return await self.reader.read(size)
+
+    def write(self, data: bytes):
+        self.writer.write(data)
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self):
+        self.writer.close()
+
+    async def wait_closed(self):
+        await self.writer.wait_closed()
+
+class Handoff:
+    """What the new process received: the header, listening sockets and restored players."""
+    def __init__(self, channel: socket.socket, header: Dict[str, Any], listeners: Dict[str, socket.socket]):
+        self.channel = channel
+        self.header = header
+        self.listeners = listeners
+        self.players: List[Player] = []
+
+class CopyoverHandler:
+    def __init__(self):
+        self.running = False
+        self.copyovers = 0
+        self.failures = 0
+        self.last_stall = 0.0  # Seconds between the old process freezing and the new one resuming
+        self.dropped = 0  # Objects or timers that could not be carried across
+        self.compressed: List[Player] = []  # Players whose MCCP2 stream was ended for the handoff
+
+    def handed_over(self, player: Player) -> bool:
+        """Plain telnet connections survive a copyover; TLS and websocket sessions live in the process and can't."""
+        transport = getattr(player.writer, "transport", None)
+        return (player.protocol == "telnet" and transport is not None
+                and transport.get_extra_info("ssl_object") is None and transport.get_extra_info("socket") is not None)
+
+    async def quiesce(self) -> List[Player]:
+        """Ends compression, flushes output and stops reading on every connection being handed over."""
+        handed = []
+        self.compressed = []
+        for player in list(driver.players.values()):
+            try:
+                if not self.handed_over(player):
+                    await player.send("The Realms are being remade. Reconnect in a moment.")
+                    if driver.handler("player_handler") is not None and getattr(player, "name", None):
+                        driver.player_handler.save_player(player)
+                    continue
+                if player.telnet and player.telnet.compressing:
+                    player.telnet.stop_compression()
+                    self.compressed.append(player)
+                    player.writer.write(player.telnet.wire())
+                await asyncio.wait_for(player.writer.drain(), 1)
+                player.writer.transport.pause_reading()
+                handed.append(player)
+            except Exception as e:
+                logger.error(f"Copyover could not hand over {getattr(player, 'name', '?')}: {e}")
+        return handed
+
+    def snapshot(self, handed: List[Player]) -> bytes:
+        """Pickles the world: object shells first, then every object's state with references kept as oids."""
+        index = {player: i for i, player in enumerate(handed)}
+        shells = []
+        objects = {}
+        for oid, obj in driver.objects.items():
+            cls = type(obj)
+            shells.append((cls.__module__, cls.__qualname__, oid, obj.name, obj.euid))
+            objects[oid] = (obj.attrs.copy() if hasattr(obj.attrs, "copy") else dict(obj.attrs), obj.location,
+                            getattr(obj, "effects", None), getattr(obj, "active_effects", None))
+        reload = []
+        try:
+            objects_image = dumps(objects, index)
+        except Exception:
+            # Find the objects that won't pickle; they go through the database like a normal save instead
+            for oid, state in list(objects.items()):
+                try:
+                    dumps(state, index)
+                except Exception:
+                    driver.save_object(driver.objects[oid])
+                    reload.append(oid)
+                    del objects[oid]
+            objects_image = dumps(objects, index)
+            self.dropped += len(reload)
+
+        timers = []
+        for when, func, args in driver.task_queue:
+            owner = getattr(func, "__self__", None)
+            if isinstance(owner, MudObject) and driver.objects.get(owner.oid) is owner:
+                timers.append(("call_out", when, owner, func.__name__, args))
+        if driver.handler("expiry") is not None:
+            for entry, deadline in driver.expiry.deadlines.items():
+                owner, method, key = entry
+                args = driver.expiry.buckets.get(deadline, {}).get(entry, ())
+                timers.append(("expiry", deadline, owner, method, (key, args)))
+        kept = []
+        for timer in timers:
+            try:
+                kept.append(dumps(timer, index))
+            except Exception:
+                self.dropped += 1
+
+        players = []
+        for player in handed:
+            session = driver.sessions.sessions.get(player) if driver.handler("sessions") is not None else None
+            waiting = list(player.input_lines) + (list(session.commands._queue) if session else [])
+            players.append(dumps((getattr(player, "attrs", {}), player.location, waiting), index))
+
+        combat = driver.handler("combat_handler")
+        image = {
+            "shells": shells,
+            "reload": reload,
+            "objects": objects_image,
+            "timers": kept,
+            "combat": {name: getattr(combat, name) for name in COMBAT_STATE} if combat else None,
+            "players": [{"name": getattr(player, "name", None), "ip_address": player.ip_address,
+                         "telnet": player.telnet.export() if player.telnet else None,
+                         "msdp_reported": sorted(player.msdp_reported), "state": state}
+                        for player, state in zip(handed, players)],
+        }
+        return pickle.dumps(image, protocol=pickle.HIGHEST_PROTOCOL)
+
+    async def copyover(self) -> bool:
+        """Restarts into a fresh process without dropping plain telnet players. The new process boots
+        while the world keeps running; the stall is only the snapshot, the handoff and the restore."""
+        if self.running:
+            return False
+        self.running = True
+        loop = asyncio.get_running_loop()
+        channel = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        child = None
+        handed: List[Player] = []
+        backups: Dict[str, socket.socket] = {}
+        closed = False
+        try:
+            if os.path.exists(COPYOVER_SOCKET):
+                os.remove(COPYOVER_SOCKET)
+            channel.bind(COPYOVER_SOCKET)
+            channel.listen(1)
+            channel.setblocking(False)
+            child = subprocess.Popen([sys.executable] + sys.argv, env=dict(os.environ, MUD_COPYOVER=COPYOVER_SOCKET))
+            try:
+                conn, _ = await asyncio.wait_for(loop.sock_accept(channel), BOOT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"new process did not connect within {BOOT_TIMEOUT}s")
+
+            frozen = time.time()
+            handed = await self.quiesce()
+            image = self.snapshot(handed)
+            with open(COPYOVER_IMAGE + ".tmp", "wb") as f:
+                f.write(image)
+            os.replace(COPYOVER_IMAGE + ".tmp", COPYOVER_IMAGE)
+
+            roles, fds = [], []
+            for role, server in driver.servers.items():
+                listening = server.sockets[0]
+                backups[role] = socket.socket(fileno=os.dup(listening.fileno()))
+                roles.append(role)
+                fds.append(listening.fileno())
+            for player in handed:
+                roles.append("client")
+                fds.append(player.writer.transport.get_extra_info("socket").fileno())
+            header = json.dumps({"roles": roles, "image": COPYOVER_IMAGE, "frozen": frozen}).encode()
+            conn.setblocking(True)
+            conn.settimeout(5)
+            socket.send_fds(conn, [header], fds)
+            for server in driver.servers.values():
+                server.close()  # The new process holds its own copies of the listening sockets now
+            closed = True
+
+            conn.setblocking(False)
+            ready = await asyncio.wait_for(loop.sock_recv(conn, 1), READY_TIMEOUT)
+            if ready != b"1":
+                raise RuntimeError("new process failed to restore the image")
+            self.exit(len(handed), child.pid)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Copyover aborted: {e}")
+            if child and child.poll() is None:
+                child.kill()
+            if closed:
+                await driver.listen(backups)
+            for player in handed:
+                player.writer.transport.resume_reading()
+                if player in self.compressed and player.telnet.enabled(MCCP2):
+                    player.telnet.start_compression()
+                    player.writer.write(player.telnet.wire())
+            return False
+        finally:
+            self.running = False
+            channel.close()
+            if os.path.exists(COPYOVER_SOCKET):
+                os.remove(COPYOVER_SOCKET)
+
+    def exit(self, handed: int, pid: int):
+        """Ends the old process once the new one holds the world; nothing on the way may stop the exit."""
+        try:
+            driver.db.commit()
+            logger.info(f"Copyover handed {handed} connections to pid {pid}")
+        except BaseException:
+            pass  # Too late to abort: the new process is already serving the handed-over players
+        finally:
+            os._exit(0)
+
+    def place(self, thing: Any, location: Any):
+        """Puts a restored thing back where it was, through the containment tree so weight and light add up."""
+        if location is None:
+            return
+        if driver.handler("containment") is not None:
+            driver.containment.add(location, thing)
+        else:
+            thing.location = location
+
+    async def receive(self) -> Handoff:
+        """Runs in the new process: takes the sockets and restores the world from the old process's image."""
+        path = os.environ.pop("MUD_COPYOVER")
+        loop = asyncio.get_running_loop()
+        channel = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        channel.connect(path)
+        message, fds, _, _ = await loop.run_in_executor(None, socket.recv_fds, channel, 65536, MAX_FDS)
+        header = json.loads(message)
+        sockets = [socket.socket(fileno=fd) for fd in fds]
+        handoff = Handoff(channel, header, {role: sock for role, sock in zip(header["roles"], sockets) if role != "client"})
+        with open(header["image"], "rb") as f:
+            image = pickle.load(f)
+
+        # Shells first, so references between objects resolve whatever order they were written in
+        for module, qualname, oid, name, euid in image["shells"]:
+            if oid in driver.objects:
+                continue
+            try:
+                obj = getattr(importlib.import_module(module), qualname)(oid, name)
+            except Exception:
+                obj = MudObject(oid, name, euid)
+            obj.euid = euid
+            driver.objects[oid] = obj
+            if oid in image["reload"]:
+                row = driver.db.execute("SELECT data FROM objects WHERE oid=?", (oid,)).fetchone()
+                if row:
+                    obj.attrs.update(json.loads(row[0]))
+
+        clients = [sock for role, sock in zip(header["roles"], sockets) if role == "client"]
+        for record, sock in zip(image["players"], clients):
+            reader, writer = await asyncio.open_connection(sock=sock)
+            connection = Connection(reader, writer)
+            player = Player(connection, "telnet")
+            player.name = record["name"]
+            player.ip_address = record["ip_address"]
+            player.msdp_reported = set(record["msdp_reported"])
+            if record["telnet"] and driver.handler("telnet") is not None:
+                player.telnet = driver.telnet.resume(record["telnet"])
+            handoff.players.append(player)
+
+        placements = []
+        for oid, (attrs, location, effects, active) in WorldUnpickler(io.BytesIO(image["objects"]), handoff.players).load().items():
+            obj = driver.objects[oid]
+            obj.attrs.update(attrs)
+            placements.append((obj, location))
+            if effects is not None and hasattr(obj, "restore_effects"):
+                obj.effects = effects
+                obj.active_effects = active or []
+                obj.restore_effects()
+        for player, record in zip(handoff.players, image["players"]):
+            attrs, location, waiting = WorldUnpickler(io.BytesIO(record["state"]), handoff.players).load()
+            player.attrs = attrs
+            placements.append((player, location))
+            player.input_lines.extend(waiting)
+        for thing, location in placements:  # Once every weight is restored, so the totals come out right
+            self.place(thing, location)
+        for data in image["timers"]:
+            kind, when, owner, method, args = WorldUnpickler(io.BytesIO(data), handoff.players).load()
+            if owner is None:
+                continue
+            if kind == "call_out":
+                heappush(driver.task_queue, (when, getattr(owner, method), args))
+            elif driver.handler("expiry") is not None:
+                key, args = args
+                driver.expiry.schedule(owner, method, key, when - int(time.time()), *args)
+        if driver.task_queue:
+            await driver.scheduler.spawn(driver.process_tasks())
+        combat = driver.handler("combat_handler")
+        if combat and image["combat"]:
+            for name in COMBAT_STATE:
+                setattr(combat, name, image["combat"][name])
+        return handoff
+
+    async def resume(self, handoff: Handoff):
+        """Tells the old process to exit and gives every handed-over player back their session."""
+        handoff.channel.send(b"1")
+        handoff.channel.close()
+        for player in handoff.players:
+            driver.players[player.writer] = player
+            if player.telnet:
+                player.sync_telnet()
+            await player.send("The Weave settles; the Realms stand renewed around you.")
+            asyncio.create_task(driver.play(player))
+        self.last_stall = time.time() - handoff.header["frozen"]
+        self.copyovers += 1
+        logger.info(f"Copyover resumed {len(handoff.players)} connections, "
+                    f"{len(driver.objects)} objects after a {self.last_stall:.2f}s stall")
+
+    def stats(self) -> List[Tuple[str, Any]]:
+        return [
+            ("copyovers", self.copyovers),
+            ("copyover failures", self.failures),
+            ("last stall seconds", round(self.last_stall, 3)),
+            ("state dropped", self.dropped),
+        ]
+
+copyover = CopyoverHandler()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.copyover = copyover
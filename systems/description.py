@@ -1,9 +1,13 @@
 # /mnt/home2/mud/systems/description.py
 # Imported to: room.py, living.py
-# Imports from: driver.py
+# Imports from: driver.py, containment.py, vocabulary.py
 
 from typing import Dict, List, Optional, Union
 from ..driver import driver, MudObject
+from .containment import containment
+from .lighting import lighting
+from .noun_index import reindex
+from .vocabulary import vocabulary
 import asyncio
 
 class Desc:
@@ -27,6 +31,9 @@ class Desc:
     def set_short(self, short: str):
         """Sets the short description."""
         self.short = short.strip()
+        holder = containment.query_parent(self)
+        if holder is not None and hasattr(holder, "invalidate_render"):
+            holder.invalidate_render("contents")  # The room's cached contents line names this
 
     def query_short(self, dark: int = 0) -> str:
         """Returns the short description, adjusted for darkness."""
@@ -47,13 +54,10 @@ class Desc:
 
     def add_adjective(self, adj: Union[str, List[str]]):
         """Adds adjectives to the description."""
-        if isinstance(adj, str):
-            if adj not in self.adjectives:
-                self.adjectives.append(adj)
-        else:
-            for a in adj:
-                if a not in self.adjectives:
-                    self.adjectives.append(a)
+        for a in [adj] if isinstance(adj, str) else adj:
+            if a not in self.adjectives:
+                self.adjectives.append(vocabulary.canonical(a))
+        reindex(self)
 
     def query_adjectives(self) -> List[str]:
         """Returns the list of adjectives."""
@@ -61,13 +65,10 @@ class Desc:
 
     def add_alias(self, alias: Union[str, List[str]]):
         """Adds aliases to the description."""
-        if isinstance(alias, str):
-            if alias not in self.aliases:
-                self.aliases.append(alias)
-        else:
-            for a in alias:
-                if a not in self.aliases:
-                    self.aliases.append(a)
+        for a in [alias] if isinstance(alias, str) else alias:
+            if a not in self.aliases:
+                self.aliases.append(vocabulary.canonical(a))
+        reindex(self)
 
     def query_aliases(self) -> List[str]:
         """Returns the list of aliases."""
@@ -76,21 +77,15 @@ class Desc:
     def add_plural(self, singular: str, plural: str):
         """Adds a singular-plural pair."""
         self.plurals[singular] = plural
+        reindex(self)
 
     def query_plural(self, singular: str) -> Optional[str]:
         """Returns the plural form of a singular noun."""
         return self.plurals.get(singular)
 
     def pluralize(self, word: str) -> str:
-        """Generates a plural form if not explicitly set."""
-        plural = self.query_plural(word)
-        if plural:
-            return plural
-        if word.endswith("s") or word.endswith("sh") or word.endswith("ch") or word.endswith("x") or word.endswith("z"):
-            return word + "es"
-        if word.endswith("y") and word[-2] not in "aeiou":
-            return word[:-1] + "ies"
-        return word + "s"
+        """Returns the explicit plural if one is set, else the vocabulary's precomputed one."""
+        return self.query_plural(word) or vocabulary.plural(word)
 
     def set_dark(self, dark: int):
         """Sets the darkness flag (2025 feature)."""
@@ -122,7 +117,7 @@ class Desc:
 
     async def describe(self, obj: MudObject, viewer: Optional[MudObject] = None) -> str:
         """Returns a full description for the object."""
-        dark = viewer.check_dark(obj.query_light()) if viewer else self.dark
+        dark = viewer.check_dark(lighting.query_light(obj)) if viewer else self.dark
         desc = f"{self.a_short(dark)} stands here.\n"
         if not dark:
             desc += self.query_long()
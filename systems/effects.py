@@ -2,78 +2,215 @@
 # Imported to: room.py, living.py, weather_handler.py
 # Imports from: driver.py
 
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from ..driver import driver, MudObject
+from .expiry import expiry
 import asyncio
+import itertools
 import time
 
+EAGER = True  # Loaded at boot, not on first use: runs the effect update loop
+
+EFFECT_TICK = 60  # Seconds between batched update_effect rounds
+MYSTRA_BLESSING = "/std/effects/mystra_blessing"
+effect_ids = itertools.count(1)
+
+def effect_path(effect: str) -> str:
+    """Expands a bare effect name to its handler path."""
+    return effect if effect.startswith("/") else f"/std/effects/{effect}"
+
+class EffectColumn:
+    """Every live effect of one type, stored as parallel columns."""
+    __slots__ = ("ids", "owners", "args", "rows")
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.owners: List[MudObject] = []
+        self.args: List[Any] = []
+        self.rows: Dict[int, int] = {}  # {effect id: row}
+
+    def add(self, effect_id: int, owner: MudObject, arg: Any):
+        self.rows[effect_id] = len(self.ids)
+        self.ids.append(effect_id)
+        self.owners.append(owner)
+        self.args.append(arg)
+
+    def remove(self, effect_id: int) -> bool:
+        """Drops a row by moving the last row into its place."""
+        row = self.rows.pop(effect_id, None)
+        if row is None:
+            return False
+        last = len(self.ids) - 1
+        if row != last:
+            self.ids[row], self.owners[row], self.args[row] = self.ids[last], self.owners[last], self.args[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        self.owners.pop()
+        self.args.pop()
+        return True
+
+class EffectRegistry:
+    def __init__(self):
+        self.type_ids: Dict[str, int] = {}  # {handler path: type id}
+        self.paths: List[str] = []  # Type id -> handler path
+        self.handlers: List[Optional[MudObject]] = []  # Type id -> loaded handler
+        self.columns: List[EffectColumn] = []  # Type id -> live effects of that type
+        self.batches = 0
+
+    def resolve(self, effect: str) -> Optional[int]:
+        """Returns the type id for an effect, loading its handler the first time only."""
+        path = effect_path(effect)
+        type_id = self.type_ids.get(path)
+        if type_id is not None:
+            return type_id if self.handlers[type_id] else None
+        handler = driver.load_object(path)
+        if not handler or not hasattr(handler, "apply_effect"):
+            return None
+        type_id = self.type_ids[path] = len(self.paths)
+        self.paths.append(path)
+        self.handlers.append(handler)
+        self.columns.append(EffectColumn())
+        return type_id
+
+    def reload(self, effect: str):
+        """Reloads the handler behind a type id, e.g. after its code changes."""
+        type_id = self.type_ids.get(effect_path(effect))
+        if type_id is not None:
+            self.handlers[type_id] = driver.load_object(self.paths[type_id])
+
+    def query_handler(self, effect: str) -> Optional[MudObject]:
+        type_id = self.type_ids.get(effect_path(effect))
+        return None if type_id is None else self.handlers[type_id]
+
+    async def update_all(self):
+        """Runs one update round: each handler is called once with every object it affects."""
+        for type_id, column in enumerate(self.columns):
+            handler = self.handlers[type_id]
+            if not column.ids or not handler:
+                continue
+            self.batches += 1
+            owners, args = column.owners.copy(), column.args.copy()
+            if hasattr(handler, "update_effects"):
+                await handler.update_effects(owners, args)
+            elif hasattr(handler, "update_effect"):
+                for owner, arg in zip(owners, args):
+                    await handler.update_effect(owner, arg)
+
+    async def update_loop(self):
+        """Updates all live effects every EFFECT_TICK seconds."""
+        while True:
+            await asyncio.sleep(EFFECT_TICK)
+            await self.update_all()
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("effect types", len(self.paths)),
+            ("live effects", sum(len(column.ids) for column in self.columns)),
+            ("update batches", self.batches),
+        ]
+
+effect_registry = EffectRegistry()
+
 class Effects:
     def __init__(self):
-        self.effects: Dict[str, tuple] = {}  # {effect_id: (handler_oid, arg, duration, start_time)}
-        self.active_effects: List[str] = []  # List of currently active effect IDs
+        self.effects: Dict[int, tuple] = {}  # {effect_id: (handler_oid, arg, duration, start_time)}
+        self.active_effects: List[int] = []  # List of currently active effect IDs
+        self.effect_types: Dict[int, int] = {}  # {type id: live effects of that type}
 
     def setup(self, obj: MudObject):
         """Sets up effects attributes on an object."""
         obj.effects = self.effects.copy()
         obj.active_effects = self.active_effects.copy()
+        obj.effect_types = self.effect_types.copy()
 
     def add_effect(self, effect: str, arg: Union[int, str, list], duration: int = -1) -> bool:
         """Adds an effect to the object (2025 update)."""
-        if not effect.startswith("/"):
-            effect = f"/std/effects/{effect}"
-        handler = driver.load_object(effect)
-        if not handler or not hasattr(handler, "apply_effect"):
+        type_id = effect_registry.resolve(effect)
+        if type_id is None:
             return False
 
-        effect_id = f"{effect}_{len(self.effects)}"
+        effect_id = next(effect_ids)
         start_time = int(time.time())
-        self.effects[effect_id] = (effect, arg, duration, start_time)
+        self.effects[effect_id] = (effect_registry.paths[type_id], arg, duration, start_time)
         self.active_effects.append(effect_id)
-        
+        effect_registry.columns[type_id].add(effect_id, self, arg)
+        self.effect_types[type_id] = self.effect_types.get(type_id, 0) + 1
+
         # Apply effect immediately
-        handler.apply_effect(obj, arg)
+        effect_registry.handlers[type_id].apply_effect(self, arg)
+        if driver.handler("lighting") is not None:
+            driver.lighting.invalidate_viewer(self)  # Sight effects change darkness thresholds
         if duration > 0:
-            driver.call_out(lambda: self.remove_effect(obj, effect_id), duration)
+            expiry.schedule(self, "remove_effect", effect_id, duration, self, effect_id)
         return True
 
-    def remove_effect(self, obj: MudObject, effect_id: str) -> bool:
-        """Removes an effect from the object."""
+    def remove_effect(self, obj: Optional[MudObject], effect_id: int) -> bool:
+        """Removes an effect from the object; obj defaults to the object carrying it."""
         if effect_id not in self.effects:
             return False
+        if obj is None:
+            obj = self
+        expiry.cancel(self, "remove_effect", effect_id)
         effect, arg, _, _ = self.effects[effect_id]
-        handler = driver.load_object(effect)
+        type_id = effect_registry.type_ids.get(effect)
+        if type_id is not None:
+            effect_registry.columns[type_id].remove(effect_id)
+            count = self.effect_types.get(type_id, 0) - 1
+            if count > 0:
+                self.effect_types[type_id] = count
+            else:
+                self.effect_types.pop(type_id, None)
+        handler = effect_registry.query_handler(effect)
         if handler and hasattr(handler, "remove_effect"):
             handler.remove_effect(obj, arg)
         del self.effects[effect_id]
+        if driver.handler("lighting") is not None:
+            driver.lighting.invalidate_viewer(self)
         if effect_id in self.active_effects:
             self.active_effects.remove(effect_id)
         return True
 
-    def query_effects(self) -> Dict[str, tuple]:
+    def forget_effects(self):
+        """Drops this object's rows from the registry without running handlers, e.g. on destruct."""
+        for effect_id, (effect, _, _, _) in self.effects.items():
+            type_id = effect_registry.type_ids.get(effect)
+            if type_id is not None:
+                effect_registry.columns[type_id].remove(effect_id)
+        self.effect_types.clear()
+
+    def restore_effects(self):
+        """Puts effects carried over from another process back into the registry without
+        reapplying them; their expiries come back with the rest of the snapshot."""
+        global effect_ids
+        self.effect_types = {}
+        for effect_id, (effect, arg, _, _) in self.effects.items():
+            type_id = effect_registry.resolve(effect)
+            if type_id is None:
+                continue
+            effect_registry.columns[type_id].add(effect_id, self, arg)
+            self.effect_types[type_id] = self.effect_types.get(type_id, 0) + 1
+        if self.effects:
+            top = max(self.effects)
+            if next(effect_ids) <= top:
+                effect_ids = itertools.count(top + 1)
+
+    def query_effects(self) -> Dict[int, tuple]:
         """Returns all current effects."""
-        current_time = int(time.time())
-        expired = [eid for eid, (_, _, dur, start) in self.effects.items() if dur > 0 and current_time >= start + dur]
-        for eid in expired:
-            self.remove_effect(None, eid)  # Pass None as obj since it’s expired
         return self.effects.copy()
 
-    def query_active_effects(self) -> List[str]:
+    def query_active_effects(self) -> List[int]:
         """Returns the list of active effect IDs."""
         return self.active_effects.copy()
 
     async def check_effects(self, obj: MudObject):
         """Checks and updates effects, notifying if needed."""
-        current_time = int(time.time())
         for effect_id, (effect, arg, duration, start) in list(self.effects.items()):
-            if duration > 0 and current_time >= start + duration:
-                self.remove_effect(obj, effect_id)
-            else:
-                handler = driver.load_object(effect)
-                if handler and hasattr(handler, "update_effect"):
-                    await handler.update_effect(obj, arg)
+            handler = effect_registry.query_handler(effect)
+            if handler and hasattr(handler, "update_effect"):
+                await handler.update_effect(obj, arg)
         
         # Forgotten Realms flair (2025)
-        if "mystra_blessing" in [eid.split("_")[0] for eid in self.active_effects]:
+        if effect_registry.type_ids.get(MYSTRA_BLESSING) in self.effect_types:
             await obj.send("The Weave pulses around you, Mystra’s favor enduring.\n")
 
     def stats(self, obj: MudObject) -> List[tuple]:
@@ -87,4 +224,6 @@ class Effects:
 
 async def init(driver_instance):
     driver = driver_instance
-    # No global instance; Effects is a mixin class for objects like Room and Living
\ No newline at end of file
+    driver.effect_registry = effect_registry
+    asyncio.create_task(effect_registry.update_loop())
+    # Effects itself is a mixin class for objects like Room and Living
\ No newline at end of file
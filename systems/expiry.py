@@ -0,0 +1,110 @@
+# /mnt/home2/mud/systems/expiry.py
+# Imported to: property.py, light.py, extra_look.py, effects.py
+# Imports from: driver.py
+
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from ..driver import driver, logger, MudObject
+from heapq import heappush, heappop
+import asyncio
+import time
+
+EAGER = True  # Loaded at boot, not on first use: runs the expiry sweep
+
+EXPIRY_TICK = 1  # Seconds between sweeps; deadlines are whole seconds
+
+class ExpiryService:
+    def __init__(self):
+        self.buckets: Dict[int, Dict[Tuple, Tuple]] = {}  # {deadline: {(owner, method, key): args}}
+        self.deadlines: Dict[Tuple, int] = {}  # {(owner, method, key): deadline}
+        self.heap: List[int] = []  # Deadlines that have a bucket, each pushed once
+        self.owned: Dict[MudObject, set] = {}  # {owner: its pending entries}
+        self.fired = 0
+        self.sweeps = 0
+
+    def schedule(self, owner: MudObject, method: str, key: Hashable, duration: int, *args: Any) -> int:
+        """Calls owner.method(*args) once duration seconds have passed, replacing any pending entry for key."""
+        self.cancel(owner, method, key)
+        deadline = int(time.time()) + max(0, duration)
+        bucket = self.buckets.get(deadline)
+        if bucket is None:
+            bucket = self.buckets[deadline] = {}
+            heappush(self.heap, deadline)
+        entry = (owner, method, key)
+        bucket[entry] = args
+        self.deadlines[entry] = deadline
+        self.owned.setdefault(owner, set()).add(entry)
+        return deadline
+
+    def cancel(self, owner: MudObject, method: str, key: Hashable) -> bool:
+        """Drops a pending expiry; empty buckets are skipped when their time comes."""
+        entry = (owner, method, key)
+        deadline = self.deadlines.pop(entry, None)
+        if deadline is None:
+            return False
+        bucket = self.buckets.get(deadline)
+        if bucket:
+            bucket.pop(entry, None)
+        self._disown(entry)
+        return True
+
+    def _disown(self, entry: Tuple):
+        pending = self.owned.get(entry[0])
+        if pending is not None:
+            pending.discard(entry)
+            if not pending:
+                del self.owned[entry[0]]
+
+    def cancel_owner(self, owner: MudObject):
+        """Drops every pending expiry of an object, e.g. when it is destructed."""
+        for entry in list(self.owned.get(owner, ())):
+            self.cancel(*entry)
+
+    def query_remaining(self, owner: MudObject, method: str, key: Hashable) -> Optional[int]:
+        """Returns the seconds left before an entry fires, or None if nothing is pending."""
+        deadline = self.deadlines.get((owner, method, key))
+        if deadline is None:
+            return None
+        return max(0, deadline - int(time.time()))
+
+    def run_due(self, now: Optional[int] = None) -> int:
+        """Fires every entry whose deadline has passed, one bucket at a time."""
+        if now is None:
+            now = int(time.time())
+        fired = 0
+        while self.heap and self.heap[0] <= now:
+            bucket = self.buckets.pop(heappop(self.heap), None)
+            for entry, args in (bucket or {}).items():
+                if self.deadlines.pop(entry, None) is None:
+                    continue  # Cancelled by an earlier expiry in this batch
+                self._disown(entry)
+                owner, method, _ = entry
+                try:
+                    getattr(owner, method)(*args)
+                except Exception as e:
+                    logger.error(f"Expiry {method} on {getattr(owner, 'oid', owner)} failed: {e}")
+                fired += 1
+        self.fired += fired
+        self.sweeps += 1
+        return fired
+
+    async def expiry_loop(self):
+        """Sweeps due expirations every tick."""
+        while True:
+            await asyncio.sleep(EXPIRY_TICK)
+            if self.heap:
+                self.run_due()
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("pending expirations", len(self.deadlines)),
+            ("pending buckets", len(self.buckets)),
+            ("expirations fired", self.fired),
+            ("sweeps", self.sweeps),
+        ]
+
+expiry = ExpiryService()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.expiry = expiry
+    asyncio.create_task(expiry.expiry_loop())
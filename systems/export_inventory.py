@@ -4,49 +4,64 @@
 
 from typing import List, Optional, Union
 from ..driver import driver, MudObject
+from .lighting import lighting
+from .noun_index import NounIndex
+from .containment import containment
 import asyncio
 
 class ExportInventory:
+    inventory = property(containment.contents)  # Objects in this container/room, kept by the containment tree
+
     def __init__(self):
-        self.inventory: List[MudObject] = []  # Objects in this container/room
+        self.noun_index: Optional[NounIndex] = None  # Built on first lookup
 
     def setup(self, obj: MudObject):
         """Sets up inventory attributes on an object."""
-        obj.inventory = self.inventory.copy()
+        containment.contents(obj)
 
     def add_inventory(self, item: MudObject) -> bool:
         """Adds an item to the inventory."""
-        if item in self.inventory:
+        if not containment.add(self, item):
             return False
-        self.inventory.append(item)
+        if getattr(self, "noun_index", None):
+            self.noun_index.add(item)
+        if driver.handler("command_dispatcher") is not None:
+            driver.command_dispatcher.source_changed(self)
         item.environment = lambda: driver.objects.get(item.attrs.get("env", None))
         return True
 
     def remove_inventory(self, item: MudObject) -> bool:
         """Removes an item from the inventory."""
-        if item not in self.inventory:
+        if not containment.remove(item, self):
             return False
-        self.inventory.remove(item)
+        if getattr(self, "noun_index", None):
+            self.noun_index.remove(item)
+        if driver.handler("command_dispatcher") is not None:
+            driver.command_dispatcher.source_changed(self)
         item.environment = None
         return True
 
+    def query_noun_index(self) -> NounIndex:
+        """Returns the name/alias/plural/adjective index of the inventory, building it if needed."""
+        if not getattr(self, "noun_index", None):
+            self.noun_index = NounIndex()
+            for item in self.inventory:
+                self.noun_index.add(item)
+        return self.noun_index
+
     def query_inventory(self) -> List[MudObject]:
         """Returns the current inventory."""
         return self.inventory.copy()
 
     def all_inventory(self) -> List[MudObject]:
         """Returns all inventory, including nested (2025 update)."""
-        all_items = self.inventory.copy()
-        for item in self.inventory:
-            if hasattr(item, "all_inventory"):
-                all_items.extend(item.all_inventory())
-        return all_items
+        return containment.all_inventory(self)
 
     async def query_contents(self, obj: MudObject, pattern: str, viewer: Optional[MudObject] = None) -> str:
         """Returns a formatted string of visible inventory contents."""
         if not self.inventory:
             return ""
-        dark = viewer.check_dark(obj.query_light()) if viewer else 0
+        dark = viewer.check_dark(lighting.query_light(obj)) if viewer else 0
         visible = [item for item in self.inventory if item.query_visible(viewer) and (not pattern or pattern in item.query_short())]
         if not visible:
             return "Nothing matches your gaze.\n" if pattern else ""
@@ -71,13 +86,14 @@ class ExportInventory:
 
     def find_inv_match(self, obj: MudObject, pattern: str, viewer: Optional[MudObject]) -> List[MudObject]:
         """Finds inventory items matching a pattern (2025 update)."""
+        visible = [item for item in self.inventory if item.query_visible(viewer)]
         if not pattern or pattern == "all":
-            return [item for item in self.inventory if item.query_visible(viewer)]
-        matches = []
-        for item in self.inventory:
-            if item.query_visible(viewer) and (pattern in item.query_short() or any(pattern in alias for alias in item.query_aliases())):
-                matches.append(item)
-        return matches
+            return visible
+        matches = self.query_noun_index().find(pattern, visible)
+        if matches:
+            return matches
+        # Fall back to partial matches on shorts and aliases
+        return [item for item in visible if pattern in item.query_short() or any(pattern in alias for alias in item.query_aliases())]
 
 async def init(driver_instance):
     driver = driver_instance
@@ -4,6 +4,7 @@
 
 from typing import List, Optional, Union
 from ..driver import driver, MudObject
+from .expiry import expiry
 import asyncio
 
 class ExtraLook:
@@ -39,12 +40,13 @@ class ExtraLook:
             return
         temp = (text.strip(), duration, int(time.time()))
         self.temp_looks.append(temp)
-        driver.call_out(lambda: self.remove_temp_look(temp), duration)
+        expiry.schedule(self, "remove_temp_look", temp, duration, temp)
 
     def remove_temp_look(self, look: tuple) -> bool:
         """Removes a temporary extra look."""
         if look in self.temp_looks:
             self.temp_looks.remove(look)
+            expiry.cancel(self, "remove_temp_look", look)
             return True
         return False
 
@@ -54,7 +56,7 @@ class ExtraLook:
 
     def query_temp_looks(self) -> List[tuple]:
         """Returns the list of temporary extra looks."""
-        return [look for look in self.temp_looks if look[2] + look[1] > int(time.time())]
+        return self.temp_looks.copy()
 
     async def calc_extra_look(self, obj: MudObject) -> str:
         """Calculates the combined extra look description."""
@@ -72,12 +74,8 @@ class ExtraLook:
                     driver.log_file("ERRORS", f"Invalid extra look function {look[1]} on {look[0].oid}\n")
 
         # Temporary looks (2025 feature)
-        current_time = int(time.time())
-        for look in self.temp_looks[:]:  # Copy to avoid modification during iteration
-            if look[2] + look[1] <= current_time:
-                self.temp_looks.remove(look)
-            else:
-                desc += look[0] + "\n"
+        for look in self.temp_looks:
+            desc += look[0] + "\n"
 
         # Forgotten Realms flair (2025)
         if obj.query_enchant() > 100 and "A faint arcane shimmer lingers here." not in desc:
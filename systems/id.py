@@ -1,24 +1,74 @@
 # /mnt/home2/mud/systems/id.py
 # Imported to: object.py
-# Imports from: driver.py
+# Imports from: driver.py, vocabulary.py
 
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 from ..driver import driver, MudObject
+from .noun_index import reindex
+from .vocabulary import vocabulary, Tokens
+
+ID_LISTS = ("alias", "faux_alias", "unique_faux_alias", "adjectives", "faux_adjectives",
+            "unique_faux_adjectives", "plurals", "plural_adjectives")
 
 class IdHandler:
+    """Identifier lists are kept as shared tuples of vocabulary tokens, replaced on every change."""
     def __init__(self):
         self.name = "object"
-        self.alias: List[str] = []
-        self.faux_alias: List[str] = []
-        self.unique_faux_alias: List[str] = []
-        self.adjectives: List[str] = []
-        self.faux_adjectives: List[str] = []
-        self.unique_faux_adjectives: List[str] = []
-        self.plurals: List[str] = []
-        self.plural_adjectives: List[str] = []
+        self.alias: Tokens = ()
+        self.faux_alias: Tokens = ()  # May repeat a token, one per faux source
+        self.unique_faux_alias: Tokens = ()
+        self.adjectives: Tokens = ()
+        self.faux_adjectives: Tokens = ()  # May repeat a token, one per faux source
+        self.unique_faux_adjectives: Tokens = ()
+        self.plurals: Tokens = ()
+        self.plural_adjectives: Tokens = ()
+        self.owner: Optional[MudObject] = None  # Object whose container index to refresh
+        self._id_set: Optional[FrozenSet[str]] = None
+        self._plural_set: Optional[FrozenSet[str]] = None
+        self._adjective_set: Optional[FrozenSet[str]] = None
+
+    def derive(self, owner: MudObject) -> "IdHandler":
+        """Returns a handler for a clone; the token tuples are immutable, so both sides share them."""
+        for build in (self.query_id_set, self.query_plural_set, self.query_adjective_set):
+            build()  # Build the frozensets once so every clone shares them
+        child = IdHandler.__new__(IdHandler)
+        child.__dict__.update(self.__dict__)
+        child.owner = owner
+        return child
+
+    def identifiers_changed(self):
+        """Drops the cached identifier sets and refreshes the owner's container index."""
+        self._id_set = self._plural_set = self._adjective_set = None
+        reindex(self.owner)
+
+    def _ids(self, no_faux: bool = False) -> Tokens:
+        if no_faux or not self.unique_faux_alias or not self.faux_id_allowed():
+            return self.alias
+        return vocabulary.share(self.alias + self.unique_faux_alias)
+
+    def _adjective_ids(self, no_faux: bool = False) -> Tokens:
+        if no_faux or not self.unique_faux_adjectives or not self.faux_id_allowed():
+            return self.adjectives
+        return vocabulary.share(self.adjectives + self.unique_faux_adjectives)
+
+    def query_id_set(self) -> FrozenSet[str]:
+        if self._id_set is None:
+            self._id_set = vocabulary.word_set(vocabulary.share((vocabulary.intern(self.name),) + self._ids()))
+        return self._id_set
+
+    def query_plural_set(self) -> FrozenSet[str]:
+        if self._plural_set is None:
+            self._plural_set = vocabulary.word_set(self.plurals)
+        return self._plural_set
+
+    def query_adjective_set(self) -> FrozenSet[str]:
+        if self._adjective_set is None:
+            self._adjective_set = vocabulary.word_set(self._adjective_ids())
+        return self._adjective_set
 
     def set_name(self, str_: str):
-        self.name = str_
+        self.name = vocabulary.canonical(str_)
+        self.identifiers_changed()
 
     def query_name(self) -> str:
         return self.name
@@ -27,54 +77,57 @@ class IdHandler:
         return self.name.capitalize()
 
     def set_aliases(self, str_: List[str]):
-        self.alias = str_
+        self.alias = vocabulary.encode(str_)
+        self.identifiers_changed()
 
     def add_alias(self, str_: str | List[str]):
-        if isinstance(str_, list):
-            self.alias.extend([s for s in str_ if s not in self.alias])
-        elif str_ not in self.alias:
-            self.alias.append(str_)
+        self.alias = vocabulary.extend(self.alias, str_ if isinstance(str_, list) else [str_])
+        self.identifiers_changed()
 
     def remove_alias(self, str_: str) -> bool:
-        if str_ in self.alias:
-            self.alias.remove(str_)
-            return True
-        return False
+        alias = vocabulary.without(self.alias, str_)
+        if alias is self.alias:
+            return False
+        self.alias = alias
+        self.identifiers_changed()
+        return True
 
     def query_alias(self, no_faux: bool = False) -> List[str]:
-        if no_faux or not self.unique_faux_alias or not self.faux_id_allowed():
-            return self.alias.copy()
-        return self.alias + self.unique_faux_alias
+        return vocabulary.decode(self._ids(no_faux))
 
     def add_faux_alias(self, str_: str | List[str]):
         if isinstance(str_, list):
             for s in str_:
                 self.add_faux_alias(s)
-        elif str_ not in self.alias:
-            self.faux_alias.append(str_)
-            if str_ not in self.unique_faux_alias:
-                self.unique_faux_alias.append(str_)
+        elif vocabulary.intern(str_) not in self.alias:
+            self.faux_alias = vocabulary.share(self.faux_alias + (vocabulary.intern(str_),))
+            self.unique_faux_alias = vocabulary.extend(self.unique_faux_alias, [str_])
+        self.identifiers_changed()
 
     def remove_faux_alias(self, str_: str) -> bool:
-        if str_ in self.faux_alias:
-            self.faux_alias.remove(str_)
-            if str_ not in self.faux_alias:
-                self.unique_faux_alias = [x for x in self.unique_faux_alias if x != str_]
-            return True
-        return False
+        token = vocabulary.intern(str_)
+        if token not in self.faux_alias:
+            return False
+        faux = list(self.faux_alias)
+        faux.remove(token)
+        self.faux_alias = vocabulary.share(faux)
+        if token not in self.faux_alias:
+            self.unique_faux_alias = vocabulary.without(self.unique_faux_alias, str_)
+        self.identifiers_changed()
+        return True
 
     def query_faux_alias(self) -> List[str]:
-        return self.faux_alias.copy()
+        return vocabulary.decode(self.faux_alias)
 
     def query_unique_faux_alias(self) -> List[str]:
-        return self.unique_faux_alias.copy()
+        return vocabulary.decode(self.unique_faux_alias)
 
     def faux_id_allowed(self) -> bool:
         # Placeholder: assumes no previous objects ignore identifiers
         return True
 
     def id(self, str_: str) -> bool:
-        return str_ == self.name or str_ in self.query_alias()
+        return str_ in self.query_id_set()
 
     def full_id(self, str_: str) -> bool:
         words = [w for w in str_.split() if w]
@@ -82,109 +135,108 @@ class IdHandler:
             return False
         name = words[-1]
         adjectives = words[:-1]
-        if not (self.id(name) or self.id_plural(name)):
+        if name not in self.query_id_set() and name not in self.query_plural_set():
             return False
-        return all(self.id_adjective(adj) for adj in adjectives)
+        return self.query_adjective_set().issuperset(adjectives)
 
     def set_plurals(self, str_: List[str]):
-        self.plurals = str_
+        self.plurals = vocabulary.encode(str_)
+        self.identifiers_changed()
 
     def add_plural(self, str_: str | List[str]):
-        if isinstance(str_, list):
-            self.plurals.extend([s for s in str_ if s not in self.plurals])
-        elif str_ not in self.plurals:
-            self.plurals.append(str_)
+        self.plurals = vocabulary.extend(self.plurals, str_ if isinstance(str_, list) else [str_])
+        self.identifiers_changed()
 
     def remove_plural(self, str_: str):
-        if str_ in self.plurals:
-            self.plurals.remove(str_)
+        self.plurals = vocabulary.without(self.plurals, str_)
+        self.identifiers_changed()
 
     def add_plurals(self, str_: List[str]):
-        self.plurals.extend([s for s in str_ if s not in self.plurals])
+        self.plurals = vocabulary.extend(self.plurals, str_)
+        self.identifiers_changed()
 
     def query_plurals(self) -> List[str]:
-        return self.plurals.copy()
+        return vocabulary.decode(self.plurals)
 
     def id_plural(self, str_: str) -> bool:
-        return str_ in self.plurals
+        return str_ in self.query_plural_set()
 
     def set_adjectives(self, str_: List[str]):
-        self.adjectives = str_
+        self.adjectives = vocabulary.encode(str_)
+        self.identifiers_changed()
 
     def add_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
-            self.adjectives.extend([s for s in str_ if s not in self.adjectives])
+            self.adjectives = vocabulary.extend(self.adjectives, str_)
         elif isinstance(str_, str):
-            words = str_.split()
-            for word in words:
-                if word not in self.adjectives:
-                    self.adjectives.append(word)
+            self.adjectives = vocabulary.extend(self.adjectives, str_.split())
+        self.identifiers_changed()
 
     def remove_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
             for s in str_:
                 self.remove_adjective(s)
-        elif str_ in self.adjectives:
-            self.adjectives.remove(str_)
+        else:
+            self.adjectives = vocabulary.without(self.adjectives, str_)
+        self.identifiers_changed()
 
     def add_faux_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
             for s in str_:
                 self.add_faux_adjective(s)
         elif isinstance(str_, str):
-            words = [w for w in str_.split() if w not in self.adjectives]
-            for word in words:
-                self.faux_adjectives.append(word)
-                if word not in self.unique_faux_adjectives:
-                    self.unique_faux_adjectives.append(word)
+            tokens = tuple(vocabulary.intern(w) for w in str_.split())
+            tokens = tuple(t for t in tokens if t not in self.adjectives)
+            self.faux_adjectives = vocabulary.share(self.faux_adjectives + tokens)
+            self.unique_faux_adjectives = vocabulary.share(dict.fromkeys(self.unique_faux_adjectives + tokens))
+        self.identifiers_changed()
 
     def remove_faux_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
             for s in str_:
                 self.remove_faux_adjective(s)
-        elif str_ in self.faux_adjectives:
-            self.faux_adjectives.remove(str_)
-            if str_ not in self.faux_adjectives:
-                self.unique_faux_adjectives = [x for x in self.unique_faux_adjectives if x != str_]
+        elif vocabulary.intern(str_) in self.faux_adjectives:
+            token = vocabulary.intern(str_)
+            faux = list(self.faux_adjectives)
+            faux.remove(token)
+            self.faux_adjectives = vocabulary.share(faux)
+            if token not in self.faux_adjectives:
+                self.unique_faux_adjectives = vocabulary.without(self.unique_faux_adjectives, str_)
+        self.identifiers_changed()
 
     def query_faux_adjectives(self) -> List[str]:
-        return self.faux_adjectives.copy()
+        return vocabulary.decode(self.faux_adjectives)
 
     def query_unique_faux_adjectives(self) -> List[str]:
-        return self.unique_faux_adjectives.copy()
+        return vocabulary.decode(self.unique_faux_adjectives)
 
     def query_adjectives(self, no_faux: bool = False) -> List[str]:
-        if no_faux or not self.unique_faux_adjectives or not self.faux_id_allowed():
-            return self.adjectives.copy()
-        return self.adjectives + self.unique_faux_adjectives
+        return vocabulary.decode(self._adjective_ids(no_faux))
 
     def id_adjective(self, word: str) -> bool:
-        return word in self.query_adjectives()
+        return word in self.query_adjective_set()
 
     def set_plural_adjectives(self, str_: List[str]):
-        self.plural_adjectives = str_
+        self.plural_adjectives = vocabulary.encode(str_)
 
     def add_plural_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
-            self.plural_adjectives.extend([s for s in str_ if s not in self.plural_adjectives])
+            self.plural_adjectives = vocabulary.extend(self.plural_adjectives, str_)
         elif isinstance(str_, str):
-            words = str_.split()
-            for word in words:
-                if word not in self.plural_adjectives:
-                    self.plural_adjectives.append(word)
+            self.plural_adjectives = vocabulary.extend(self.plural_adjectives, str_.split())
 
     def remove_plural_adjective(self, str_: str | List[str]):
         if isinstance(str_, list):
             for s in str_:
                 self.remove_plural_adjective(s)
-        elif str_ in self.plural_adjectives:
-            self.plural_adjectives.remove(str_)
+        else:
+            self.plural_adjectives = vocabulary.without(self.plural_adjectives, str_)
 
     def query_plural_adjectives(self) -> List[str]:
-        return self.plural_adjectives.copy()
+        return vocabulary.decode(self.plural_adjectives)
 
     def id_plural_adjective(self, word: str) -> bool:
-        return word in self.plural_adjectives
+        return vocabulary.token_ids.get(word) in self.plural_adjectives
 
     def parse_command_id_list(self) -> List[str]:
         return [self.name, self.oid] + self.query_alias()
@@ -4,6 +4,8 @@
 
 from typing import Dict, List, Optional, Union
 from ..driver import driver, MudObject
+from .lighting import lighting
+from .containment import containment
 import asyncio
 
 class Inventory:
@@ -58,11 +60,7 @@ class Inventory:
 
     def query_complete_weight(self) -> int:
         """Returns total weight including nested inventory."""
-        total = self.query_weight()
-        for item in self.carried:
-            if hasattr(item, "query_complete_weight"):
-                total += item.query_complete_weight()
-        return total
+        return containment.query_complete_weight(self)
 
     async def adjust_encumbrance(self, obj: MudObject, item: MudObject, penalty: int):
         """Adjusts encumbrance for an item (2025 feature)."""
@@ -78,7 +76,7 @@ class Inventory:
         """Lists carried inventory for viewing."""
         if not self.carried:
             return "Nothing is carried here.\n"
-        dark = viewer.check_dark(obj.query_light()) if viewer else 0
+        dark = viewer.check_dark(lighting.query_light(obj)) if viewer else 0
         visible = [item for item in self.carried if item.query_visible(viewer)]
         if not visible:
             return "No visible burdens are borne.\n"
@@ -0,0 +1,235 @@
+# /mnt/home2/mud/systems/journal.py
+# Imported to: player_handler.py, library.py
+# Imports from: driver.py
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from ..driver import driver, logger
+import asyncio
+import copy
+import json
+import os
+
+EAGER = True  # Loaded at boot, not on first use: runs the compaction loop
+
+COMPACT_AFTER = 64  # Log records before a journal is queued for compaction
+COMPACT_TICK = 30  # Seconds between compaction sweeps
+COMPACT_BATCH = 20  # Journals compacted per sweep, so one tick never stalls the loop
+JOURNAL_FSYNC = True  # Sync every appended record to disk before save returns
+
+Leaf = Tuple[str, Optional[str]]  # (field, key inside a dict field or None for the field itself)
+DICT_MARK = object()  # Leaf value marking a dict field whose keys are journaled one by one
+
+def encode(value: Any) -> str:
+    return "{}" if value is DICT_MARK else json.dumps(value, default=str)
+
+def leaves(state: Dict) -> Dict[Leaf, Any]:
+    """Flattens a record into leaves, one level into dict fields."""
+    found = {}
+    for field, value in state.items():
+        if isinstance(value, dict):
+            found[(field, None)] = DICT_MARK
+            for key, item in value.items():
+                found[(field, str(key))] = item
+        else:
+            found[(field, None)] = value
+    return found
+
+def apply(state: Dict, record: Dict):
+    """Replays one log record onto state. Records only assign or delete, so replaying twice is harmless."""
+    for field, key in record.get("del", []):
+        if key is None:
+            state.pop(field, None)
+        elif isinstance(state.get(field), dict):
+            state[field].pop(key, None)
+    for field, key, value in record.get("set", []):
+        if key is None:
+            state[field] = value
+        else:
+            if not isinstance(state.get(field), dict):
+                state[field] = {}
+            state[field][key] = value
+
+class Journal:
+    """A snapshot file plus an append-only log of changed fields beside it."""
+    def __init__(self, path: str):
+        self.path = path
+        self.log_path = path + ".log"
+        self.folding_path = path + ".log.folding"  # The log moved aside while compaction folds it
+        self.saved: Optional[Dict[Leaf, Any]] = None  # Copies of the leaves as last written, None until loaded or saved
+        self.records = 0  # Records in the log since the last compaction
+        self.appended = 0  # Bytes appended since this journal was opened
+
+    def _records(self, path: str) -> Tuple[List[Dict], int]:
+        """Reads one log up to its first torn record, returning (records, good bytes)."""
+        records = []
+        good = 0
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    records.append(record)
+                    good += len(line)
+        except FileNotFoundError:
+            pass
+        return records, good
+
+    def _snapshot(self) -> Optional[Dict]:
+        """Reads the snapshot plus any log set aside for compaction, which is older than the live log.
+        The set-aside log is read first: a fold replaces the snapshot before removing it."""
+        folding = self._records(self.folding_path)[0]
+        state = None
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        for record in folding:
+            state = state if state is not None else {}
+            apply(state, record)
+        return state
+
+    def _read(self) -> Optional[Dict]:
+        """Reads the snapshot and replays the logs, cutting off a torn final record."""
+        state = self._snapshot()
+        records, good = self._records(self.log_path)
+        for record in records:
+            state = state if state is not None else {}
+            apply(state, record)
+        self.records = len(records)
+        if os.path.exists(self.log_path) and good < os.path.getsize(self.log_path):
+            logger.error(f"Journal {self.log_path} had a torn record, truncated.")
+            with open(self.log_path, "r+b") as f:
+                f.truncate(good)
+        return state
+
+    def load(self) -> Optional[Dict]:
+        """Returns the saved record, or None if nothing was ever saved."""
+        state = self._read()
+        self.saved = copy.deepcopy(leaves(state)) if state is not None else None
+        return state
+
+    def save(self, state: Dict) -> int:
+        """Appends whichever fields changed since the last save, returning the bytes written."""
+        if self.saved is None and any(os.path.exists(path) for path in (self.path, self.log_path, self.folding_path)):
+            self.load()
+        current = leaves(state)
+        previous = self.saved or {}
+        missing = object()
+        sets = [leaf for leaf, value in current.items() if previous.get(leaf, missing) != value]
+        dels = [leaf for leaf in previous if leaf not in current]
+        if not sets and not dels:
+            return 0
+        parts = [f"[{json.dumps(leaf[0])},{json.dumps(leaf[1])},{encode(current[leaf])}]" for leaf in sets]
+        line = '{"set":[' + ",".join(parts) + '],"del":' + json.dumps([list(leaf) for leaf in dels]) + "}\n"
+        data = line.encode()
+        with open(self.log_path, "ab") as f:
+            f.write(data)
+            if JOURNAL_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+        for leaf in sets:
+            value = current[leaf]
+            previous[leaf] = value if value is DICT_MARK else copy.deepcopy(value)
+        for leaf in dels:
+            del previous[leaf]
+        self.saved = previous
+        self.records += 1
+        self.appended += len(data)
+        if self.records >= COMPACT_AFTER:
+            journals.pending.add(self)
+        return len(data)
+
+    def set_aside(self) -> bool:
+        """Moves the log aside for folding, so saves carry on into a fresh one meanwhile.
+        A log left aside by a crash is folded first and the live log waits for the next sweep."""
+        if not os.path.exists(self.folding_path):
+            if not os.path.exists(self.log_path):
+                return False
+            os.replace(self.log_path, self.folding_path)
+            self.records = 0
+        return True
+
+    def fold(self):
+        """Writes the snapshot plus the set-aside log as the new snapshot; safe off the event loop.
+        The snapshot is replaced before the old log is removed, so a crash in between only
+        replays records the snapshot already holds."""
+        state = self._snapshot()
+        if state is not None:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(state, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.path + ".tmp", self.path)
+        if os.path.exists(self.folding_path):
+            os.remove(self.folding_path)
+
+    def compact(self):
+        """Folds the log into a fresh snapshot in place."""
+        if self.set_aside():
+            self.fold()
+            journals.compactions += 1
+
+    def remove(self):
+        for path in (self.path, self.log_path, self.folding_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.saved = None
+        self.records = 0
+        journals.pending.discard(self)
+
+class JournalService:
+    def __init__(self):
+        self.journals: Dict[str, Journal] = {}  # {snapshot path: journal}
+        self.pending: Set[Journal] = set()  # Journals whose logs are due for compaction
+        self.compactions = 0
+
+    def open(self, path: str) -> Journal:
+        found = self.journals.get(path)
+        if found is None:
+            found = self.journals[path] = Journal(path)
+        return found
+
+    def close(self, path: str):
+        """Forgets a journal's cached leaves, e.g. once its player record is evicted."""
+        journal = self.journals.get(path)
+        if journal is not None and journal not in self.pending:
+            del self.journals[path]
+
+    async def compact_pending(self, limit: int = COMPACT_BATCH) -> int:
+        """Folds due journals one at a time in the default executor, keeping json and fsync off the loop."""
+        loop = asyncio.get_running_loop()
+        done = 0
+        while self.pending and done < limit:
+            journal = self.pending.pop()
+            try:
+                if journal.set_aside():
+                    await loop.run_in_executor(None, journal.fold)
+                    self.compactions += 1
+            except Exception as e:
+                logger.error(f"Journal compaction of {journal.path} failed: {e}")
+            done += 1
+        return done
+
+    async def compact_loop(self):
+        """Compacts a batch of long logs every COMPACT_TICK seconds."""
+        while True:
+            await asyncio.sleep(COMPACT_TICK)
+            if self.pending:
+                await self.compact_pending()
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("open journals", len(self.journals)),
+            ("journals awaiting compaction", len(self.pending)),
+            ("compactions", self.compactions),
+        ]
+
+journals = JournalService()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.journals = journals
+    asyncio.create_task(journals.compact_loop())
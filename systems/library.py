@@ -1,6 +1,7 @@
 # /mnt/home2/mud/systems/library.py
 from typing import Dict, List, Optional
 from ..driver import driver, Player, MudObject
+from .journal import journals
 import asyncio
 import os
 
@@ -12,15 +13,16 @@ class Library:
 
     def load_library(self):
         try:
-            data = driver.load_object(self.SAVE_FILE)
+            data = journals.open(self.SAVE_FILE).load()
             if data:
                 self.player_quests = data.get("player_quests", {})
         except:
             self.player_quests = {}
 
     def save_library(self):
+        """Journals only the players whose quest lists changed since the last save."""
         data = {"player_quests": self.player_quests}
-        driver.save_object(self.SAVE_FILE, data)
+        journals.open(self.SAVE_FILE).save(data)
 
     def query_quest_points(self, name: str) -> int:
         if not name or not driver.player_handler.test_user(name):
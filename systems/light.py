@@ -4,6 +4,9 @@
 
 from typing import Optional
 from ..driver import driver, MudObject
+from .containment import containment
+from .expiry import expiry
+from .lighting import lighting, DARK_BELOW, BRIGHT_ABOVE
 import asyncio
 
 class Light:
@@ -23,22 +26,20 @@ class Light:
     def set_light(self, level: int):
         """Sets the base light level."""
         self.light_level = max(0, min(100, level))
+        containment.refresh(self)
+
+    def query_my_light(self) -> int:
+        """Returns the light this object gives off by itself, including temporary effects."""
+        return self.light_level + self.temp_light
 
     def query_light(self) -> int:
-        """Returns the total light level, including temporary effects."""
-        total = self.light_level
-        if self.temp_duration > 0:
-            if int(time.time()) < self.temp_start + self.temp_duration:
-                total += self.temp_light
-            else:
-                self.temp_light = 0
-                self.temp_duration = 0
-                self.temp_start = 0
-        return max(0, min(100, total))
+        """Returns the total light level, including temporary effects and lit contents."""
+        return max(0, min(100, self.query_my_light() + containment.query_inner_light(self)))
 
     def adjust_light(self, amount: int):
         """Adjusts the base light level."""
         self.light_level = max(0, min(100, self.light_level + amount))
+        containment.refresh(self)
 
     def add_temp_light(self, amount: int, duration: int):
         """Adds a temporary light effect (2025 feature)."""
@@ -47,28 +48,26 @@ class Light:
         self.temp_light = amount
         self.temp_duration = duration
         self.temp_start = int(time.time())
-        driver.call_out(lambda: self.clear_temp_light(), duration)
+        containment.refresh(self)
+        expiry.schedule(self, "clear_temp_light", None, duration)
 
     def clear_temp_light(self):
         """Clears the temporary light effect."""
         self.temp_light = 0
         self.temp_duration = 0
         self.temp_start = 0
+        expiry.cancel(self, "clear_temp_light", None)
+        containment.refresh(self)
 
     async def check_dark(self, obj: MudObject, viewer: Optional[MudObject] = None) -> int:
         """Determines visibility based on light (2025 update)."""
-        env_light = obj.query_light() if obj else 0
-        viewer_light = viewer.query_light() if viewer else 0
-        total_light = max(env_light, viewer_light)
-
-        # Forgotten Realms: Moonlight from Selûne
-        if viewer and viewer.environment() and viewer.environment().query_property("location") == "outside":
-            moon_state = driver.weather_handler.query_moon_state()
-            total_light += moon_state * 5  # 0-30 from moon phases
-
-        if total_light < 10:
+        # Carried lights and Selûne's moonlight are already part of the cached level
+        total_light = lighting.query_light(obj)
+        if viewer:
+            return lighting.check_dark(viewer, total_light)
+        if total_light < DARK_BELOW:
             return -1  # Too dark
-        elif total_light > 90:
+        elif total_light > BRIGHT_ABOVE:
             return 1  # Too bright
         return 0  # Visible
 
@@ -0,0 +1,122 @@
+# /mnt/home2/mud/systems/lighting.py
+# Imported to: containment.py, living.py, room.py, description.py, export_inventory.py, inventory.py, light.py
+# Imports from: driver.py, race_handler.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from ..driver import driver, MudObject
+from .race_handler import race_handler
+
+DARK_BELOW = 10  # Light under this is too dark for ordinary eyes
+BRIGHT_ABOVE = 90  # Light over this is too bright for ordinary eyes
+NATURAL_LIGHT_SCALE = 80  # Full daylight as a share of the 0-100 light scale
+DARKVISION = {"darkvision_60": 60, "darkvision_120": 120}  # Race trait -> darkvision range
+
+class LightingHandler:
+    def __init__(self):
+        self.levels: Dict[MudObject, Tuple[int, Any]] = {}  # {room: (effective light, weather stamp or None)}
+        self.visibility: Dict[MudObject, Tuple[int, Any]] = {}  # {room: (visibility, weather stamp or None)}
+        self.thresholds: Dict[MudObject, Tuple[int, int]] = {}  # {viewer: (dark below, bright above)}
+        self.hits = 0
+        self.misses = 0
+
+    def weather_stamp(self) -> Any:
+        """Changes whenever the weather snapshot or the day/night state does."""
+        weather = driver.handler("weather_handler")
+        if not weather:
+            return None
+        return weather.query_last_update(), weather.query_day(None)
+
+    def _outside(self, room: MudObject) -> bool:
+        return room.attrs.get("location") == "outside"
+
+    def invalidate(self, room: MudObject):
+        """Forgets a cached light level after a light source in or on room changes."""
+        self.levels.pop(room, None)
+
+    def invalidate_viewer(self, viewer: MudObject):
+        """Forgets a viewer's thresholds after their race or sight effects change."""
+        self.thresholds.pop(viewer, None)
+
+    def forget(self, thing: MudObject):
+        self.levels.pop(thing, None)
+        self.visibility.pop(thing, None)
+        self.thresholds.pop(thing, None)
+
+    def query_light(self, room: Optional[MudObject]) -> int:
+        """Returns the effective light in room: its own and carried light, plus daylight outside."""
+        if room is None:
+            return 0
+        outside = self._outside(room)
+        stamp = self.weather_stamp() if outside else None
+        cached = self.levels.get(room)
+        if cached is not None and cached[1] == stamp:
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        level = room.query_light() if hasattr(room, "query_light") else 0
+        if outside and stamp is not None:
+            level += driver.weather_handler.query_darkness(room) * NATURAL_LIGHT_SCALE // 100
+        level = max(0, min(100, level))
+        self.levels[room] = (level, stamp)
+        return level
+
+    def query_visibility(self, room: Optional[MudObject]) -> int:
+        """Returns how far one can see in room, percent, with weather applied outside."""
+        if room is None:
+            return 100
+        outside = self._outside(room)
+        stamp = self.weather_stamp() if outside else None
+        cached = self.visibility.get(room)
+        if cached is not None and cached[1] == stamp:
+            return cached[0]
+        if outside and stamp is not None:
+            value = driver.weather_handler.query_visibility(room)
+        else:
+            value = room.query_visibility() if hasattr(room, "query_visibility") else 100
+        self.visibility[room] = (value, stamp)
+        return value
+
+    def query_thresholds(self, viewer: MudObject) -> Tuple[int, int]:
+        """Returns (dark below, bright above) for a viewer, from race traits and sight effects."""
+        found = self.thresholds.get(viewer)
+        if found is not None:
+            return found
+        darkvision = 0
+        bright = BRIGHT_ABOVE
+        race = race_handler.query_race(getattr(viewer, "race", None) or viewer.attrs.get("race", ""))
+        for trait in (race or {}).get("traits", []):
+            darkvision = max(darkvision, DARKVISION.get(trait, 0))
+            if trait == "celestial_light":
+                bright = 100
+        for effect, arg, _, _ in getattr(viewer, "effects", {}).values():
+            if effect.endswith("/darkvision") and isinstance(arg, int):
+                darkvision = max(darkvision, arg)
+        found = self.thresholds[viewer] = (max(0, DARK_BELOW - darkvision // 12), bright)
+        return found
+
+    def check_dark(self, viewer: MudObject, light: int) -> int:
+        """Returns -1 if light is too dark for viewer, 1 if too bright, else 0."""
+        dark_below, bright_above = self.query_thresholds(viewer)
+        if light < dark_below:
+            return -1
+        if light > bright_above:
+            return 1
+        return 0
+
+    def check_room_dark(self, viewer: MudObject, room: Optional[MudObject]) -> int:
+        """check_dark against room's cached effective light."""
+        return self.check_dark(viewer, self.query_light(room))
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("cached room light levels", len(self.levels)),
+            ("cached viewer thresholds", len(self.thresholds)),
+            ("light cache hits", self.hits),
+            ("light cache misses", self.misses),
+        ]
+
+lighting = LightingHandler()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.lighting = lighting
@@ -1,14 +1,18 @@
 # /mnt/home2/mud/systems/living.py
 from typing import Dict, List, Optional, Tuple, Union, Callable, ClassVar
-from ..driver import driver, Player, MudObject
+from ..driver import driver, Player, MudObject, PromotedAttrs
 from .classes import class_handler, ClassHandler
 from .quest import quest_handler, QuestHandler
 from .library import library, Library
+from .containment import containment
+from .lighting import lighting
 import asyncio
 import random
 import math
 
 class living_data:
+    __slots__ = ("handicap", "burden", "followers", "it_them", "to_drop", "burden_call")
+
     def __init__(self):
         self.handicap = 0
         self.burden = 0
@@ -49,10 +53,29 @@ ABS_FACING = {
 LENGTHEN = {"n": "north", "ne": "northeast", "e": "east", "se": "southeast",
             "s": "south", "sw": "southwest", "w": "west", "nw": "northwest"}
 
+# attrs keys read every combat round; kept in slots behind the PromotedAttrs shim.
+# "skills" stays in attrs: obj.skills is the skills handler's own table, not the same data.
+PROMOTED_ATTRS = ("hp", "gp", "in_combat", "action_defecit")
+ATTRS_SLOT = MudObject.attrs
+
 class Living(MudObject):
+    __slots__ = PROMOTED_ATTRS
+    inventory = property(containment.contents)
+
+    @property
+    def attrs(self) -> Dict:
+        return ATTRS_SLOT.__get__(self)
+
+    @attrs.setter
+    def attrs(self, value: Dict):
+        # Saves, logins and copyover assign plain dicts; rewrap them so the promoted keys stay in slots
+        if not isinstance(value, PromotedAttrs) or value.owner is not self:
+            value = PromotedAttrs(self, PROMOTED_ATTRS, value)
+        ATTRS_SLOT.__set__(self, value)
+
     def __init__(self, oid: str, name: str):
         super().__init__(oid, name)
-        self.attrs: Dict = {}
+        self.attrs: Dict = PromotedAttrs(self, PROMOTED_ATTRS)
         self._liv_data = living_data()
         self._messages = messages()
         self.alignment = 0
@@ -93,6 +116,9 @@ class Living(MudObject):
         gender = self.attrs.get("gender", 0)
         return {0: "it", 1: "him", 2: "her"}.get(gender, "it")
 
+    def check_dark(self, light: int) -> int:
+        return lighting.check_dark(self, light)
+
     def query_weight(self, actual: bool = False) -> int:
         if not actual and self.attrs.get("dead", False):
             return 0
@@ -106,7 +132,7 @@ class Living(MudObject):
 
     def calc_burden(self):
         self._liv_data.burden_call = None
-        burden = sum(obj.query_complete_weight() for obj in self.inventory)
+        burden = containment.query_inner_weight(self)
         for thing in self.attrs.get("wearing", []):
             burden -= thing.query_complete_weight() // 2
         hands = {}
@@ -331,7 +357,10 @@ class Living(MudObject):
             bits = verb.split()
             word = " ".join(bits[1:]) if len(bits) > 1 else ""
         verb = LENGTHEN.get(verb, verb)
-        exits = self.environment.attrs.get("exits", [])
+        if hasattr(self.environment, "query_exit_verbs"):
+            exits = self.environment.query_exit_verbs()
+        else:
+            exits = self.environment.attrs.get("exits", [])
         if verb not in exits:
             verb = self.find_abs(verb)
             if verb not in exits:
@@ -342,6 +371,17 @@ class Living(MudObject):
         # Placeholder for exit_move via room_handler
         return True
 
+    async def walk_towards(self, dest: Union[str, MudObject]) -> bool:
+        """Takes one step along the cached route towards a room."""
+        if not self.environment or driver.handler("pathfinding") is None:
+            return False
+        if isinstance(dest, MudObject):
+            dest = dest.oid
+        direc = driver.pathfinding.next_step(self.environment.oid, dest)
+        if not direc:
+            return False
+        return await self.exit_command(direc)
+
     def become_flummoxed(self):
         will = self.attrs.get("int", 10) * self.attrs.get("wis", 10)
         if will < random.randint(0, WILL_POWER):
@@ -352,7 +392,10 @@ class Living(MudObject):
             self.attrs["stop_fight"] = True
 
     async def run_away(self) -> bool:
-        direcs = self.environment.attrs.get("dest_dir", [])
+        if driver.handler("pathfinding") is not None and driver.pathfinding.query_exits(self.environment.oid):
+            direcs = [x for pair in driver.pathfinding.query_exits(self.environment.oid).items() for x in pair]
+        else:
+            direcs = self.environment.attrs.get("dest_dir", [])
         old_env = self.environment
         while direcs:
             i = random.randint(0, len(direcs) // 2 - 1) * 2
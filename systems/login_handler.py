@@ -1,121 +1,268 @@
 # Imported to: driver.py
-# Imports from: driver.py
+# Imports from: driver.py, passwords.py
 # /mnt/home2/mud/systems/login_handler.py
-from typing import Optional
-from ..driver import driver, Player, MudObject
+from typing import Any, Dict, List, Optional, Tuple
+from ..driver import driver, logger, Player, MudObject
+from .passwords import hash_password, verify_password
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
-import hashlib
+import itertools
 import sqlite3
+import threading
 import json
 import os
+import time
+
+DB_THREADS = 4  # Connections in the login database pool
+LOGIN_WORKERS = 4  # Password hashes in flight at once; the rest wait in the login queue
+LOGIN_RATE = 0.5  # Login attempts refilled per second for each address
+LOGIN_BURST = 5  # Attempts an address may make back to back
+BUCKET_IDLE = 600  # Seconds before an unused address bucket is dropped
+
+# Login queue priorities, lowest served first
+PRIORITY_LOGIN = 0  # Returning players
+PRIORITY_CREATE = 1  # New characters
+PRIORITY_REHASH = 2  # Upgrading an old hash after a successful login
+
+class LoginDB:
+    """sqlite access run on a small thread pool, one connection per thread, so queries never block the loop."""
+    def __init__(self, db_path: str, threads: int = DB_THREADS):
+        self.db_path = db_path
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="login-db")
+        self.local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.db_path, timeout=10)
+        return conn
+
+    def _run(self, sql: str, args: Tuple, fetch: bool) -> Any:
+        conn = self._connection()
+        cursor = conn.execute(sql, args)
+        if fetch:
+            return cursor.fetchone()
+        conn.commit()
+        return cursor.rowcount
+
+    async def fetchone(self, sql: str, args: Tuple = ()) -> Optional[Tuple]:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._run, sql, args, True)
+
+    async def execute(self, sql: str, args: Tuple = ()) -> int:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._run, sql, args, False)
+
+class LoginThrottle:
+    """Token bucket per address: LOGIN_BURST attempts at once, then LOGIN_RATE a second."""
+    def __init__(self, rate: float = LOGIN_RATE, burst: int = LOGIN_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, Tuple[float, float]] = {}  # {address: (tokens, last refill)}
+        self.refused = 0
+
+    def allow(self, address: str, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        tokens, last = self.buckets.get(address, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self.buckets[address] = (tokens, now)
+            self.refused += 1
+            return False
+        self.buckets[address] = (tokens - 1, now)
+        return True
+
+    def prune(self, now: Optional[float] = None):
+        """Drops buckets that have been idle long enough to be full again."""
+        if now is None:
+            now = time.monotonic()
+        for address in [a for a, (_, last) in self.buckets.items() if now - last > BUCKET_IDLE]:
+            del self.buckets[address]
+
+class LoginQueue:
+    """Runs password hashing in the driver's process pool, LOGIN_WORKERS jobs at a time,
+    taking returning players ahead of new characters and background rehashes."""
+    def __init__(self, workers: int = LOGIN_WORKERS):
+        self.workers = workers
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.order = itertools.count()
+        self.tasks: List[asyncio.Task] = []
+        self.done = 0
+
+    def start(self):
+        self.queue = asyncio.PriorityQueue()
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def submit(self, priority: int, func: Any, *args: Any) -> Any:
+        """Queues func(*args) for the process pool and waits for its result."""
+        if self.queue is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((priority, next(self.order), future, func, args))
+        return await future
+
+    async def worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, future, func, args = await self.queue.get()
+            try:
+                executor = getattr(driver, "executor", None)
+                result = await loop.run_in_executor(executor, func, *args)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.done += 1
+                self.queue.task_done()
+
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
 
 class LoginHandler:
     def __init__(self, db_path: str = "/mnt/home2/mud/players/mud.db"):
-        self.db = sqlite3.connect(db_path, check_same_thread=False)
-        self.db.execute("""
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS players (
-                name TEXT PRIMARY KEY, 
-                password TEXT, 
-                race TEXT, 
-                class TEXT, 
+                name TEXT PRIMARY KEY,
+                password TEXT,
+                race TEXT,
+                class TEXT,
                 data TEXT
             )
         """)
-        self.db.commit()
+        conn.commit()
+        conn.close()
+        self.db = LoginDB(db_path)
+        self.throttle = LoginThrottle()
+        self.queue = LoginQueue()
+        self.rehashed = 0
         self.races = ["human", "elf", "drow", "dwarf", "gnome", "halfling", "orc", "goblin", "dragonborn"]
         self.classes = ["fighter", "wizard", "cleric", "rogue"]  # 'thief' → 'rogue' per Forgotten Realms
 
     async def init(self, driver_instance):
         self.driver = driver_instance
+        self.queue.start()
+        driver_instance.login_handler = self
+
+    def admit(self, player: Player) -> bool:
+        """Spends one of the address's login tokens, refusing when its bucket is empty."""
+        address = getattr(player, "ip_address", None) or "unknown"
+        if len(self.throttle.buckets) > 10000:
+            self.throttle.prune()
+        return self.throttle.allow(address)
+
+    async def rehash(self, name: str, password: str):
+        """Replaces an old or weaker hash once the player has proven the password."""
+        try:
+            hashed = await self.queue.submit(PRIORITY_REHASH, hash_password, password)
+            await self.db.execute("UPDATE players SET password=? WHERE name=?", (hashed, name))
+            self.rehashed += 1
+        except Exception as e:
+            logger.error(f"Rehash for {name} failed: {e}")
 
     async def handle_login(self, player: Player) -> bool:
-    await player.send("Welcome to the Realms, traveler, under the gaze of Mystra...")
-    await asyncio.sleep(2)  # Shortened for 2025 responsiveness
-    await player.send("A portal shimmers before you in the Ethereal Veil...")
-    await asyncio.sleep(2)
-
-    await player.send("Enter your name (or 'new' to create, 'g' for name list): ")
-    name = await self.get_input(player)
-    if name.lower() == "g":
-        await player.send("Generated names: Zarathar, Elendir, Kaelith, Mirindra, Tharok...")
-        await player.send("Enter your name: ")
+        if not self.admit(player):
+            await player.send("Too many attempts from your address. Rest a moment, then try again.")
+            return False
+        await player.send("Welcome to the Realms, traveler, under the gaze of Mystra...")
+        await asyncio.sleep(2)  # Shortened for 2025 responsiveness
+        await player.send("A portal shimmers before you in the Ethereal Veil...")
+        await asyncio.sleep(2)
+
+        await player.send("Enter your name (or 'new' to create, 'g' for name list): ")
         name = await self.get_input(player)
-    elif name.lower() == "new":
-        return await self.create_character(player)
-    elif name:
-        cursor = self.db.execute("SELECT password, data FROM players WHERE name=?", (name,))
-        data = cursor.fetchone()
-        if data:
-            stored_pass, player_data = data
-            await player.send("Enter password: ")
-            password = await self.get_input(player)
-            if hashlib.sha256(password.encode()).hexdigest() == stored_pass:
-                player.name = name
-                player.attrs = json.loads(player_data) if player_data else {}
-                player.location = self.driver.objects["ethereal_veil_start"]
-                await player.send(await player.location.call("look", player))
-                await player.send("You materialize in the Ethereal Veil, blessed by Mystra.")
-                return True
+        if name.lower() == "g":
+            await player.send("Generated names: Zarathar, Elendir, Kaelith, Mirindra, Tharok...")
+            await player.send("Enter your name: ")
+            name = await self.get_input(player)
+        elif name.lower() == "new":
+            return await self.create_character(player)
+        if name:
+            data = await self.db.fetchone("SELECT password, data FROM players WHERE name=?", (name,))
+            if data:
+                stored_pass, player_data = data
+                await player.send("Enter password: ")
+                password = await self.get_input(player)
+                matches, stale = await self.queue.submit(PRIORITY_LOGIN, verify_password, password, stored_pass)
+                if matches:
+                    if stale:
+                        asyncio.create_task(self.rehash(name, password))
+                    player.name = name
+                    player.attrs = json.loads(player_data) if player_data else {}
+                    player.location = self.driver.objects["ethereal_veil_start"]
+                    await player.send(await player.location.call("look", player))
+                    await player.send("You materialize in the Ethereal Veil, blessed by Mystra.")
+                    return True
+                else:
+                    await player.send("Incorrect password!")
+                    return False
             else:
-                await player.send("Incorrect password!")
-                return False
-        else:
-            await player.send(f"No hero named {name} exists. Forge a new legend? (y/n): ")
-            if await self.get_input(player).lower() == "y":
-                return await self.create_character(player)
-    return False
+                await player.send(f"No hero named {name} exists. Forge a new legend? (y/n): ")
+                if (await self.get_input(player)).lower() == "y":
+                    return await self.create_character(player)
+        return False
 
     async def create_character(self, player: Player) -> bool:
-    await player.send("Choose a name (no numbers, symbols, or canon names like Elminster): ")
-    name = await self.get_input(player)
-    if not name or any(c in name.lower() for c in "1234567890!@#$%^&*()_+-={}[]|\\:;\"'<>?,./") or name.lower() in ["elminster", "drizzt"]:
-        await player.send("Invalid name! Use letters only, avoid famous heroes.")
-        return False
-    if self.db.execute("SELECT name FROM players WHERE name=?", (name,)).fetchone():
-        await player.send("That name is already taken!")
-        return False
-    await player.send("Enter password (min 6 chars): ")
-    password = await self.get_input(player)
-    if len(password) < 6:
-        await player.send("Password too short!")
-        return False
-    await player.send("Confirm password: ")
-    confirm = await self.get_input(player)
-    if password != confirm:
-        await player.send("Passwords don’t match!")
-        return False
-    hashed_pass = hashlib.sha256(password.encode()).hexdigest()
-    await player.send(f"Choose race ({', '.join(self.races)}): ")
-    race = await self.get_input(player).lower()
-    if race not in self.races:
-        await player.send("Invalid race!")
-        return False
-    await player.send(f"Choose class ({', '.join(self.classes)}): ")
-    class_ = await self.get_input(player).lower()
-    if class_ not in self.classes:
-        await player.send("Invalid class!")
-        return False
-    await player.send("Terms: No profanity, no harassment, respect the Realms. Agree? (yes/no): ")
-    if await self.get_input(player).lower() != "yes":
-        await player.send("You must agree to join the Realms!")
-        return False
+        await player.send("Choose a name (no numbers, symbols, or canon names like Elminster): ")
+        name = await self.get_input(player)
+        if not name or any(c in name.lower() for c in "1234567890!@#$%^&*()_+-={}[]|\\:;\"'<>?,./") or name.lower() in ["elminster", "drizzt"]:
+            await player.send("Invalid name! Use letters only, avoid famous heroes.")
+            return False
+        if await self.db.fetchone("SELECT name FROM players WHERE name=?", (name,)):
+            await player.send("That name is already taken!")
+            return False
+        await player.send("Enter password (min 6 chars): ")
+        password = await self.get_input(player)
+        if len(password) < 6:
+            await player.send("Password too short!")
+            return False
+        await player.send("Confirm password: ")
+        confirm = await self.get_input(player)
+        if password != confirm:
+            await player.send("Passwords don’t match!")
+            return False
+        hashing = asyncio.ensure_future(self.queue.submit(PRIORITY_CREATE, hash_password, password))
+        await player.send(f"Choose race ({', '.join(self.races)}): ")
+        race = (await self.get_input(player)).lower()
+        if race not in self.races:
+            hashing.cancel()
+            await player.send("Invalid race!")
+            return False
+        await player.send(f"Choose class ({', '.join(self.classes)}): ")
+        class_ = (await self.get_input(player)).lower()
+        if class_ not in self.classes:
+            hashing.cancel()
+            await player.send("Invalid class!")
+            return False
+        await player.send("Terms: No profanity, no harassment, respect the Realms. Agree? (yes/no): ")
+        if (await self.get_input(player)).lower() != "yes":
+            hashing.cancel()
+            await player.send("You must agree to join the Realms!")
+            return False
 
-    player.name = name
-    player.attrs = {"race": race, "class": class_, "skills": {}, "stats": {"hp": 100, "gp": 100}}
-    self.db.execute("INSERT INTO players (name, password, race, class, data) VALUES (?, ?, ?, ?, ?)",
-                    (name, hashed_pass, race, class_, json.dumps(player.attrs)))
-    self.db.commit()
-    player.location = self.driver.objects["ethereal_veil_start"]
-    await player.send(await player.location.call("look", player))
-    await player.send("Your legend begins in the Ethereal Veil, forged under Mystra’s watch.")
-    return True
+        hashed_pass = await hashing
+        player.name = name
+        player.attrs = {"race": race, "class": class_, "skills": {}, "stats": {"hp": 100, "gp": 100}}
+        await self.db.execute("INSERT INTO players (name, password, race, class, data) VALUES (?, ?, ?, ?, ?)",
+                              (name, hashed_pass, race, class_, json.dumps(player.attrs)))
+        player.location = self.driver.objects["ethereal_veil_start"]
+        await player.send(await player.location.call("look", player))
+        await player.send("Your legend begins in the Ethereal Veil, forged under Mystra’s watch.")
+        return True
 
     async def get_input(self, player: Player) -> str:
-        if player.protocol == "telnet":
-            data = await player.writer.read(1024)
-            return data.decode("utf-8").strip() if data else ""
-        else:
-            return await player.writer.recv()
+        line = await player.read_line()  # Telnet negotiation is answered on the way
+        return line.strip() if line else ""
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("login queue depth", self.queue.depth()),
+            ("hash jobs done", self.queue.done),
+            ("hashes upgraded", self.rehashed),
+            ("throttled addresses", len(self.throttle.buckets)),
+            ("attempts refused", self.throttle.refused),
+        ]
 
 # Initialize login handler
 login_handler = LoginHandler()
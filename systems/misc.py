@@ -2,8 +2,9 @@
 # Imported to: object.py
 # Imports from: driver.py
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from ..driver import driver, MudObject
+from .containment import containment
 
 class MiscHandler:
     def __init__(self):
@@ -12,6 +13,7 @@ class MiscHandler:
         self.width = 1
         self.value = 0
         self.value_info: Dict[str, int] = {}
+        self.owner: Optional[MudObject] = None  # The object this handler describes; its node in the containment tree
 
     def set_width(self, w: int):
         self.width = w
@@ -25,21 +27,29 @@ class MiscHandler:
     def query_length(self) -> int:
         return self.length
 
+    def environment(self) -> Optional[MudObject]:
+        return containment.query_parent(self.owner) if self.owner is not None else None
+
     def adjust_weight(self, w: int):
-        if env := driver.environment(self):
+        if (env := self.environment()) and hasattr(env, "add_weight"):
             env.add_weight(w)
         self.weight += w
+        if self.owner is not None:
+            containment.refresh(self.owner)
 
     def set_weight(self, w: int):
-        if env := driver.environment(self):
+        if (env := self.environment()) and hasattr(env, "add_weight"):
             env.add_weight(w - self.weight)
         self.weight = w
+        if self.owner is not None:
+            containment.refresh(self.owner)
 
     def query_weight(self) -> int:
         return self.weight
 
     def query_complete_weight(self) -> int:
-        return self.weight  # Shadows handled in object.py
+        inner = containment.query_inner_weight(self.owner) if self.owner is not None else 0
+        return self.weight + inner  # Shadows handled in object.py
 
     def adjust_money(self, amt: int | List[Tuple[str, int]], coin: str = None) -> int:
         # Placeholder for MONEY_HAND; assumes flat value
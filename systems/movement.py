@@ -85,6 +85,8 @@ class Movement:
         obj.attrs["env"] = dest.oid
         if enter_mess:
             await dest.tell_room(driver.convert_message(enter_mess, obj))
+        if dest.__dict__.get("shadow") is not None:  # Rooftops, walls and terrain hook arrivals
+            await driver.shadow_handler.call(dest, "event_enter", obj, env)
         
         # Forgotten Realms flair (2025)
         if isinstance(obj, Player) and dest.query_property("mystra_blessing"):
@@ -0,0 +1,143 @@
+# /mnt/home2/mud/systems/noun_index.py
+# Imported to: export_inventory.py, room.py, id.py, description.py
+# Imports from: driver.py
+
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from ..driver import MudObject
+
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+            "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10}
+EMPTY: FrozenSet[str] = frozenset()
+
+def noun_tokens(thing: MudObject) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """Returns (ids, plurals, adjectives) for an object, whichever id mixin it uses."""
+    source = getattr(thing, "id_handler", None) or thing
+    if hasattr(source, "query_id_set"):
+        return source.query_id_set(), source.query_plural_set(), source.query_adjective_set()
+    name = getattr(source, "name", None)
+    ids = {name} if isinstance(name, str) else set()
+    if hasattr(source, "query_alias"):
+        ids.update(source.query_alias())
+    elif hasattr(source, "query_aliases"):
+        ids.update(source.query_aliases())
+    plurals = set(source.query_plurals()) if hasattr(source, "query_plurals") else set()
+    if isinstance(getattr(source, "plurals", None), dict):
+        plurals.update(source.plurals.values())
+    if isinstance(name, str) and hasattr(source, "pluralize"):
+        plurals.add(source.pluralize(name))
+    adjectives = source.query_adjectives() if hasattr(source, "query_adjectives") else []
+    return (frozenset(w.lower() for w in ids if isinstance(w, str)),
+            frozenset(w.lower() for w in plurals if isinstance(w, str)),
+            frozenset(w.lower() for w in adjectives if isinstance(w, str)))
+
+def parse_noun_query(words: str) -> Optional[Tuple[int, List[str], str]]:
+    """Splits 'second rusty sword' into (ordinal, adjectives, noun); None means everything."""
+    bits = words.lower().split()
+    if bits and bits[0] == "all":
+        bits = bits[1:]
+    if not bits:
+        return None
+    ordinal = 0
+    if bits[0] in ORDINALS and len(bits) > 1:
+        ordinal, bits = ORDINALS[bits[0]], bits[1:]
+    return ordinal, bits[:-1], bits[-1]
+
+def reindex(thing: Optional[MudObject]):
+    """Refreshes an object's entry in the container index holding it, if any."""
+    index = getattr(thing, "indexed_in", None)
+    if index:
+        index.reindex(thing)
+
+class NounIndex:
+    def __init__(self):
+        self.items: Dict[MudObject, int] = {}  # {object: insertion order}
+        self.tokens: Dict[MudObject, Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]] = {}
+        self.ids: Dict[str, Set[MudObject]] = {}
+        self.plurals: Dict[str, Set[MudObject]] = {}
+        self.adjectives: Dict[str, Set[MudObject]] = {}
+        self.counter = 0
+
+    def add(self, thing: MudObject):
+        """Indexes an object entering the container."""
+        if thing in self.items:
+            return
+        self.counter += 1
+        self.items[thing] = self.counter
+        self._link(thing, noun_tokens(thing))
+        thing.indexed_in = self
+
+    def remove(self, thing: MudObject):
+        """Drops an object leaving the container."""
+        if self.items.pop(thing, None) is None:
+            return
+        self._unlink(thing)
+        if getattr(thing, "indexed_in", None) is self:
+            thing.indexed_in = None
+
+    def reindex(self, thing: MudObject):
+        """Re-reads an object's identifiers after a name, alias, plural or adjective change."""
+        if thing not in self.items:
+            return
+        tokens = noun_tokens(thing)
+        if tokens != self.tokens.get(thing):
+            self._unlink(thing)
+            self._link(thing, tokens)
+
+    def _link(self, thing: MudObject, tokens: Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]):
+        self.tokens[thing] = tokens
+        for table, words in zip((self.ids, self.plurals, self.adjectives), tokens):
+            for word in words:
+                table.setdefault(word, set()).add(thing)
+
+    def _unlink(self, thing: MudObject):
+        tokens = self.tokens.pop(thing, (EMPTY, EMPTY, EMPTY))
+        for table, words in zip((self.ids, self.plurals, self.adjectives), tokens):
+            for word in words:
+                bucket = table.get(word)
+                if bucket:
+                    bucket.discard(thing)
+                    if not bucket:
+                        del table[word]
+
+    def _lookup(self, table: Dict[str, Set[MudObject]], adjectives: List[str], noun: str) -> Set[MudObject]:
+        """Intersects the noun's bucket with each adjective's bucket."""
+        hits = table.get(noun)
+        if not hits:
+            return set()
+        hits = set(hits)
+        for adj in adjectives:
+            hits &= self.adjectives.get(adj, EMPTY)
+            if not hits:
+                break
+        return hits
+
+    def _matches(self, thing: MudObject, plural: bool, adjectives: List[str], noun: str) -> bool:
+        """Checks an object the index does not hold against a query."""
+        ids, plurals, adjs = noun_tokens(thing)
+        return noun in (plurals if plural else ids) and all(adj in adjs for adj in adjectives)
+
+    def find(self, words: str, things: Optional[List[MudObject]] = None) -> List[MudObject]:
+        """Returns the objects matching words, in order; handles 'all', plurals and ordinals."""
+        if things is None:
+            things = sorted(self.items, key=self.items.get)
+        query = parse_noun_query(words)
+        if query is None:
+            return list(things)
+        ordinal, adjectives, noun = query
+        hits = self._lookup(self.ids, adjectives, noun)
+        plural = not hits and noun in self.plurals
+        if plural:
+            hits = self._lookup(self.plurals, adjectives, noun)
+        found = [thing for thing in things
+                 if thing in hits or (thing not in self.items and self._matches(thing, plural, adjectives, noun))]
+        if ordinal:
+            return found[ordinal - 1:ordinal]
+        return found
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("indexed objects", len(self.items)),
+            ("indexed names", len(self.ids)),
+            ("indexed plurals", len(self.plurals)),
+            ("indexed adjectives", len(self.adjectives)),
+        ]
@@ -1,32 +1,57 @@
 # /mnt/home2/mud/systems/object.py
 # Imported to: driver.py, player.py, room.py, living.py
-# Imports from: driver.py, extra_look.py, property.py, effects.py, id.py, misc.py, auto_load.py, help_files.py, theft_callback.py
+# Imports from: driver.py, extra_look.py, property.py, effects.py, id.py, vocabulary.py, misc.py, auto_load.py, help_files.py, theft_callback.py
 
 from typing import List, Optional, Dict, Tuple
-from ..driver import driver, MudObject
+from ..driver import driver, MudObject, clone_ids
 import asyncio
 import time
 from .extra_look import ExtraLookMixin
 from .property import PropertyMixin
 from .effects import EffectsMixin
 from .id import IdHandler
+from .vocabulary import vocabulary
 from .misc import MiscHandler
 from .auto_load import AutoLoadHandler
 from .help_files import HelpFilesHandler
 from .theft_callback import TheftCallbackHandler
 
 ENCHANT_DEGRADE_TIME = 8 * 7 * 24 * 60 * 60  # 8 weeks in seconds
+SHARED_AUTO_LOAD = AutoLoadHandler()  # Stateless, so every object can use the same one
+
+def _make_id_handler(obj: "Object") -> IdHandler:
+    handler = IdHandler()
+    handler.owner = obj  # Keeps the container's noun index current
+    return handler
+
+def _make_misc_handler(obj: "Object") -> MiscHandler:
+    handler = MiscHandler()
+    handler.owner = obj  # Weight changes are refreshed on the object, which is what the containment tree holds
+    return handler
+
+def _make_help_handler(obj: "Object") -> HelpFilesHandler:
+    handler = HelpFilesHandler()
+    handler.set_object(obj)
+    return handler
+
+def _make_theft_handler(obj: "Object") -> TheftCallbackHandler:
+    handler = TheftCallbackHandler()
+    handler.obj = obj  # Direct reference for event_theft
+    return handler
+
+# Helpers built the first time they are used rather than once per clone
+LAZY_HELPERS = {
+    "id_handler": _make_id_handler,
+    "misc_handler": _make_misc_handler,
+    "auto_load_handler": lambda obj: SHARED_AUTO_LOAD,
+    "help_handler": _make_help_handler,
+    "theft_handler": _make_theft_handler,
+}
 
 class Object(MudObject, ExtraLookMixin, PropertyMixin, EffectsMixin):
     def __init__(self, oid: str = "object", name: str = "object"):
         super().__init__(oid, name)
-        self.id_handler = IdHandler()
-        self.misc_handler = MiscHandler()
-        self.auto_load_handler = AutoLoadHandler()
-        self.help_handler = HelpFilesHandler()
-        self.theft_handler = TheftCallbackHandler()
-        self.help_handler.set_object(self)
-        self.theft_handler.obj = self  # Direct reference for event_theft
+        self.prototype: Optional["Object"] = None  # Blueprint this was cloned from
         self.cmr_handler = driver.cmr_handler  # Assumes driver has cmr_handler
         self.materials: List[str] = []
         self.colour = ""
@@ -42,6 +67,36 @@ class Object(MudObject, ExtraLookMixin, PropertyMixin, EffectsMixin):
         self._cur_size = 0
         self.setup()
 
+    def __getattr__(self, name: str):
+        factory = LAZY_HELPERS.get(name)
+        if factory is None:
+            raise AttributeError(name)
+        helper = factory(self)
+        setattr(self, name, helper)
+        return helper
+
+    def query_weight(self) -> int:
+        """Own weight as the containment tree reads it: the misc handler's once one exists."""
+        if "misc_handler" in self.__dict__:
+            return self.misc_handler.query_weight()
+        return self.attrs.get("weight", 0)
+
+    def clone(self) -> "Object":
+        """Clones this object, sharing actions and identifiers with it until either is changed."""
+        new_oid = f"{self.oid}_clone_{next(clone_ids)}"
+        clone = type(self)(new_oid, self.name)
+        clone.prototype = self
+        clone.actions = self.actions
+        clone.shared_actions = self.shared_actions = True
+        clone.attrs = self.attrs.copy()
+        clone.short_d, clone.long_d, clone.plural_d = self.short_d, self.long_d, self.plural_d
+        clone.colour = self.colour
+        clone.materials = self.materials  # Only ever replaced, never changed in place
+        if "id_handler" in self.__dict__:
+            clone.id_handler = self.id_handler.derive(clone)
+        driver.objects[new_oid] = clone
+        return clone
+
     def setup(self):
         if not self.do_setup:
             self.do_setup = True
@@ -54,7 +109,7 @@ class Object(MudObject, ExtraLookMixin, PropertyMixin, EffectsMixin):
         super().set_name(name)
         if not self.short_d:
             self.short_d = name
-        self.add_plural(self.pluralize(name))
+        self.id_handler.add_plural(vocabulary.plural(name))
 
     def long(self, word: Optional[str] = None, dark: int = 0) -> str:
         base = self.long_d or f"This is {self.short(0)}."
@@ -89,15 +144,15 @@ class Object(MudObject, ExtraLookMixin, PropertyMixin, EffectsMixin):
         if not isinstance(material, list):
             material = [material]
         if material:
-            self.materials = material + self.materials
-            self.add_adjective(material)
+            self.materials = [vocabulary.canonical(m) for m in material] + self.materials
+            self.id_handler.add_adjective(material)
 
     def add_material(self, material: str | List[str]):
         if isinstance(material, list):
-            self.materials.extend([m for m in material if m not in self.materials])
+            self.materials = self.materials + [vocabulary.canonical(m) for m in material if m not in self.materials]
         elif isinstance(material, str) and material not in self.materials:
-            self.materials.append(material)
-        self.add_adjective(material)
+            self.materials = self.materials + [vocabulary.canonical(material)]
+        self.id_handler.add_adjective(material)
 
     def query_material(self) -> Optional[str]:
         return self.materials[0] if self.materials else None
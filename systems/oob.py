@@ -0,0 +1,202 @@
+# /mnt/home2/mud/systems/oob.py
+# Imported to: driver.py, room.py, combat.py
+# Imports from: driver.py, telnet.py
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from ..driver import driver, MudObject
+from .telnet import GMCP, MSDP, subnegotiate, encode_msdp
+import asyncio
+import json
+
+EAGER = True  # Loaded at boot, not on first use: runs the out-of-band flush loop
+
+OOB_TICK = 0.25  # Seconds between flushes; changes inside one tick go out as one write
+VITALS = ("hp", "max_hp", "gp", "max_gp", "xp")
+WHOLE = None  # Dirty marker for a package replaced by a shared fragment
+
+# (package, field) -> MSDP variable, for the standard MSDP names
+MSDP_NAMES = {
+    ("Char.Vitals", "hp"): "HEALTH", ("Char.Vitals", "max_hp"): "HEALTH_MAX",
+    ("Char.Vitals", "gp"): "MANA", ("Char.Vitals", "max_gp"): "MANA_MAX",
+    ("Char.Vitals", "xp"): "EXPERIENCE", ("Char.Combat", "target"): "OPPONENT_NAME",
+    ("Room.Info", "name"): "ROOM_NAME", ("Room.Info", "exits"): "ROOM_EXITS",
+    ("Room.Info", "num"): "ROOM_VNUM", ("Room.Info", "area"): "AREA_NAME",
+    ("Room.Weather", "text"): "WEATHER",
+}
+
+class Fragment:
+    """A whole package value encoded once, with its GMCP frame shared by every recipient."""
+    __slots__ = ("package", "value", "frame")
+
+    def __init__(self, package: str, value: Dict[str, Any]):
+        self.package = package
+        self.value = value
+        self.frame = subnegotiate(GMCP, f"{package} {json.dumps(value)}".encode("utf-8"))
+
+class OobState:
+    __slots__ = ("values", "dirty", "fragments")
+
+    def __init__(self):
+        self.values: Dict[str, Dict[str, Any]] = {}  # {package: {field: value}} as last published
+        self.dirty: Dict[str, Optional[Set[str]]] = {}  # {package: changed fields, or WHOLE}
+        self.fragments: Dict[str, Fragment] = {}  # {package: shared value it currently shows}
+
+class OobHandler:
+    def __init__(self):
+        self.states: Dict[Any, OobState] = {}  # {connection: its out-of-band state}
+        self.pending: Set[Any] = set()  # Connections with changes waiting for the tick
+        self.room_fragments: Dict[MudObject, Fragment] = {}  # {room: Room.Info}
+        self.weather_fragments: Dict[MudObject, Tuple[Any, Fragment]] = {}  # {room: (weather stamp, Room.Weather)}
+        self.providers: List[Callable[[Any], None]] = [self.sample_vitals, self.sample_room]
+        self.frames = 0
+        self.shared_frames = 0
+        self.writes = 0
+
+    def wants(self, who: Any) -> bool:
+        session = getattr(who, "telnet", None)
+        return bool(session and (session.gmcp or session.msdp))
+
+    def state(self, who: Any) -> OobState:
+        found = self.states.get(who)
+        if found is None:
+            found = self.states[who] = OobState()
+        return found
+
+    def publish(self, who: Any, package: str, values: Dict[str, Any]):
+        """Records new values for who; only keys that actually changed are sent at the next tick."""
+        if not self.wants(who):
+            return
+        state = self.state(who)
+        current = state.values.setdefault(package, {})
+        changed = [key for key, value in values.items() if key not in current or current[key] != value]
+        if not changed:
+            return
+        state.fragments.pop(package, None)
+        dirty = state.dirty.get(package, set())
+        for key in changed:
+            current[key] = values[key]
+            if dirty is not WHOLE:
+                dirty.add(key)
+        state.dirty[package] = dirty
+        self.pending.add(who)
+
+    def publish_fragment(self, who: Any, fragment: Fragment):
+        """Shows who a shared, pre-encoded package value."""
+        if not self.wants(who):
+            return
+        state = self.state(who)
+        if state.fragments.get(fragment.package) is fragment:
+            return
+        state.fragments[fragment.package] = fragment
+        state.values[fragment.package] = dict(fragment.value)
+        state.dirty[fragment.package] = WHOLE
+        self.pending.add(who)
+
+    def room_info(self, room: MudObject) -> Fragment:
+        """Returns the Room.Info package for room, built from its compiled exits once per change."""
+        found = self.room_fragments.get(room)
+        if found is None:
+            exits = {direc: getattr(ex.dest, "oid", ex.dest) for direc, ex in getattr(room, "exit_map", {}).items()}
+            value = {"num": room.oid, "name": room.query_short() if hasattr(room, "query_short") else room.name,
+                     "area": room.attrs.get("zone", ""), "environment": room.attrs.get("location", "inside"),
+                     "coords": getattr(room, "co_ord", None) or [], "exits": exits}
+            found = self.room_fragments[room] = Fragment("Room.Info", value)
+        return found
+
+    def room_changed(self, room: MudObject):
+        """Drops a room's Room.Info after its exits or description change."""
+        self.room_fragments.pop(room, None)
+
+    def weather(self, room: MudObject) -> Optional[Fragment]:
+        weather = driver.handler("weather_handler")
+        if not weather or room.attrs.get("location") != "outside":
+            return None
+        stamp = driver.lighting.weather_stamp() if driver.handler("lighting") is not None else None
+        cached = self.weather_fragments.get(room)
+        if cached is None or stamp is None or cached[0] != stamp:
+            cached = self.weather_fragments[room] = (stamp, Fragment("Room.Weather", {"text": weather.weather_string(room)}))
+        return cached[1]
+
+    def sample_vitals(self, who: Any):
+        attrs = getattr(who, "attrs", None)
+        if attrs:
+            self.publish(who, "Char.Vitals", {key: attrs[key] for key in VITALS if key in attrs})
+
+    def sample_room(self, who: Any):
+        room = getattr(who, "location", None)
+        if room is None:
+            return
+        self.publish_fragment(who, self.room_info(room))
+        weather = self.weather(room)
+        if weather:
+            self.publish_fragment(who, weather)
+
+    def encode(self, who: Any, state: OobState) -> bytes:
+        """Builds one tick's GMCP and MSDP frames for who from its dirty packages."""
+        session = who.telnet
+        frames = []
+        msdp = {}
+        reported = getattr(who, "msdp_reported", ())
+        for package, dirty in state.dirty.items():
+            values = state.values.get(package, {})
+            fields = values.keys() if dirty is WHOLE else dirty
+            if session.gmcp:
+                fragment = state.fragments.get(package)
+                if dirty is WHOLE and fragment is not None:
+                    frames.append(fragment.frame)
+                    self.shared_frames += 1
+                else:
+                    frames.append(session.gmcp_frame(package, {key: values[key] for key in fields if key in values}))
+            if session.msdp and reported:
+                for key in fields:
+                    name = MSDP_NAMES.get((package, key), key.upper())
+                    if name in reported and key in values:
+                        msdp[name] = values[key]
+        if msdp:
+            frames.append(subnegotiate(MSDP, encode_msdp(msdp)))
+        state.dirty = {}
+        self.frames += len(frames)
+        return b"".join(frames)
+
+    def flush(self):
+        """Sends every pending connection its coalesced changes in a single write."""
+        pending, self.pending = self.pending, set()
+        for who in pending:
+            state = self.states.get(who)
+            if not state or not self.wants(who):
+                continue
+            data = self.encode(who, state)
+            if data:
+                who.writer.write(who.telnet.wire(data))
+                self.writes += 1
+
+    def forget(self, who: Any):
+        self.states.pop(who, None)
+        self.pending.discard(who)
+
+    async def oob_loop(self):
+        """Samples providers and flushes changes every OOB_TICK."""
+        while True:
+            await asyncio.sleep(OOB_TICK)
+            for who in list(driver.players.values()):
+                if self.wants(who):
+                    for provider in self.providers:
+                        provider(who)
+            if self.pending:
+                self.flush()
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("oob connections", len(self.states)),
+            ("cached room packages", len(self.room_fragments)),
+            ("frames sent", self.frames),
+            ("shared frames sent", self.shared_frames),
+            ("coalesced writes", self.writes),
+        ]
+
+oob = OobHandler()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.oob = oob
+    asyncio.create_task(oob.oob_loop())
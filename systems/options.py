@@ -1,12 +1,18 @@
 # Imported to: living.py, tactics.py
 # Imports from: driver.py, tactics.py
 # /mnt/home2/mud/systems/options.py
-from typing import Dict, Optional, List, Callable, Tuple, ClassVar
+from typing import Any, Dict, Optional, List, Callable, Tuple, ClassVar
 from ..driver import driver, Player, MudObject
 from .tactics import TacticsHandler
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
 import asyncio
 import re
 
+mixed = Any  # LPC's mixed: an option's type is a type code or a list of allowed values
+
+EAGER = True  # Loaded at boot, not on first use: its verb must exist before anyone types it
+
 class option:
     def __init__(self, type_: mixed, restriction: int, set_func: Callable, query_func: Callable, suboptions: Dict, help: str):
         self.type = type_
@@ -41,157 +47,199 @@ OPTIONS_TYPE_LORD_ONLY = 2
 OPTIONS_TYPE_PLAYTESTER_ONLY = 3
 MONITOR_OPTIONS = ["off", "on", "slow"]
 
+EARMUFF_EVENTS = ["shout", "newbie", "cryer", "remote-soul", "multiple-soul", "multiple-tell", "teach", "tell", "remote", "multiple-remote"]
+EARMUFF_BITS = {event: 1 << i for i, event in enumerate(EARMUFF_EVENTS)}
+VERBOSE_TYPES = ["look", "combat", "errors", "score", "names", "htell"]
+VERBOSE_BITS = {var: 1 << i for i, var in enumerate(VERBOSE_TYPES)}
+PLAIN_TERMINALS = ["dumb", "none"]  # Terminal types that get colour codes stripped rather than sent
+
+# Pinkfish colour codes (from /include/colour.h) as ANSI
+PINKFISH = {
+    "RESET": "\033[0m", "BOLD": "\033[1m", "FLASH": "\033[5m",
+    "BLACK": "\033[30m", "RED": "\033[31m", "GREEN": "\033[32m", "ORANGE": "\033[33m", "YELLOW": "\033[1;33m",
+    "BLUE": "\033[34m", "MAGENTA": "\033[35m", "CYAN": "\033[36m", "WHITE": "\033[37m",
+    "B_BLACK": "\033[40m", "B_RED": "\033[41m", "B_GREEN": "\033[42m", "B_ORANGE": "\033[43m", "B_YELLOW": "\033[43m",
+    "B_BLUE": "\033[44m", "B_MAGENTA": "\033[45m", "B_CYAN": "\033[46m", "B_WHITE": "\033[47m",
+}
+DEFAULT_EVENT_COLOURS = {"tell": "%^YELLOW%^", "say": "%^CYAN%^", "shout": "%^BOLD%^%^RED%^", "inform": "%^GREEN%^",
+                         "combat": "%^RED%^", "magic": "%^MAGENTA%^", "faith": "%^BOLD%^%^WHITE%^"}
+
+class OptionsSnapshot:
+    """A player's options flattened for the message path, shared by every player whose settings match."""
+    __slots__ = ("key", "codes", "earmuffs", "earmuff_state", "verbose", "mxp")
+
+    def __init__(self, key: Tuple, codes: Dict[str, str], earmuffs: int, earmuff_state: str, verbose: int, mxp: bool):
+        self.key = key
+        self.codes = MappingProxyType(codes)  # {pinkfish code or upper-cased colour event: what the terminal gets}
+        self.earmuffs = earmuffs  # EARMUFF_BITS of the events this player has muffed
+        self.earmuff_state = earmuff_state
+        self.verbose = verbose  # VERBOSE_BITS of the output types set to verbose
+        self.mxp = mxp
+
+    def render(self, text: str) -> str:
+        if "%^" not in text:
+            return text
+        codes = self.codes
+        return "".join([codes.get(part, part) for part in text.split("%^")])
+
+    def earmuffed(self, event: str) -> bool:
+        return self.earmuff_state != "off" and bool(self.earmuffs & EARMUFF_BITS.get(event, 0))
+
+    def is_verbose(self, var: str) -> bool:
+        return bool(self.verbose & VERBOSE_BITS.get(var, 0))
+
 class OptionsHandler:
     _options: Dict[str, Dict] = {}
     _colours: List[str] = ["BOLD", "FLASH", "BLACK", "RED", "BLUE", "CYAN", "MAGENTA", "ORANGE", "YELLOW", "GREEN", "WHITE", "B_RED", "B_ORANGE", "B_YELLOW", "B_BLACK", "B_CYAN", "B_WHITE", "B_GREEN", "B_MAGENTA"]
-    _cache_input: Dict[str, Dict] = {}
+    _cache_input: Dict[Player, Dict] = WeakKeyDictionary()
     tactics_handler = TacticsHandler()
 
     def __init__(self):
-        pass  # Initialization handled in create()
+        self.snapshots: Dict[Player, OptionsSnapshot] = WeakKeyDictionary()  # {player: compiled options}; connection players have no oid
+        self.interned: Dict[Tuple, OptionsSnapshot] = {}  # {settings: the one snapshot for them}
+        self.compiles = 0
+        self.delivered = 0
+        self.muffled = 0
+        self.renders = 0
 
     async def init(self, driver_instance):
         self.driver = driver_instance
         self.create()
-        for obj in self.driver.objects.values():
-            if isinstance(obj, Player) and hasattr(obj, "attrs"):
-                self.init_options(obj)
-                obj.add_action("options", self.options_command)
+        self.driver.declare_action("options", self.options_command, Player)
 
     def create(self):
-    self._options = {}
-    self._cache_input = {}
-
-    # Output options (updated with 2025 verbosity levels)
-    self.add_option("output look", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.set_verbose(p, "look", v), lambda p: self.query_verbose(p, "look"),
-                   "Display room descriptions briefly or verbosely under Mystra’s light")
-    self.add_option("output combat", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.set_verbose(p, "combat", v), lambda p: self.query_verbose(p, "combat"),
-                   "Show combat messages fully or only damage dealt")
-    self.add_option("output errors", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: self.set_verbose(p, "errors", v), lambda p: self.query_verbose(p, "errors"),
-                   "Display errors briefly for creators")
-    self.add_option("output score", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.set_verbose(p, "score", v), lambda p: self.query_verbose(p, "score"),
-                   "Detail level for your adventurer’s score")
-    self.add_option("output accent", ["mangle", "unadulterated"], OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "mangle_accent", v == "mangle"), lambda p: "mangle" if p.attrs.get("mangle_accent", False) else "unadulterated",
-                   "Hear speech with regional Forgotten Realms accents or pure")
-    self.add_option("output names", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.set_verbose(p, "names", v), lambda p: self.query_verbose(p, "names"),
-                   "Show names with titles as in Waterdeep’s rolls")
-    self.add_option("output htell", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.set_verbose(p, "htell", v), lambda p: self.query_verbose(p, "htell"),
-                   "Include timestamps in historical tells")
-    self.add_option("output msgout", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: setattr(p.attrs, "msgout", v), lambda p: p.attrs.get("msgout", "$N departs $T."),
-                   "Message when you leave a place")
-    self.add_option("output msgin", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: setattr(p.attrs, "msgin", v), lambda p: p.attrs.get("msgin", "$N arrives from $F."),
-                   "Message when you enter a place")
-    self.add_option("output mmsgout", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: setattr(p.attrs, "mmsgout", v), lambda p: p.attrs.get("mmsgout", "$N fades into the Veil."),
-                   "Message when you shift through the Ethereal Veil")
-    self.add_option("output mmsgin", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: setattr(p.attrs, "mmsgin", v), lambda p: p.attrs.get("mmsgin", "$N emerges from the Veil."),
-                   "Message when you materialize from the Ethereal Veil")
-    self.add_option("output usercolour", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "allow_coloured_souls", v), lambda p: p.attrs.get("allow_coloured_souls", 0),
-                   "See soul messages in adventurer-chosen hues")
-    self.add_option("output plainmaps", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "plain_maps", v), lambda p: p.attrs.get("plain_maps", 0),
-                   "View maps without magical coloration")
-    self.add_option("output lookmap", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_PLAYTESTER_ONLY,
-                   lambda p, v: setattr(p.attrs, "terrain_map_in_look", v), lambda p: p.attrs.get("terrain_map_in_look", 0),
-                   "Embed terrain maps in your gaze")
-    self.add_option("output tabstops", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_CRE_ONLY,
-                   lambda p, v: setattr(p.attrs, "tabstops", v), lambda p: p.attrs.get("tabstops", 8),
-                   "Set tabstop display width")
-    self.add_option("output shorthand", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "shorthand_output", v), lambda p: p.attrs.get("shorthand_output", 0),
-                   "Expand shorthand speech from others")
-
-    # Colour options (expanded for 2025)
-    for colour in ["tell", "say", "shout", "inform", "combat", "magic", "faith"]:  # Added faith for Forgotten Realms
-        self.add_option(f"colour {colour}", OPTIONS_TYPE_COLOUR, OPTIONS_TYPE_ALL,
-                       lambda p, v, c=colour: self.set_my_colours(p, c, v), lambda p, c=colour: self.colour_event(p, c),
-                       f"Color for {colour} messages in the Realms")
-    self.add_option("colour inform", OPTIONS_TYPE_DYNAMIC_GROUP, OPTIONS_TYPE_ALL,
-                   None, lambda p: self.get_inform_colours(p),
-                   "Colors for various informational messages")
-    self.add_option("colour party", OPTIONS_TYPE_DYNAMIC_GROUP, OPTIONS_TYPE_ALL,  # 'club' → 'party'
-                   None, lambda p: self.get_party_colours(p),
-                   "Colors for party messages")
-
-    # Terminal options (2025 terminal support)
-    self.add_option("terminal type", OPTIONS_TYPE_TERMINAL, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "term_type", v), lambda p: p.attrs.get("term_type", "ansi"),
-                   "Your scrying device’s terminal type (e.g., ansi, vt100)")
-    self.add_option("terminal rows", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "rows", max(10, min(100, v))), lambda p: p.attrs.get("rows", 24),
-                   "Rows in your viewing portal")
-    self.add_option("terminal cols", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "cols", max(40, min(200, v))), lambda p: p.attrs.get("cols", 80),
-                   "Columns in your viewing portal")
-
-    # Combat options (synced with tactics.py)
-    self.add_option("combat wimpy", OPTIONS_TYPE_PERCENTAGE, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "wimpy", v), lambda p: p.attrs.get("wimpy", 20),
-                   "HP percentage to flee from battle")
-    self.add_option("combat monitor", MONITOR_OPTIONS, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "monitor", MONITOR_OPTIONS.index(v)), lambda p: MONITOR_OPTIONS[p.attrs.get("monitor", 1)],
-                   "Frequency of battle status updates")
-    self.add_option("combat tactics attitude", ["insane", "offensive", "neutral", "defensive", "wimp"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_attitude(p, v), lambda p: self.tactics_handler.query_combat_attitude(p),
-                   "Your stance in combat (see help tactics)")
-    self.add_option("combat tactics response", ["dodge", "parry", "both", "neutral"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_response(p, v), lambda p: self.tactics_handler.query_combat_response(p),
-                   "Your defense in combat (see help tactics)")
-    self.add_option("combat tactics parry", ["left", "right", "both"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_parry(p, v), lambda p: self.tactics_handler.query_combat_parry(p),
-                   "Hand used to parry (see help tactics)")
-    self.add_option("combat tactics unarmed_parry", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_unarmed_parry(p, v), lambda p: self.tactics_handler.query_unarmed_parry(p),
-                   "Parry unarmed if weaponless")
-    self.add_option("combat tactics attack", ["left", "right", "both"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_attack(p, v), lambda p: self.tactics_handler.query_combat_attack(p),
-                   "Hand used to strike (see help tactics)")
-    self.add_option("combat tactics mercy", ["always", "ask", "never"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_mercy(p, v), lambda p: self.tactics_handler.query_combat_mercy(p),
-                   "Mercy toward foes")
-    self.add_option("combat tactics focus", ["head", "chest", "arms", "legs", "none"], OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_focus(p, v), lambda p: self.tactics_handler.query_combat_focus(p),
-                   "Targeted body part in combat")
-    self.add_option("combat tactics distance", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.tactics_handler.set_combat_distance(p, v), lambda p: self.tactics_handler.query_combat_distance(p),
-                   "Preferred combat range (0 for none)")
-    self.add_option("combat killer", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "player_killer", v), lambda p: p.attrs.get("player_killer", 0),
-                   "Register as a hero-slayer")
-
-    # Faith options (new for Forgotten Realms)
-    self.add_option("faith devotion", OPTIONS_TYPE_FAITH, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "devotion", v), lambda p: p.attrs.get("devotion", "none"),
-                   "Your patron deity (e.g., Mystra, Tymora)")
-
-    # Input, earmuff, creator, personal, playtester, player options remain mostly unchanged, just thematic tweaks
-    self.add_option("input ambiguous", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.change_bool_property(p, "ambiguous", not v), lambda p: not p.attrs.get("ambiguous", 0),
-                   "Notify of unclear commands")
-    self.add_option("input andascomma", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: self.change_bool_property(p, "andascomma", not v), lambda p: not p.attrs.get("andascomma", 0),
-                   "Treat 'and' as a list separator")
-    self.add_option("input editor", ["menu", "magic", "command", "ed"], OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "editor", v), lambda p: p.attrs.get("editor", "menu"),
-                   "Your tome-editing tool")
-    self.add_option("input shorthand", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
-                   lambda p, v: setattr(p.attrs, "shorthand", v), lambda p: p.attrs.get("shorthand", 0),
-                   "Expand your shorthand scribing")
-    
+        self._options = {}
+        self._cache_input = WeakKeyDictionary()
+
+        # Output options (updated with 2025 verbosity levels)
+        self.add_option("output look", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.set_verbose(p, "look", v), lambda p: self.query_verbose(p, "look"),
+                       "Display room descriptions briefly or verbosely under Mystra’s light")
+        self.add_option("output combat", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.set_verbose(p, "combat", v), lambda p: self.query_verbose(p, "combat"),
+                       "Show combat messages fully or only damage dealt")
+        self.add_option("output errors", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: self.set_verbose(p, "errors", v), lambda p: self.query_verbose(p, "errors"),
+                       "Display errors briefly for creators")
+        self.add_option("output score", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.set_verbose(p, "score", v), lambda p: self.query_verbose(p, "score"),
+                       "Detail level for your adventurer’s score")
+        self.add_option("output accent", ["mangle", "unadulterated"], OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "mangle_accent", v == "mangle"), lambda p: "mangle" if p.attrs.get("mangle_accent", False) else "unadulterated",
+                       "Hear speech with regional Forgotten Realms accents or pure")
+        self.add_option("output names", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.set_verbose(p, "names", v), lambda p: self.query_verbose(p, "names"),
+                       "Show names with titles as in Waterdeep’s rolls")
+        self.add_option("output htell", OPTIONS_TYPE_BRIEF, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.set_verbose(p, "htell", v), lambda p: self.query_verbose(p, "htell"),
+                       "Include timestamps in historical tells")
+        self.add_option("output msgout", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: setattr(p.attrs, "msgout", v), lambda p: p.attrs.get("msgout", "$N departs $T."),
+                       "Message when you leave a place")
+        self.add_option("output msgin", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: setattr(p.attrs, "msgin", v), lambda p: p.attrs.get("msgin", "$N arrives from $F."),
+                       "Message when you enter a place")
+        self.add_option("output mmsgout", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: setattr(p.attrs, "mmsgout", v), lambda p: p.attrs.get("mmsgout", "$N fades into the Veil."),
+                       "Message when you shift through the Ethereal Veil")
+        self.add_option("output mmsgin", OPTIONS_TYPE_STRING, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: setattr(p.attrs, "mmsgin", v), lambda p: p.attrs.get("mmsgin", "$N emerges from the Veil."),
+                       "Message when you materialize from the Ethereal Veil")
+        self.add_option("output usercolour", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "allow_coloured_souls", v), lambda p: p.attrs.get("allow_coloured_souls", 0),
+                       "See soul messages in adventurer-chosen hues")
+        self.add_option("output plainmaps", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "plain_maps", v), lambda p: p.attrs.get("plain_maps", 0),
+                       "View maps without magical coloration")
+        self.add_option("output lookmap", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_PLAYTESTER_ONLY,
+                       lambda p, v: setattr(p.attrs, "terrain_map_in_look", v), lambda p: p.attrs.get("terrain_map_in_look", 0),
+                       "Embed terrain maps in your gaze")
+        self.add_option("output tabstops", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_CRE_ONLY,
+                       lambda p, v: setattr(p.attrs, "tabstops", v), lambda p: p.attrs.get("tabstops", 8),
+                       "Set tabstop display width")
+        self.add_option("output shorthand", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "shorthand_output", v), lambda p: p.attrs.get("shorthand_output", 0),
+                       "Expand shorthand speech from others")
+
+        # Colour options (expanded for 2025)
+        for colour in ["tell", "say", "shout", "inform", "combat", "magic", "faith"]:  # Added faith for Forgotten Realms
+            self.add_option(f"colour {colour}", OPTIONS_TYPE_COLOUR, OPTIONS_TYPE_ALL,
+                           lambda p, v, c=colour: self.set_my_colours(p, c, v), lambda p, c=colour: self.colour_event(p, c),
+                           f"Color for {colour} messages in the Realms")
+        self.add_option("colour inform", OPTIONS_TYPE_DYNAMIC_GROUP, OPTIONS_TYPE_ALL,
+                       None, lambda p: self.get_inform_colours(p),
+                       "Colors for various informational messages")
+        self.add_option("colour party", OPTIONS_TYPE_DYNAMIC_GROUP, OPTIONS_TYPE_ALL,  # 'club' → 'party'
+                       None, lambda p: self.get_party_colours(p),
+                       "Colors for party messages")
+
+        # Terminal options (2025 terminal support)
+        self.add_option("terminal type", OPTIONS_TYPE_TERMINAL, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "term_type", v), lambda p: p.attrs.get("term_type", "ansi"),
+                       "Your scrying device’s terminal type (e.g., ansi, vt100)")
+        self.add_option("terminal rows", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "rows", max(10, min(100, v))), lambda p: p.attrs.get("rows", 24),
+                       "Rows in your viewing portal")
+        self.add_option("terminal cols", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "cols", max(40, min(200, v))), lambda p: p.attrs.get("cols", 80),
+                       "Columns in your viewing portal")
+
+        # Combat options (synced with tactics.py)
+        self.add_option("combat wimpy", OPTIONS_TYPE_PERCENTAGE, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "wimpy", v), lambda p: p.attrs.get("wimpy", 20),
+                       "HP percentage to flee from battle")
+        self.add_option("combat monitor", MONITOR_OPTIONS, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "monitor", MONITOR_OPTIONS.index(v)), lambda p: MONITOR_OPTIONS[p.attrs.get("monitor", 1)],
+                       "Frequency of battle status updates")
+        self.add_option("combat tactics attitude", ["insane", "offensive", "neutral", "defensive", "wimp"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_attitude(p, v), lambda p: self.tactics_handler.query_combat_attitude(p),
+                       "Your stance in combat (see help tactics)")
+        self.add_option("combat tactics response", ["dodge", "parry", "both", "neutral"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_response(p, v), lambda p: self.tactics_handler.query_combat_response(p),
+                       "Your defense in combat (see help tactics)")
+        self.add_option("combat tactics parry", ["left", "right", "both"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_parry(p, v), lambda p: self.tactics_handler.query_combat_parry(p),
+                       "Hand used to parry (see help tactics)")
+        self.add_option("combat tactics unarmed_parry", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_unarmed_parry(p, v), lambda p: self.tactics_handler.query_unarmed_parry(p),
+                       "Parry unarmed if weaponless")
+        self.add_option("combat tactics attack", ["left", "right", "both"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_attack(p, v), lambda p: self.tactics_handler.query_combat_attack(p),
+                       "Hand used to strike (see help tactics)")
+        self.add_option("combat tactics mercy", ["always", "ask", "never"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_mercy(p, v), lambda p: self.tactics_handler.query_combat_mercy(p),
+                       "Mercy toward foes")
+        self.add_option("combat tactics focus", ["head", "chest", "arms", "legs", "none"], OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_focus(p, v), lambda p: self.tactics_handler.query_combat_focus(p),
+                       "Targeted body part in combat")
+        self.add_option("combat tactics distance", OPTIONS_TYPE_INTEGER, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.tactics_handler.set_combat_distance(p, v), lambda p: self.tactics_handler.query_combat_distance(p),
+                       "Preferred combat range (0 for none)")
+        self.add_option("combat killer", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "player_killer", v), lambda p: p.attrs.get("player_killer", 0),
+                       "Register as a hero-slayer")
+
+        # Faith options (new for Forgotten Realms)
+        self.add_option("faith devotion", OPTIONS_TYPE_FAITH, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "devotion", v), lambda p: p.attrs.get("devotion", "none"),
+                       "Your patron deity (e.g., Mystra, Tymora)")
+
+        # Input, earmuff, creator, personal, playtester, player options remain mostly unchanged, just thematic tweaks
+        self.add_option("input ambiguous", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.change_bool_property(p, "ambiguous", not v), lambda p: not p.attrs.get("ambiguous", 0),
+                       "Notify of unclear commands")
+        self.add_option("input andascomma", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: self.change_bool_property(p, "andascomma", not v), lambda p: not p.attrs.get("andascomma", 0),
+                       "Treat 'and' as a list separator")
+        self.add_option("input editor", ["menu", "magic", "command", "ed"], OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "editor", v), lambda p: p.attrs.get("editor", "menu"),
+                       "Your tome-editing tool")
+        self.add_option("input shorthand", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
+                       lambda p, v: setattr(p.attrs, "shorthand", v), lambda p: p.attrs.get("shorthand", 0),
+                       "Expand your shorthand scribing")
+
         # Earmuff options
-        earmuff_events = ["shout", "newbie", "cryer", "remote-soul", "multiple-soul", "multiple-tell", "teach", "tell", "remote", "multiple-remote"]
-        for event in earmuff_events:
+        for event in EARMUFF_EVENTS:
             self.add_option(f"earmuff events {event}", OPTIONS_TYPE_BOOLEAN, OPTIONS_TYPE_ALL,
                            lambda p, v, e=event: self.change_earmuffs(p, e, v), lambda p, e=event: e in p.attrs.get("earmuffs", []),
                            f"Should you be informed of {event} messages")
@@ -261,23 +309,23 @@ class OptionsHandler:
                        lambda p, v: self.set_mxp_disable(p, v), lambda p: self.query_mxp_disable(p),
                        "Disable MXP support")
 
-def init_options(self, obj: Player):
-    if "options" not in obj.attrs:
-        obj.attrs["options"] = {
-            "output": {"look": 0, "combat": 0, "errors": 0, "score": 0, "names": 0, "htell": 0},
-            "combat": {"wimpy": 20, "monitor": 1, "killer": 0},
-            "tactics": {},
-            "colour": {},
-            "terminal": {"type": "ansi", "rows": 24, "cols": 80},
-            "input": {"ambiguous": 0, "andascomma": 0, "editor": "menu", "shorthand": 0},
-            "earmuff": {"state": "off", "cut-through": 0},
-            "faith": {"devotion": "none"},  # Default no deity
-            "personal": {"description": "none", "real_name": "none", "location": "none", "homepage": "none", "email": "none", "birthday": "none", "execinclude": "none", "auto_teach": 0, "travel": "walk"},
-            "playtester": {"protection": 0, "roleplaying": 0},
-            "player": {"follow_groups": 0, "follow_friends": 0, "follow_everyone": 0, "lead_behind": 0, "mxp_disable": 0}
-        }
-        # Set defaults as before, plus devotion
-        obj.attrs.setdefault("devotion", "none")
+    def init_options(self, obj: Player):
+        if "options" not in obj.attrs:
+            obj.attrs["options"] = {
+                "output": {"look": 0, "combat": 0, "errors": 0, "score": 0, "names": 0, "htell": 0},
+                "combat": {"wimpy": 20, "monitor": 1, "killer": 0},
+                "tactics": {},
+                "colour": {},
+                "terminal": {"type": "ansi", "rows": 24, "cols": 80},
+                "input": {"ambiguous": 0, "andascomma": 0, "editor": "menu", "shorthand": 0},
+                "earmuff": {"state": "off", "cut-through": 0},
+                "faith": {"devotion": "none"},  # Default no deity
+                "personal": {"description": "none", "real_name": "none", "location": "none", "homepage": "none", "email": "none", "birthday": "none", "execinclude": "none", "auto_teach": 0, "travel": "walk"},
+                "playtester": {"protection": 0, "roleplaying": 0},
+                "player": {"follow_groups": 0, "follow_friends": 0, "follow_everyone": 0, "lead_behind": 0, "mxp_disable": 0}
+            }
+            # Set defaults as before, plus devotion
+            obj.attrs.setdefault("devotion", "none")
             obj.attrs.setdefault("mangle_accent", False)
             obj.attrs.setdefault("msgout", "")
             obj.attrs.setdefault("msgin", "")
@@ -304,12 +352,14 @@ def init_options(self, obj: Player):
             obj.attrs.setdefault("pt_protection", 0)
             obj.attrs.setdefault("roleplaying", 0)
             self.driver.save_object(obj)
+            self.recompile(obj)
 
     async def options_command(self, obj: MudObject, caller: Player, arg: str) -> str:
         if not isinstance(caller, Player):
             return "Only players can use the options command."
         if caller.oid != obj.oid:
             return "You can only modify your own options."
+        self.init_options(caller)  # Set up on first use rather than for every player at boot
 
         if not arg:
             return self.display_options(caller)
@@ -402,7 +452,7 @@ def init_options(self, obj: Player):
         player.attrs["options"]["output"][var] = value
 
     def query_verbose(self, player: Player, var: str) -> int:
-        return player.attrs["options"]["output"].get(var, 0)
+        return int(self.snapshot(player).is_verbose(var))
 
     def set_my_colours(self, player: Player, key: str, value: str):
         if key in player.attrs.get("colours", {}):
@@ -411,19 +461,23 @@ def init_options(self, obj: Player):
     def colour_event(self, player: Player, key: str) -> str:
         return player.attrs.get("colours", {}).get(key, "default")
 
+    def colour_code(self, player: Player, key: str) -> str:
+        """What player's terminal gets for a colour event, as set by 'options colour <event>'."""
+        return self.snapshot(player).codes.get(key.upper(), "")
+
     def get_inform_colours(self, player: Player) -> Dict:
-        if "inform_colours" not in self._cache_input.get(player.oid, {}):
-            self._cache_input[player.oid]["inform_colours"] = {
+        if "inform_colours" not in self._cache_input.get(player, {}):
+            self._cache_input.setdefault(player, {})["inform_colours"] = {
                 "tell": OPTIONS_TYPE_COLOUR, "say": OPTIONS_TYPE_COLOUR
             }
-        return self._cache_input[player.oid]["inform_colours"]
+        return self._cache_input[player]["inform_colours"]
 
     def get_club_colours(self, player: Player) -> Dict:
-        if "club_colours" not in self._cache_input.get(player.oid, {}):
-            self._cache_input[player.oid]["club_colours"] = {
+        if "club_colours" not in self._cache_input.get(player, {}):
+            self._cache_input.setdefault(player, {})["club_colours"] = {
                 "guild": OPTIONS_TYPE_COLOUR
             }
-        return self._cache_input[player.oid]["club_colours"]
+        return self._cache_input[player]["club_colours"]
 
     def change_bool_property(self, player: Player, prop: str, value: int):
         player.attrs[prop] = value
@@ -514,15 +568,92 @@ def init_options(self, obj: Player):
         return options.mxp_disable
 
     def is_mxp_enabled(self, player: Player) -> bool:
-        return not self.query_mxp_disable(player)  # Simplified, no has_mxp efun
+        return self.snapshot(player).mxp  # Simplified, no has_mxp efun
+
+    def is_earmuffed(self, player: Player, event: str, sender: Optional[MudObject] = None) -> bool:
+        snapshot = self.snapshot(player)
+        if not snapshot.earmuffed(event):
+            return False
+        return not (snapshot.earmuff_state == "allowfriends" and sender is not None
+                    and getattr(sender, "name", None) in player.attrs.get("friends", []))
+
+    def compile(self, player: Optional[Player]) -> OptionsSnapshot:
+        """Flattens player's option settings into a snapshot, reusing an existing one with the same settings."""
+        attrs = getattr(player, "attrs", None) or {}  # A connection that hasn't logged in has no attrs yet
+        options = attrs.get("options", {})
+        output = options.get("output", {})
+        verbose = sum(bit for var, bit in VERBOSE_BITS.items() if output.get(var, 0))
+        muffs = attrs.get("earmuffs")
+        earmuffs = sum(bit for event, bit in EARMUFF_BITS.items() if isinstance(muffs, list) and event in muffs)
+        earmuff_state = "allowfriends" if muffs == "allowfriends" else "on" if muffs else "off"
+        terminal = attrs.get("term_type") or options.get("terminal", {}).get("type", "ansi")
+        colours = tuple(sorted(attrs.get("colours", {}).items()))
+        mxp = not attrs.get("player_options", player_options_control()).mxp_disable
+        key = (verbose, earmuffs, earmuff_state, terminal, colours, mxp)
+        snapshot = self.interned.get(key)
+        if snapshot is None:
+            self.compiles += 1
+            base = dict.fromkeys(PINKFISH, "") if terminal in PLAIN_TERMINALS else dict(PINKFISH)
+            codes = dict(base)
+            chosen = dict(colours)
+            for event, default in DEFAULT_EVENT_COLOURS.items():
+                value = chosen.get(event, "default")
+                value = "" if value == "none" else default if value == "default" else value.replace(" ", "")
+                codes[event.upper()] = "".join([base.get(part, part) for part in value.split("%^")])
+            snapshot = self.interned[key] = OptionsSnapshot(key, codes, earmuffs, earmuff_state, verbose, mxp)
+        return snapshot
+
+    def recompile(self, player: Player):
+        self.snapshots[player] = self.compile(player)
+
+    def snapshot(self, player: Optional[Player]) -> OptionsSnapshot:
+        if player is None:
+            return self.compile(None)
+        snapshot = self.snapshots.get(player)
+        if snapshot is None:
+            snapshot = self.snapshots[player] = self.compile(player)
+        return snapshot
+
+    def forget(self, player: Player):
+        self.snapshots.pop(player, None)
+        self._cache_input.pop(player, None)
+
+    async def tell_players(self, recipients: List[Player], message: str, event: Optional[str] = None,
+                           sender: Optional[MudObject] = None) -> int:
+        """Sends message to each recipient not earmuffing event, rendering it once per distinct snapshot."""
+        rendered: Dict[int, str] = {}
+        sent = 0
+        for player in recipients:
+            if event and self.is_earmuffed(player, event, sender):
+                self.muffled += 1
+                continue
+            snapshot = self.snapshot(player)
+            text = rendered.get(id(snapshot))
+            if text is None:
+                text = rendered[id(snapshot)] = snapshot.render(message)
+                self.renders += 1
+            await player.send(text)
+            sent += 1
+        self.delivered += sent
+        return sent
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("option snapshots", len(self.snapshots)),
+            ("distinct snapshots", len(self.interned)),
+            ("snapshot compiles", self.compiles),
+            ("messages delivered", self.delivered),
+            ("messages earmuffed", self.muffled),
+            ("message renders", self.renders),
+        ]
 
     def add_option(self, name: str, type_: mixed, cre_only: int, set_func: Callable, query_func: Callable, help: str) -> int:
         path = name.split()
         stuff = self._options
-        for option in path[:-1]:
-            if option not in stuff or stuff[option].type != OPTIONS_TYPE_GROUP:
-                stuff[option] = option({"type": OPTIONS_TYPE_GROUP, "restriction": cre_only, "suboptions": {}, "help": help})
-            stuff = stuff[option].suboptions
+        for part in path[:-1]:
+            if part not in stuff or stuff[part].type != OPTIONS_TYPE_GROUP:
+                stuff[part] = option(OPTIONS_TYPE_GROUP, cre_only, None, None, {}, help)
+            stuff = stuff[part].suboptions
         stuff[path[-1]] = option(type_, cre_only, set_func, query_func, {}, help)
         return 1
 
@@ -569,20 +700,20 @@ def init_options(self, obj: Player):
         return []
 
     def query_option_values(self, player: Player, name: str) -> List[str]:
-    stuff = self.query_bottom_sub_option(player, name.split())
-    if isinstance(stuff, option):
-        if isinstance(stuff.type, list):
-            return stuff.type
-        return {
-            OPTIONS_TYPE_BRIEF: ["brief", "verbose"],
-            OPTIONS_TYPE_BOOLEAN: ["on", "off"],
-            OPTIONS_TYPE_INTEGER: ["integer"],
-            OPTIONS_TYPE_STRING: ["string"],
-            OPTIONS_TYPE_PERCENTAGE: ["0..100"],
-            OPTIONS_TYPE_COLOUR: ["none", "default", "colour"],
-            OPTIONS_TYPE_FAITH: ["none", "Mystra", "Tymora", "Bane", "Shar"]  # Forgotten Realms deities
-        }.get(stuff.type, [])
-    return []
+        stuff = self.query_bottom_sub_option(player, name.split())
+        if isinstance(stuff, option):
+            if isinstance(stuff.type, list):
+                return stuff.type
+            return {
+                OPTIONS_TYPE_BRIEF: ["brief", "verbose"],
+                OPTIONS_TYPE_BOOLEAN: ["on", "off"],
+                OPTIONS_TYPE_INTEGER: ["integer"],
+                OPTIONS_TYPE_STRING: ["string"],
+                OPTIONS_TYPE_PERCENTAGE: ["0..100"],
+                OPTIONS_TYPE_COLOUR: ["none", "default", "colour"],
+                OPTIONS_TYPE_FAITH: ["none", "Mystra", "Tymora", "Bane", "Shar"]  # Forgotten Realms deities
+            }.get(stuff.type, [])
+        return []
 
     def query_option_value(self, player: Player, path: str) -> str:
         stuff = self.query_bottom_sub_option(player, path.split())
@@ -625,12 +756,16 @@ def init_options(self, obj: Player):
                 if value in ["none", "default"]:
                     set_value = value
                 else:
-                    colours = [upper_case(c) for c in value.split()]
+                    colours = [c.upper() for c in value.split()]
                     bad = [c for c in colours if c not in self._colours]
                     if bad:
                         return False
                     set_value = "%^" + "%^ %^".join(colours) + "%^"
-        return stuff.set(player, set_value) if set_value is not None else False
+        if set_value is None:
+            return False
+        result = stuff.set(player, set_value)
+        self.recompile(player)  # The only place settings change, so the message path never rebuilds them
+        return result
 
     def help_text(self) -> str:
         output = "Options help:\n"
@@ -649,4 +784,5 @@ def init_options(self, obj: Player):
 options_handler = OptionsHandler()
 
 async def init(driver_instance):
+    driver_instance.options_handler = options_handler
     await options_handler.init(driver_instance)
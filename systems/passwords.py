@@ -0,0 +1,37 @@
+# /mnt/home2/mud/systems/passwords.py
+# Imported to: login_handler.py
+# Imports from: none (runs inside the driver's process pool, so it must not import the driver)
+
+from typing import Tuple
+import hashlib
+import hmac
+import os
+
+KDF_NAME = "pbkdf2_sha256"
+KDF_ITERATIONS = 200000  # Raise as hardware allows; older rows are rehashed at their next login
+SALT_BYTES = 16
+
+def hash_password(password: str, iterations: int = KDF_ITERATIONS) -> str:
+    """Returns a salted KDF hash as 'pbkdf2_sha256$iterations$salt$hash'."""
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{KDF_NAME}${iterations}${salt.hex()}${digest.hex()}"
+
+def verify_password(password: str, stored: str, iterations: int = KDF_ITERATIONS) -> Tuple[bool, bool]:
+    """Checks password against a stored hash, returning (matches, needs rehash).
+    Bare SHA-256 rows from before the KDF always need a rehash."""
+    if not stored:
+        return False, False
+    if "$" not in stored:
+        matches = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+        return matches, matches
+    try:
+        name, rounds, salt, digest = stored.split("$")
+        rounds = int(rounds)
+        salt = bytes.fromhex(salt)
+    except ValueError:
+        return False, False
+    if name != KDF_NAME:
+        return False, False
+    matches = hmac.compare_digest(hashlib.pbkdf2_hmac("sha256", password.encode(), salt, rounds).hex(), digest)
+    return matches, matches and rounds < iterations
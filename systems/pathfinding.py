@@ -0,0 +1,260 @@
+# /mnt/home2/mud/systems/pathfinding.py
+# Imported to: room.py, living.py, combat.py
+# Imports from: driver.py
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..driver import driver, MudObject
+from collections import OrderedDict
+from heapq import heappush, heappop
+import math
+
+ROUTE_CACHE_SIZE = 4096
+DEFAULT_STEP = 10  # Cost of an exit between rooms with unknown co-ordinates
+MAX_EXPANSIONS = 20000  # Give up on a search after settling this many rooms
+
+class PathfindingHandler:
+    def __init__(self):
+        self.node_ids: Dict[str, int] = {}  # {room path: node id}
+        self.names: List[str] = []  # Node id -> room path
+        self.edges: List[Dict[str, int]] = []  # Node id -> {direction: node id}
+        self.reverse: List[Dict[int, str]] = []  # Node id -> {source node id: direction}
+        self.coords: List[Optional[Tuple[int, int, int]]] = []
+        self.routes: "OrderedDict[Tuple[int, int, int], Optional[List[int]]]" = OrderedDict()
+        self.routes_through: Dict[int, set] = {}  # {node id: route keys that use it}
+        self.version = 0  # Part of every route key; bumped when an exit is added
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, room: str) -> str:
+        """Normalises a room path so '/room/x' and 'room/x' are one node."""
+        return room.lstrip("/")
+
+    def node(self, room: str) -> int:
+        """Returns the node id for a room path, adding it if unseen."""
+        key = self._key(room)
+        nid = self.node_ids.get(key)
+        if nid is None:
+            nid = self.node_ids[key] = len(self.names)
+            self.names.append(key)
+            self.edges.append({})
+            self.reverse.append({})
+            self.coords.append(None)
+        return nid
+
+    def set_coords(self, room: str, co_ord: Optional[List[int]]):
+        """Records a room's co-ordinates for the search heuristic."""
+        nid = self.node(room)
+        self.coords[nid] = tuple(co_ord) if co_ord else None
+
+    def set_exits(self, room: str, exits: Iterable[Tuple[str, str]]):
+        """Replaces a room's outgoing exits and drops routes that used it."""
+        nid = self.node(room)
+        old = self.edges[nid]
+        for dest in old.values():
+            self.reverse[dest].pop(nid, None)
+        self.edges[nid] = {}
+        for direc, dest in exits:
+            did = self.node(dest)
+            self.edges[nid][direc] = did
+            self.reverse[did][nid] = direc
+        self.invalidate(nid)
+        if any(old.get(direc) != did for direc, did in self.edges[nid].items()):
+            # A new exit can be a shortcut for any cached route, or connect rooms we gave up on
+            self.version += 1
+
+    def index_room(self, room: MudObject):
+        """Indexes a loaded room's exits and co-ordinates."""
+        self.set_exits(room.oid, [(direc, ex.dest) for direc, ex in room.exit_map.items()])
+        self.set_coords(room.oid, room.co_ord)
+
+    def index_terrain(self, terrain: str):
+        """Indexes unloaded terrain rooms from the terrain handler's connection data."""
+        handler = driver.handler("terrain_handler")
+        if not handler:
+            return
+        for file, co_ords in handler.query_fixed_locations(terrain).items():
+            self.set_coords(file, co_ords)
+        for x, ys in handler.float_cache.get(terrain, {}).items():
+            for y, zs in ys.items():
+                for z, connections in zs.items():
+                    co_ords = [x, y, z]
+                    source = handler.member_fixed_locations(co_ords) or handler.member_cloned_locations(co_ords)
+                    if not source:
+                        continue
+                    self.set_coords(source, co_ords)
+                    nid = self.node(source)
+                    exits = [(direc, self.names[dest]) for direc, dest in self.edges[nid].items()]
+                    self.set_exits(source, exits + list(connections.items()))
+
+    def remove_room(self, room: str):
+        """Forgets a room's outgoing exits, e.g. when it is destructed."""
+        key = self._key(room)
+        if key in self.node_ids:
+            self.set_exits(key, [])
+
+    def invalidate(self, nid: int):
+        """Drops every cached route passing through a node."""
+        for key in self.routes_through.pop(nid, ()):
+            path = self.routes.pop(key, None)
+            self._unlink(key, path)
+
+    def _route_key(self, start: int, goal: int) -> Tuple[int, int, int]:
+        """Keys a route by its ends and the graph version it was searched on."""
+        return (start, goal, self.version)
+
+    def _unlink(self, key: Tuple[int, int, int], path: Optional[List[int]]):
+        """Removes a route key from the through-index of its nodes."""
+        for nid in (path or key[:2]):
+            keys = self.routes_through.get(nid)
+            if keys:
+                keys.discard(key)
+
+    def _remember(self, key: Tuple[int, int, int], path: Optional[List[int]]):
+        """Stores a route, evicting the oldest when the cache is full. Routes from older graph
+        versions are never hit again, so they age out of the cache the same way."""
+        self.routes[key] = path
+        for nid in (path or key[:2]):
+            self.routes_through.setdefault(nid, set()).add(key)
+        if len(self.routes) > ROUTE_CACHE_SIZE:
+            old_key, old_path = self.routes.popitem(last=False)
+            self._unlink(old_key, old_path)
+
+    def _distance(self, a: int, b: int) -> float:
+        """Straight-line distance between two nodes, 0 if either is unplaced."""
+        ca, cb = self.coords[a], self.coords[b]
+        if not ca or not cb:
+            return 0.0
+        return math.dist(ca, cb)
+
+    def _step_cost(self, a: int, b: int) -> float:
+        """Cost of walking one exit."""
+        return max(self._distance(a, b), DEFAULT_STEP)
+
+    def _search(self, start: int, goal: int) -> Optional[List[int]]:
+        """A* over the exit graph using room co-ordinates as the heuristic."""
+        if start == goal:
+            return [start]
+        open_heap = [(self._distance(start, goal), 0.0, start)]
+        came_from: Dict[int, int] = {start: -1}
+        cost: Dict[int, float] = {start: 0.0}
+        expansions = 0
+        while open_heap and expansions < MAX_EXPANSIONS:
+            _, so_far, current = heappop(open_heap)
+            if current == goal:
+                path = [current]
+                while came_from[path[-1]] != -1:
+                    path.append(came_from[path[-1]])
+                return path[::-1]
+            if so_far > cost.get(current, math.inf):
+                continue
+            expansions += 1
+            for nxt in self.edges[current].values():
+                new_cost = so_far + self._step_cost(current, nxt)
+                if new_cost < cost.get(nxt, math.inf):
+                    cost[nxt] = new_cost
+                    came_from[nxt] = current
+                    heappush(open_heap, (new_cost + self._distance(nxt, goal), new_cost, nxt))
+        return None
+
+    def _directions(self, path: List[int]) -> List[str]:
+        """Turns a node path into the exit directions to walk."""
+        return [self.reverse[b][a] for a, b in zip(path, path[1:])]
+
+    def find_route(self, source: str, dest: str) -> Optional[List[str]]:
+        """Returns the list of directions from source to dest, or None."""
+        key = self._route_key(self.node(source), self.node(dest))
+        if key in self.routes:
+            self.hits += 1
+            self.routes.move_to_end(key)
+            path = self.routes[key]
+        else:
+            self.misses += 1
+            path = self._search(*key[:2])
+            self._remember(key, path)
+        return self._directions(path) if path else None
+
+    def next_step(self, source: str, dest: str) -> Optional[str]:
+        """Returns the first direction to take towards dest."""
+        route = self.find_route(source, dest)
+        return route[0] if route else None
+
+    def find_routes_to(self, sources: Iterable[str], dest: str) -> Dict[str, Optional[List[str]]]:
+        """Routes many rooms to one destination with a single backwards search."""
+        goal = self.node(dest)
+        wanted = {self._key(s): self.node(s) for s in sources}
+        results: Dict[str, Optional[List[str]]] = {}
+        pending = set()
+        for name, nid in wanted.items():
+            key = self._route_key(nid, goal)
+            if key in self.routes:
+                self.hits += 1
+                path = self.routes[key]
+                results[name] = self._directions(path) if path else None
+            else:
+                pending.add(nid)
+        if not pending:
+            return results
+        self.misses += len(pending)
+        # Dijkstra outwards from the goal along reversed exits
+        towards: Dict[int, int] = {goal: -1}
+        cost: Dict[int, float] = {goal: 0.0}
+        heap = [(0.0, goal)]
+        left = set(pending)
+        expansions = 0
+        while heap and left and expansions < MAX_EXPANSIONS:
+            so_far, current = heappop(heap)
+            if so_far > cost.get(current, math.inf):
+                continue
+            left.discard(current)
+            expansions += 1
+            for prev in self.reverse[current]:
+                new_cost = so_far + self._step_cost(prev, current)
+                if new_cost < cost.get(prev, math.inf):
+                    cost[prev] = new_cost
+                    towards[prev] = current
+                    heappush(heap, (new_cost, prev))
+        for name, nid in wanted.items():
+            if nid not in pending:
+                continue
+            path = None
+            if nid in towards and nid not in left:
+                path = [nid]
+                while towards[path[-1]] != -1:
+                    path.append(towards[path[-1]])
+            self._remember(self._route_key(nid, goal), path)
+            results[name] = self._directions(path) if path else None
+        return results
+
+    def batch_routes(self, requests: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[List[str]]]:
+        """Answers many (source, dest) queries, sharing one search per destination."""
+        by_dest: Dict[str, List[str]] = {}
+        for source, dest in requests:
+            by_dest.setdefault(dest, []).append(source)
+        results = {}
+        for dest, sources in by_dest.items():
+            routes = self.find_routes_to(sources, dest)
+            for source in sources:
+                results[(source, dest)] = routes.get(self._key(source))
+        return results
+
+    def query_exits(self, room: str) -> Dict[str, str]:
+        """Returns the indexed {direction: destination} exits of a room."""
+        nid = self.node_ids.get(self._key(room))
+        if nid is None:
+            return {}
+        return {direc: self.names[dest] for direc, dest in self.edges[nid].items()}
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("rooms indexed", len(self.names)),
+            ("exits indexed", sum(len(e) for e in self.edges)),
+            ("cached routes", len(self.routes)),
+            ("route cache hits", self.hits),
+            ("route cache misses", self.misses),
+        ]
+
+pathfinding_handler = PathfindingHandler()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.pathfinding = pathfinding_handler
@@ -261,6 +261,8 @@ class Player(Living, EffectsMixin):
         if race in race_handler.races and race_handler.races[race]["playable"]:
             self.race = race
             race_handler.apply_race_effects(self)
+            if driver.handler("lighting") is not None:
+                driver.lighting.invalidate_viewer(self)
             return True
         return False
 
@@ -1,44 +1,157 @@
 # /mnt/home2/mud/systems/player_handler.py
 # Imported to: quest.py, login_handler.py, living.py
-# Imports from: driver.py
+# Imports from: driver.py, journal.py
 
-from typing import Dict, List, Optional, Union
-from ..driver import driver, Player
+from typing import Dict, List, Optional, Tuple, Union
+from ..driver import driver, logger, Player
+from .journal import journals
+from heapq import nlargest
 import asyncio
 import os
 import time
 import json
 
+INDEX_FILE = "index.json"  # Kept beside the save files
+INDEX_FLUSH = 60  # Seconds between index writes and evictions of offline records
+
+class IndexEntry:
+    """What the handler knows about a player without loading their save file."""
+    __slots__ = ("file", "last_login", "version", "banned")
+
+    def __init__(self, file: Optional[str], last_login: int = 0, version: Optional[str] = None, banned: bool = False):
+        self.file = file  # Save file name in player_dir, None for a banned name that never played
+        self.last_login = last_login
+        self.version = version
+        self.banned = banned
+
+    def to_row(self) -> List:
+        return [self.file, self.last_login, self.version, self.banned]
+
 class PlayerHandler:
     SAVE_VERSION = "2025.03"  # Version for save file compatibility
 
     def __init__(self):
-        self.players: Dict[str, Dict] = {}  # {player_name: {oid, last_login, attrs, static_load, dynamic_load}}
-        self.banned: List[str] = []
+        self.index: Dict[str, IndexEntry] = {}  # {player_name: index entry}, every player ever saved
+        self.players: Dict[str, Dict] = {}  # {player_name: full record}, only those loaded since the last eviction
         self.player_dir: str = "/save/players"
+        self.index_dirty = False
+        self.faults = 0
+        self.evictions = 0
 
     async def init(self, driver_instance):
         """Initializes the player handler with Faerûn’s ethereal records."""
         self.driver = driver_instance
         if not os.path.exists(self.player_dir):
             os.makedirs(self.player_dir)
-        for filename in os.listdir(self.player_dir):
-            if filename.endswith(".o"):
-                name = filename[:-2].lower()
-                try:
-                    data = driver.load_object(f"{self.player_dir}/{name}.o")
-                    if data and data.get("version") == self.SAVE_VERSION:
-                        self.players[name] = data
-                    else:
-                        driver.log_file("PLAYER_ERRORS", f"{time.ctime()} Corrupted/old save for {name}, skipping.\n")
-                except Exception as e:
-                    driver.log_file("PLAYER_ERRORS", f"{time.ctime()} Failed to load {name}: {str(e)}\n")
+        if not self.load_index():
+            self.rebuild_index()
         driver.player_handler = self
+        asyncio.create_task(self.index_loop())
+
+    def load_index(self) -> bool:
+        """Reads the player index, returning False if it is missing or unreadable."""
+        path = f"{self.player_dir}/{INDEX_FILE}"
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                rows = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Player index unreadable, rebuilding: {e}")
+            return False
+        self.index = {name: IndexEntry(*row) for name, row in rows.items()}
+        return True
+
+    def rebuild_index(self):
+        """Scans every save file once to build the index, keeping none of the records."""
+        banned = {name for name, entry in self.index.items() if entry.banned}
+        self.index = {}
+        # A player saved only since the last compaction has a log but no snapshot yet
+        saves = {filename[:filename.rindex(".o")] for filename in os.listdir(self.player_dir)
+                 if filename.endswith(".o") or filename.endswith(".o.log")}
+        for stem in saves:
+            name = stem.lower()
+            path = f"{self.player_dir}/{stem}.o"
+            try:
+                data = journals.open(path).load()
+                journals.close(path)
+                if data and data.get("version") == self.SAVE_VERSION:
+                    self.index[name] = IndexEntry(f"{stem}.o", data.get("last_login", 0), data["version"], name in banned)
+                else:
+                    logger.error(f"Corrupted/old save for {name}, skipping")
+            except Exception as e:
+                logger.error(f"Failed to load {name}: {e}")
+        for name in banned - self.index.keys():
+            self.index[name] = IndexEntry(None, banned=True)
+        self.save_index()
+
+    def save_index(self):
+        """Writes the index through a temporary file so a crash leaves the old one intact."""
+        path = f"{self.player_dir}/{INDEX_FILE}"
+        with open(path + ".tmp", "w") as f:
+            json.dump({name: entry.to_row() for name, entry in self.index.items()}, f)
+        os.replace(path + ".tmp", path)
+        self.index_dirty = False
+
+    def _touch(self, name: str, record: Dict):
+        """Brings a player's index entry in line with their record."""
+        entry = self.index.get(name)
+        if entry is None:
+            entry = self.index[name] = IndexEntry(None)
+        entry.file = f"{name}.o"
+        entry.last_login = record.get("last_login", entry.last_login)
+        entry.version = record.get("version", entry.version)
+        self.index_dirty = True
+
+    def online(self) -> set:
+        """Returns the lowercased names of everyone currently connected."""
+        return {player.name.lower() for player in driver.players.values() if getattr(player, "name", None)}
+
+    def evict_offline(self) -> int:
+        """Drops the full records of players who are no longer logged in."""
+        online = self.online()
+        offline = [name for name in self.players if name not in online]
+        for name in offline:
+            del self.players[name]
+            journals.close(f"{self.player_dir}/{name}.o")
+        self.evictions += len(offline)
+        return len(offline)
+
+    async def index_loop(self):
+        """Flushes index changes and evicts offline records every INDEX_FLUSH seconds."""
+        while True:
+            await asyncio.sleep(INDEX_FLUSH)
+            if self.index_dirty:
+                self.save_index()
+            self.evict_offline()
+
+    def test_user(self, name: str) -> bool:
+        """Checks whether a soul has ever walked Faerûn, from the index alone."""
+        entry = self.index.get(name.lower())
+        return bool(entry and entry.file)
+
+    def query_last_login(self, name: str) -> Optional[int]:
+        entry = self.index.get(name.lower())
+        return entry.last_login if entry and entry.file else None
+
+    def query_finger(self, name: str) -> Optional[Dict]:
+        """Returns the public facts about a soul without summoning their record."""
+        name = name.lower()
+        entry = self.index.get(name)
+        if not entry or not entry.file:
+            return None
+        return {"name": name, "last_login": entry.last_login, "banned": entry.banned,
+                "online": name in self.online()}
+
+    def query_last_on(self, count: int = 10) -> List[Tuple[str, int]]:
+        """Returns the count most recent logins as (name, last_login)."""
+        return nlargest(count, ((name, entry.last_login) for name, entry in self.index.items() if entry.file),
+                        key=lambda pair: pair[1])
 
     def add_player(self, player: Player) -> bool:
         """Adds a new soul to Faerûn’s annals."""
         name = player.name.lower()
-        if name in self.players or name in self.banned:
+        if self.test_user(name) or self.is_banned(name):
             return False
         self.players[name] = {
             "oid": player.oid,
@@ -57,23 +170,40 @@ class PlayerHandler:
             "version": self.SAVE_VERSION
         }
         self.save_player(player)
+        self.save_index()
         return True
 
     def remove_player(self, name: str) -> bool:
         """Banishes a soul from Faerûn’s records."""
         name = name.lower()
-        if name not in self.players:
+        if not self.test_user(name):
             return False
-        del self.players[name]
+        self.players.pop(name, None)
+        entry = self.index.pop(name)
+        if entry.banned:
+            self.index[name] = IndexEntry(None, banned=True)
+        self.save_index()
         save_path = f"{self.player_dir}/{name}.o"
-        if os.path.exists(save_path):
-            os.remove(save_path)
+        if os.path.exists(save_path) or os.path.exists(save_path + ".log"):
+            journals.open(save_path).remove()
+            journals.close(save_path)
             driver.log_file("PLAYER_EVENTS", f"{time.ctime()} {name}’s record sundered from the Veil.\n")
         return True
 
     def query_player(self, name: str) -> Optional[Dict]:
-        """Peers into the Veil for a soul’s record."""
-        return self.players.get(name.lower())
+        """Peers into the Veil for a soul’s record, reading it from disk if it is not resident."""
+        name = name.lower()
+        record = self.players.get(name)
+        if record is None and self.test_user(name):
+            try:
+                record = journals.open(f"{self.player_dir}/{self.index[name].file}").load()
+            except Exception as e:
+                logger.error(f"Failed to load {name}: {e}")
+                return None
+            if record:
+                self.players[name] = record
+                self.faults += 1
+        return record
 
     def save_player(self, player: Union[Player, str]):
         """Etches a soul’s essence into the Ethereal Veil."""
@@ -81,7 +211,7 @@ class PlayerHandler:
             name = player.lower()
         else:
             name = player.name.lower()
-        if name in self.players:
+        if self.query_player(name) is not None:
             if isinstance(player, Player):
                 self.players[name].update({
                     "attrs": player.attrs.copy(),
@@ -97,12 +227,13 @@ class PlayerHandler:
                     "piety": player.piety,
                     "last_login": int(time.time())
                 })
-            driver.save_object(f"{self.player_dir}/{name}.o", self.players[name])
+            journals.open(f"{self.player_dir}/{name}.o").save(self.players[name])
+            self._touch(name, self.players[name])
 
     async def load_player(self, name: str) -> Optional[Player]:
         """Summons a soul back to Faerûn from the Veil (2025 update)."""
         name = name.lower()
-        if name in self.banned:
+        if self.is_banned(name):
             return None
         player_data = self.query_player(name)
         if not player_data or player_data.get("version") != self.SAVE_VERSION:
@@ -133,27 +264,39 @@ class PlayerHandler:
     def ban_player(self, name: str):
         """Casts a soul into the Fugue Plane’s exile."""
         name = name.lower()
-        if name not in self.banned:
-            self.banned.append(name)
+        entry = self.index.get(name)
+        if entry is None:
+            entry = self.index[name] = IndexEntry(None)
+        if not entry.banned:
+            entry.banned = True
+            self.save_index()
             driver.log_file("BANS", f"{time.ctime()} {name} banished to the Fugue Plane.\n")
 
     def unban_player(self, name: str) -> bool:
         """Restores a soul from exile under Kelemvor’s judgment."""
         name = name.lower()
-        if name in self.banned:
-            self.banned.remove(name)
+        entry = self.index.get(name)
+        if entry and entry.banned:
+            entry.banned = False
+            if not entry.file:
+                del self.index[name]
+            self.save_index()
             driver.log_file("BANS", f"{time.ctime()} {name} redeemed from the Fugue Plane.\n")
             return True
         return False
 
     def query_banned(self) -> List[str]:
         """Lists souls barred from Faerûn’s weave."""
-        return self.banned.copy()
+        return [name for name, entry in self.index.items() if entry.banned]
+
+    def is_banned(self, name: str) -> bool:
+        entry = self.index.get(name.lower())
+        return bool(entry and entry.banned)
 
     async def update_player(self, player: Player):
         """Refreshes a soul’s mark in the Veil’s tapestry."""
         name = player.name.lower()
-        if name in self.players:
+        if self.query_player(name) is not None:
             self.players[name].update({
                 "attrs": player.attrs.copy(),
                 "static_load": player.query_static_auto_load(),
@@ -170,6 +313,14 @@ class PlayerHandler:
             })
             self.save_player(player)
 
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("indexed players", sum(1 for entry in self.index.values() if entry.file)),
+            ("resident records", len(self.players)),
+            ("records faulted in", self.faults),
+            ("records evicted", self.evictions),
+        ]
+
 player_handler = PlayerHandler()
 
 async def init(driver_instance):
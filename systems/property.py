@@ -4,6 +4,7 @@
 
 from typing import Dict, Optional, Union
 from ..driver import driver, MudObject
+from .expiry import expiry
 import asyncio
 import time
 
@@ -24,36 +25,34 @@ class Property:
         else:
             if duration > 0:
                 self.temp_properties[name] = (value, duration, int(time.time()))
-                driver.call_out(lambda: self.remove_property(name), duration)
+                expiry.schedule(self, "expire_property", name, duration, name)
 
     def remove_property(self, name: str) -> bool:
         """Removes a property, permanent or temporary."""
         if name in self.properties:
             del self.properties[name]
             return True
-        if name in self.temp_properties:
-            del self.temp_properties[name]
-            return True
-        return False
+        return self.expire_property(name)
+
+    def expire_property(self, name: str) -> bool:
+        """Removes a temporary property; called by the expiry service when it runs out."""
+        if name not in self.temp_properties:
+            return False
+        del self.temp_properties[name]
+        expiry.cancel(self, "expire_property", name)
+        return True
 
     def query_property(self, name: str) -> Optional[Union[str, int, list]]:
         """Queries a property, checking temp first (2025 update)."""
         if name in self.temp_properties:
-            value, duration, start = self.temp_properties[name]
-            if int(time.time()) < start + duration:
-                return value
-            del self.temp_properties[name]
+            return self.temp_properties[name][0]
         return self.properties.get(name)
 
     def query_properties(self) -> Dict[str, Union[str, int, list]]:
         """Returns all current properties, merging temp and permanent."""
         props = self.properties.copy()
-        current_time = int(time.time())
-        for name, (value, duration, start) in list(self.temp_properties.items()):
-            if current_time < start + duration:
-                props[name] = value
-            else:
-                del self.temp_properties[name]
+        for name, (value, _, _) in self.temp_properties.items():
+            props[name] = value
         return props
 
     async def check_property(self, obj: MudObject, name: str) -> bool:
@@ -0,0 +1,234 @@
+# /mnt/home2/mud/systems/reloader.py
+# Imported to: driver.py
+# Imports from: driver.py
+
+from typing import Any, Callable, Dict, List, Set, Tuple
+from ..driver import driver, logger
+import gc
+import importlib
+import sys
+import time
+import types
+
+RELOADABLE = ("systems.", "efuns.")  # Module prefixes the reloader will touch
+
+def is_plugin(name: str) -> bool:
+    return name.startswith(RELOADABLE) or any(f".{prefix}" in name for prefix in RELOADABLE)
+
+class ReloadReport:
+    def __init__(self, module: str):
+        self.module = module
+        self.seconds = 0.0
+        self.classes = 0  # Classes replaced by their new definition
+        self.instances = 0  # Live objects moved onto a new class
+        self.subclasses = 0  # Classes elsewhere whose bases were repointed
+        self.handlers = 0  # Module-level handlers kept across the reload
+        self.migrated = 0  # Of those, how many ran a __migrate__ hook
+        self.actions = 0  # add_action and call_out callbacks rebound
+        self.references = 0  # Names in other modules repointed at the new definitions
+        self.failures: List[str] = []
+
+    def rows(self) -> List[Tuple[str, Any]]:
+        return [
+            ("module", self.module),
+            ("reload msec", round(self.seconds * 1000, 2)),
+            ("classes swapped", self.classes),
+            ("instances updated", self.instances),
+            ("subclasses rebased", self.subclasses),
+            ("handlers kept", self.handlers),
+            ("handlers migrated", self.migrated),
+            ("actions rebound", self.actions),
+            ("references updated", self.references),
+            ("failures", len(self.failures)),
+        ] + [("failure", failure) for failure in self.failures]
+
+class Reloader:
+    def __init__(self):
+        self.reloads = 0
+        self.failed = 0
+        self.history: List[ReloadReport] = []
+
+    def find(self, name: str) -> types.ModuleType:
+        module = driver.plugins.get(name) or sys.modules.get(name)
+        if module is None:
+            module = next((m for key, m in sys.modules.items() if key.endswith("." + name)), None)
+        if module is None or not is_plugin(module.__name__):
+            raise ValueError(f"{name} is not a loaded systems or efuns module")
+        return module
+
+    def own(self, module: types.ModuleType, namespace: Dict[str, Any]) -> Tuple[Dict[str, type], Dict[str, Any], Dict[str, Callable]]:
+        """Splits a module namespace into the classes, handler instances and functions it defines."""
+        classes, handlers, functions = {}, {}, {}
+        for key, value in namespace.items():
+            if isinstance(value, type) and value.__module__ == module.__name__:
+                classes[key] = value
+            elif isinstance(value, types.FunctionType) and value.__module__ == module.__name__:
+                functions[key] = value
+            elif type(value).__module__ == module.__name__ and not isinstance(value, type):
+                handlers[key] = value
+        return classes, handlers, functions
+
+    def reload(self, name: str) -> List[Tuple[str, Any]]:
+        """Reimports a plugin and moves everything live onto the new code, returning a report.
+        The module's init() is not run again, so loops it started keep their tasks."""
+        report = ReloadReport(name)
+        start = time.perf_counter()
+        module = self.find(name)
+        saved = dict(module.__dict__)
+        old_classes, old_handlers, old_functions = self.own(module, saved)
+        try:
+            importlib.reload(module)
+        except Exception as e:
+            # reload runs in the old namespace, so a failed import would leave it half replaced
+            module.__dict__.clear()
+            module.__dict__.update(saved)
+            self.failed += 1
+            report.failures.append(f"import: {e}")
+            report.seconds = time.perf_counter() - start
+            return report.rows()
+        new_classes, new_handlers, new_functions = self.own(module, module.__dict__)
+
+        swap = {old: new_classes[key] for key, old in old_classes.items()
+                if key in new_classes and new_classes[key] is not old}
+        report.classes = len(swap)
+        replaced: Dict[int, Any] = {id(old): new for old, new in swap.items()}
+        for key, old in old_functions.items():
+            if key in new_functions:
+                replaced[id(old)] = new_functions[key]
+
+        self.swap_instances(swap, report)
+        self.keep_handlers(module, old_handlers, new_handlers, report)
+        if callable(module.__dict__.get("__migrate__")):
+            try:
+                module.__migrate__(saved)
+            except Exception as e:
+                report.failures.append(f"module __migrate__: {e}")
+        self.repoint(module, replaced, report)
+        self.rebind(module, report)
+        shadows = driver.handler("shadow_handler", load=False)
+        if shadows is not None:  # Shadowed objects hold the outermost shadow methods bound on themselves
+            for obj in list(shadows.chains):
+                shadows.refresh(obj)
+
+        self.reloads += 1
+        report.seconds = time.perf_counter() - start
+        self.history = (self.history + [report])[-20:]
+        logger.info(f"Reloaded {name}: {report.instances} instances, "
+                    f"{report.actions} actions in {report.seconds * 1000:.1f} msec")
+        return report.rows()
+
+    def swap_instances(self, swap: Dict[type, type], report: ReloadReport):
+        """Moves live instances and subclasses defined elsewhere onto the new classes."""
+        if not swap:
+            return
+        for obj in gc.get_objects():
+            cls = type(obj)
+            if cls in swap:
+                try:
+                    obj.__class__ = swap[cls]
+                    report.instances += 1
+                except TypeError as e:
+                    report.failures.append(f"{cls.__qualname__} instance: {e}")
+            elif isinstance(obj, type) and obj not in swap and any(base in swap for base in obj.__bases__):
+                try:
+                    obj.__bases__ = tuple(swap.get(base, base) for base in obj.__bases__)
+                    report.subclasses += 1
+                except TypeError as e:
+                    report.failures.append(f"{obj.__qualname__} bases: {e}")
+
+    def keep_handlers(self, module: types.ModuleType, old: Dict[str, Any], new: Dict[str, Any], report: ReloadReport):
+        """Keeps each live handler, since rooms and the driver hold it directly, and lets it
+        take what it needs from the freshly built one through __migrate__(fresh)."""
+        for key, live in old.items():
+            fresh = new.get(key)
+            if fresh is None or fresh is live:
+                continue
+            if type(live) is not type(fresh):
+                try:
+                    live.__class__ = type(fresh)
+                except TypeError as e:
+                    report.failures.append(f"handler {key}: {e}")
+                    continue
+            try:
+                if hasattr(live, "__migrate__"):
+                    live.__migrate__(fresh)
+                    report.migrated += 1
+                elif hasattr(live, "__dict__") and hasattr(fresh, "__dict__"):
+                    for attr, value in vars(fresh).items():
+                        live.__dict__.setdefault(attr, value)  # New fields get their defaults, old state stays
+            except Exception as e:
+                report.failures.append(f"handler {key} __migrate__: {e}")
+            setattr(module, key, live)
+            report.handlers += 1
+
+    def repoint(self, module: types.ModuleType, replaced: Dict[int, Any], report: ReloadReport):
+        """Updates 'from x import Name' bindings in other plugin modules."""
+        if not replaced:
+            return
+        for other in list(sys.modules.values()):
+            if other is module or other is None or not is_plugin(other.__name__):
+                continue
+            for key, value in list(vars(other).items()):
+                new = replaced.get(id(value))
+                if new is not None:
+                    setattr(other, key, new)
+                    report.references += 1
+
+    def rebound(self, func: Any, module: types.ModuleType) -> Any:
+        """Returns func looked up again on the new code, or None if it didn't come from module."""
+        target = getattr(func, "__func__", func)
+        if getattr(target, "__module__", None) != module.__name__ or getattr(target, "__name__", "") == "<lambda>":
+            return None
+        owner = getattr(func, "__self__", None)
+        if owner is not None:
+            new = getattr(owner, target.__name__, None)
+        else:
+            new = getattr(module, target.__name__, None)
+        return new if new is not None and getattr(new, "__func__", new) is not target else None
+
+    def rebind(self, module: types.ModuleType, report: ReloadReport):
+        """Points add_action and declared verbs and pending call_outs at the reloaded functions."""
+        seen: Set[int] = set()
+        owners = list(driver.objects.values()) + list(driver.players.values())
+        for obj in owners:
+            actions = getattr(obj, "actions", None)
+            if not actions or id(actions) in seen:
+                continue
+            seen.add(id(actions))  # Clones share their blueprint's dict until one of them adds an action
+            changed = False
+            for verb, func in list(actions.items()):
+                new = self.rebound(func, module)
+                if new is not None:
+                    actions[verb] = new
+                    report.actions += 1
+                    changed = True
+            if changed and driver.handler("command_dispatcher") is not None:
+                driver.command_dispatcher.source_changed(obj)
+        declared = 0
+        for verb, (func, applies) in list(driver.declared_actions.items()):
+            new = self.rebound(func, module)
+            if new is not None:
+                driver.declared_actions[verb] = (new, applies)
+                declared += 1
+        if declared:
+            driver.class_actions.clear()
+            report.actions += declared
+            if driver.handler("command_dispatcher") is not None:
+                driver.command_dispatcher.invalidate()
+        for i, (when, func, args) in enumerate(driver.task_queue):
+            new = self.rebound(func, module)
+            if new is not None:
+                driver.task_queue[i] = (when, new, args)
+                report.actions += 1
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("reloads", self.reloads),
+            ("failed reloads", self.failed),
+        ]
+
+reloader = Reloader()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.reloader = reloader
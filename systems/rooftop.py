@@ -3,6 +3,7 @@
 # /mnt/home2/mud/systems/rooftop.py
 from typing import Optional, List, Dict, Union
 from ..driver import driver, MudObject, Player
+from .shadow import shadow_handler
 import math
 import random
 
@@ -11,6 +12,8 @@ TOO_SOON = "too soon to proceed from rooftop"
 ROCK = "other.movement.climbing.rock"
 
 class Rooftop(MudObject):
+    shadow_priority = 30  # Outermost of the room shadows
+
     def __init__(self, oid: str, name: str):
         super().__init__(oid, name)
         self.room: Optional[MudObject] = None
@@ -73,6 +76,7 @@ class Rooftop(MudObject):
 
  def setup_shadow(self, room: MudObject):
     self.room = room
+    shadow_handler.attach(room, self, self.shadow_priority)
     self.wall = driver.clone_object("/systems/wall")
     self.wall.setup_shadow(room)
     self.room.add_command("jump", "<word'direction'>", lambda dir: self.do_roofjump(dir))
@@ -80,6 +84,8 @@ class Rooftop(MudObject):
     
     def destruct_shadow(self):
         """Destroys the rooftop shadow and cleans up."""
+        if self.room:
+            shadow_handler.detach(self.room, self)
         if self.room and self.wall:
             self.wall.destruct_shadow()
         self.room = None
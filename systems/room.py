@@ -11,6 +11,7 @@ import random
 from . import desc, extra_look, light, property, export_inventory, help_files, effects
 from .weather_handler import WeatherHandler
 from .situation_changer import SituationChanger
+from .lighting import lighting
 from .door import Door  # Assuming door.py exists
 from .terrain_track_handler import TerrainTrackHandler  # Stubbed if not done
 from .magic_handler import MagicHandler  # Stubbed if not done
@@ -23,6 +24,21 @@ ROOM_VOID = "/room/void"
 SHORTEN = {"north": "n", "northeast": "ne", "east": "e", "southeast": "se", "south": "s", "southwest": "sw", "west": "w", "northwest": "nw", "up": "u", "down": "d"}
 STD_ORDERS = ["north", [0, 1, 0], "northeast", [1, 1, 0], "east", [1, 0, 0], "southeast", [1, -1, 0], "south", [0, -1, 0], "southwest", [-1, -1, 0], "west", [-1, 0, 0], "northwest", [-1, 1, 0], "up", [0, 0, 1], "down", [0, 0, -1]]
 WHEN_ANY_TIME = 0xFFFFFF
+WEATHER_RENDER_TTL = 60  # Weather text may mention the time of day, so re-render at least this often
+STD_INDEX = {STD_ORDERS[i]: i for i in range(0, len(STD_ORDERS), 2)}
+
+class RoomExit:
+    """One compiled exit; fields follow the ROOM_* data list order."""
+    __slots__ = ("dest", "exit_mess", "message", "obvious", "relative", "function", "size",
+                 "grade", "delta", "look", "look_func", "link_mess")
+
+    def __init__(self, data: List):
+        for i, field in enumerate(self.__slots__):
+            setattr(self, field, data[i] if i < len(data) else None)
+
+    def as_list(self) -> List:
+        """Returns the exit as an old-style data list."""
+        return [getattr(self, field) for field in self.__slots__]
 
 class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Property, export_inventory.ExportInventory, help_files.HelpFiles, effects.Effects):
     def __init__(self, oid: str, name: str):
@@ -33,6 +49,9 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.long_exit: Optional[str] = None
         self.long_exit_mxp: Optional[str] = None
         self.short_exit: Optional[str] = None
+        self.exit_verbs: Optional[Dict[str, str]] = None  # {verb or alias: exit direction}
+        self.render_cache: Dict[str, Tuple[object, str]] = {}  # {segment: (stamp, text)} for long()
+        self.contents_cache: Dict[Tuple, str] = {}  # {(dark, visible items, location): contents line} for long()
         self.theft_handler: Optional[str] = "/obj/handlers/theft_handler"
         self.aliases: List[str] = []
         self._exits: List[str] = []
@@ -46,7 +65,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.hidden_objects: List[MudObject] = []
         self._use_internal_objects: List[MudObject] = []
         self.door_control: Dict[str, Union[str, Door]] = {}
-        self.dest_other: List[Union[str, List]] = []
+        self.exit_map: Dict[str, RoomExit] = {}
         self.enchant_time: int = time.time()
         self.background_enchant: int = 0
         self.dynamic_enchant: float = 0.0
@@ -56,7 +75,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.variableitems: Optional[List[List]] = None
         self.is_day: int = -1
         self.not_replaceable: bool = False
-        self.weather_handler = WeatherHandler() if not hasattr(driver, "weather_handler") else driver.weather_handler
+        self.weather_handler = WeatherHandler() if driver.handler("weather_handler") is None else driver.weather_handler
         self.tent_owner: Optional[str] = None
         self.tent_decay: int = 0
         self.magic_aura: int = 0  # New: Ambient magic level
@@ -144,6 +163,8 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.co_ord = new_co_ord
         self.co_ord_calculated = driver.previous_object() != self
         self.track_handler.update_position(self.oid, new_co_ord)
+        if driver.handler("pathfinding") is not None:
+            driver.pathfinding.set_coords(self.oid, new_co_ord)
 
     def flush_co_ord(self):
         self.co_ord = None
@@ -158,21 +179,34 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
     def query_long_exit_mxp(self) -> Optional[str]:
         return self.long_exit_mxp
 
+    def exit_obvious(self, direc: str, ex: RoomExit) -> bool:
+        """Evaluates an exit's obvious flag, which may name a function."""
+        tmp = ex.obvious
+        if not tmp:
+            return False
+        if isinstance(tmp, int):
+            return True
+        if isinstance(tmp, str):
+            return bool(getattr(self, tmp)(direc))
+        if isinstance(tmp, list):
+            return bool(getattr(tmp[0], tmp[1])(direc))
+        return False
+
+    def invalidate_exits(self):
+        """Drops the cached exit strings and verb table after an exit change."""
+        self.long_exit = None
+        self.long_exit_mxp = None
+        self.short_exit = None
+        self.exit_verbs = None
+        self._exits = []
+        if driver.handler("command_dispatcher") is not None:
+            driver.command_dispatcher.source_changed(self)
+        if driver.handler("oob") is not None:
+            driver.oob.room_changed(self)
+
     def calc_long_exit(self):
-        words = []
-        for i in range(0, len(self.dest_other), 2):
-            tmp = self.dest_other[i + 1][ROOM_OBV]
-            if not tmp:
-                continue
-            add = False
-            if isinstance(tmp, int) and tmp:
-                add = True
-            elif isinstance(tmp, str):
-                add = getattr(self, tmp)(self.dest_other[i])
-            elif isinstance(tmp, list):
-                add = getattr(tmp[0], tmp[1])(self.dest_other[i])
-            if add:
-                words.append(f"$R$-{self.dest_other[i]}$R$" if self.dest_other[i + 1][ROOM_REL] else self.dest_other[i])
+        words = [f"$R$-{direc}$R$" if ex.relative else direc
+                 for direc, ex in self.exit_map.items() if self.exit_obvious(direc, ex)]
         if not words:
             self.long_exit = "There are no obvious exits."
             self.long_exit_mxp = "There are no obvious exits."
@@ -183,6 +217,34 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             self.long_exit = f"There are {self.query_num(len(words), 0)} obvious exits: {self.query_multiple_short(words)}."
             self.long_exit_mxp = f"There are {self.query_num(len(words), 0)} obvious exits: {self.query_multiple_short(words)}."
 
+    def set_long(self, long: Union[str, List]):
+        super().set_long(long)
+        self.invalidate_render("long")
+
+    def add_extra_look(self, look: Union[str, tuple]):
+        extra_look.ExtraLook.add_extra_look(self, look)
+        self.invalidate_render("extra")
+
+    def remove_extra_look(self, look: Union[str, tuple]) -> bool:
+        self.invalidate_render("extra")
+        return extra_look.ExtraLook.remove_extra_look(self, look)
+
+    def add_temp_look(self, text: str, duration: int):
+        extra_look.ExtraLook.add_temp_look(self, text, duration)
+        self.invalidate_render("extra")
+
+    def remove_temp_look(self, look: tuple) -> bool:
+        self.invalidate_render("extra")
+        return extra_look.ExtraLook.remove_temp_look(self, look)
+
+    def add_inventory(self, item: MudObject) -> bool:
+        self.invalidate_render("contents")
+        return export_inventory.ExportInventory.add_inventory(self, item)
+
+    def remove_inventory(self, item: MudObject) -> bool:
+        self.invalidate_render("contents")
+        return export_inventory.ExportInventory.remove_inventory(self, item)
+
     def query_theft_handler(self) -> Optional[str]:
         return self.theft_handler
 
@@ -200,7 +262,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
                 self.add_alias(name, word)
             return
         self.aliases.extend([word, names])
-        driver.call_out(self.calc_exits, 1)
+        self.invalidate_exits()
 
     def remove_alias(self, names: Union[str, List[str]], word: str):
         if not self.aliases:
@@ -214,9 +276,11 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             if self.aliases[i] == word and self.aliases[i + 1] == names:
                 self.aliases = self.aliases[:i] + self.aliases[i + 2:]
             i -= 2
-        driver.call_out(self.calc_exits, 1)
+        self.invalidate_exits()
 
     def query_exits(self) -> List[str]:
+        if not self._exits:
+            self.calc_exits()
         return self._exits.copy()
 
     def reset_exits(self):
@@ -274,35 +338,24 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
 
     def query_dest_other(self, direc: str = None) -> Union[List, Optional[List]]:
         if not direc:
-            return self.dest_other.copy()
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        return self.dest_other[i + 1].copy() if i != -1 else None
+            return [x for direc, ex in self.exit_map.items() for x in (direc, ex.as_list())]
+        ex = self.exit_map.get(direc)
+        return ex.as_list() if ex else None
 
     def query_dest_dir(self, thing: MudObject = None) -> List[str]:
         ret = []
-        for i in range(0, len(self.dest_other), 2):
-            direc = self.dest_other[i]
-            if not self.dest_other[i + 1][ROOM_REL] or not thing:
-                ret.extend([direc, self.dest_other[i + 1][ROOM_DEST]])
-            else:
-                ret.extend([thing.find_rel(direc), self.dest_other[i + 1][ROOM_DEST]])
+        for direc, ex in self.exit_map.items():
+            ret.extend([thing.find_rel(direc) if ex.relative and thing else direc, ex.dest])
         return ret
 
     def query_direc(self, thing: MudObject = None) -> List[str]:
-        ret = []
-        for i in range(0, len(self.dest_other), 2):
-            direc = self.dest_other[i]
-            if not self.dest_other[i + 1][ROOM_REL] or not thing:
-                ret.append(direc)
-            else:
-                ret.append(thing.find_rel(direc))
-        return ret
+        return [thing.find_rel(direc) if ex.relative and thing else direc for direc, ex in self.exit_map.items()]
 
     def query_destination(self, exit: str) -> str:
-        i = self.dest_other.index(exit) if exit in self.dest_other else -1
-        if i == -1 and driver.this_player():
-            i = self.dest_other.index(driver.this_player().reorient_rel(exit)) if driver.this_player().reorient_rel(exit) in self.dest_other else -1
-        return self.dest_other[i + 1][ROOM_DEST] if i != -1 else ROOM_VOID
+        ex = self.exit_map.get(exit)
+        if not ex and driver.this_player():
+            ex = self.exit_map.get(driver.this_player().reorient_rel(exit))
+        return ex.dest if ex else ROOM_VOID
 
     def test_add(self, thing: MudObject, flag: int) -> bool:
         return True
@@ -365,32 +418,21 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
 
     def calc_short_exit_string(self) -> str:
         words = []
-        for i in range(0, len(self.dest_other), 2):
-            tmp = self.dest_other[i + 1][ROOM_OBV]
-            if not tmp:
+        for direc, ex in self.exit_map.items():
+            if not self.exit_obvious(direc, ex):
                 continue
-            add = False
-            if isinstance(tmp, int) and tmp:
-                add = True
-            elif isinstance(tmp, str):
-                add = getattr(self, tmp)(self.dest_other[i])
-            elif isinstance(tmp, list):
-                add = getattr(tmp[0], tmp[1])(self.dest_other[i])
-            if add:
-                short_form = SHORTEN.get(self.dest_other[i])
-                if short_form:
-                    words.append(f"$r$-{short_form}$r$" if self.dest_other[i + 1][ROOM_REL] else short_form)
+            short_form = SHORTEN.get(direc)
+            if short_form:
+                words.append(f"$r$-{short_form}$r$" if ex.relative else short_form)
+            elif ex.relative:
+                words.append(f"$r$-{direc}$r$")
+            else:
+                pos = direc.find(" ")
+                if pos != -1:
+                    tmp_dir = direc[pos + 1:]
+                    words.append(f"{direc[:pos]}{SHORTEN.get(tmp_dir, tmp_dir)}")
                 else:
-                    if self.dest_other[i + 1][ROOM_REL]:
-                        words.append(f"$r$-{self.dest_other[i]}$r$")
-                    else:
-                        pos = self.dest_other[i].find(" ")
-                        if pos != -1:
-                            tmp_dir = self.dest_other[i][pos + 1:]
-                            tmp = SHORTEN.get(tmp_dir, tmp_dir)
-                            words.append(f"{self.dest_other[i][:pos]}{tmp}")
-                        else:
-                            words.append(self.dest_other[i])
+                    words.append(direc)
         return " [none]" if not words else f" [{', '.join(words)}]"
 
     def query_short_exit_string(self) -> str:
@@ -423,35 +465,82 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         else:
             return "Raw arcane torrents roar, threatening to tear reality asunder!\n"
 
+    def render_segment(self, name: str, stamp: object, build: Callable[[], str]) -> str:
+        """Returns a cached description segment, rebuilding it when its stamp changes."""
+        cached = self.render_cache.get(name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        text = build()
+        self.render_cache[name] = (stamp, text)
+        return text
+
+    def invalidate_render(self, *names: str):
+        """Drops the named description segments, or all of them if none are named."""
+        if not names:
+            self.render_cache.clear()
+        for name in names:
+            self.render_cache.pop(name, None)
+        if not names or "contents" in names:
+            self.contents_cache.clear()
+
+    def calc_long_segment(self) -> str:
+        ret = "$long$" if self.attrs.get("location") == "outside" else self.query_long()
+        return ret or "Ancient arcane currents have faded here—report this to a sage of Candlekeep.\n"
+
+    async def query_extra_segment(self) -> str:
+        """Returns the extra looks, cached unless an object supplies one dynamically."""
+        if any(isinstance(look, tuple) for look in self.extra_looks):
+            return await self.calc_extra_look(self) or ""
+        stamp = self.query_enchant() > 100  # calc_extra_look adds a shimmer line above this
+        cached = self.render_cache.get("extra")
+        if cached and cached[0] == stamp:
+            return cached[1]
+        text = await self.calc_extra_look(self) or ""
+        self.render_cache["extra"] = (stamp, text)
+        return text
+
+    def query_weather_segment(self) -> str:
+        """Returns the weather line, re-rendered after each weather update."""
+        stamp = (self.weather_handler.query_last_update(), int(time.time()) // WEATHER_RENDER_TTL)
+        return self.render_segment("weather", stamp, lambda: f"{self.weather_handler.query_weather(self.oid)}\n")
+
+    async def query_contents_segment(self, viewer: Optional[MudObject]) -> str:
+        """Returns the contents line as viewer sees it. Viewers who see the same items in the same
+        light share one rendering, kept until the contents or an item's short change."""
+        dark = viewer.check_dark(lighting.query_light(self)) if viewer else 0
+        stamp = (dark, tuple(id(item) for item in self.inventory if item.query_visible(viewer)), self.attrs.get("location"))
+        text = self.contents_cache.get(stamp)
+        if text is None:
+            text = self.contents_cache[stamp] = await self.query_contents(self, "", viewer)
+        return text
+
     async def long(self, word: str = "", dark: int = 0) -> str:
         if not self.long_exit:
             self.calc_long_exit()
         ret = ""
+        outside = self.attrs.get("location") == "outside"
+        viewer = driver.this_player()
         if dark:
             if dark < 0:
                 ret = f"{self.query_dark_mess()}\n"
             else:
                 ret = f"{self.query_bright_mess()}\n"
-            if self.attrs.get("location") == "outside":
-                ret += f"{self.weather_handler.query_weather(self.oid)}\n"
+            if outside:
+                ret += self.query_weather_segment()
             if dark in [1, -1]:
                 ret = f"$C${self.a_short()}.  {ret}\033[32m{self.long_exit}\033[0m\n"
-                if self.query_contents("") != "":
+                if await self.query_contents_segment(viewer) != "":
                     ret += "Shadows conceal objects in the gloom.\n"
         else:
-            ret = "$long$" if self.attrs.get("location") == "outside" else self.query_long()
-            if not ret:
-                ret = "Ancient arcane currents have faded here—report this to a sage of Candlekeep.\n"
-            extra = self.calc_extra_look()
-            if extra:
-                ret += extra
-            if driver.this_player() and driver.this_player().attrs.get("see_ether", False):  # Updated from see_octarine
-                ret += self.enchant_string()
-            if self.attrs.get("location") == "outside":
-                ret += f"{self.weather_handler.query_weather(self.oid)}\n"
-                if driver.this_player() and driver.this_player().attrs.get("terrain_map_in_look", 0):
-                    ret += f"\n{driver.map_handler.query_player_map_template(self.co_ord[0], self.co_ord[1], self.co_ord[2], self.query_light(), 5)}\n"
-            ret += f"\033[32m{self.long_exit}\033[0m\n{self.query_contents('')}"
+            ret = self.render_segment("long", outside, self.calc_long_segment)
+            ret += await self.query_extra_segment()
+            if viewer and viewer.attrs.get("see_ether", False):  # Updated from see_octarine
+                ret += self.render_segment("ether", (self.attrs.get("octarine_mess"), self.query_enchant()), self.enchant_string)
+            if outside:
+                ret += self.query_weather_segment()
+                if viewer and viewer.attrs.get("terrain_map_in_look", 0):
+                    ret += f"\n{driver.map_handler.query_player_map_template(self.co_ord[0], self.co_ord[1], self.co_ord[2], lighting.query_light(self), 5)}\n"
+            ret += f"\033[32m{self.long_exit}\033[0m\n{await self.query_contents_segment(viewer)}"
             if self.rooftop:
                 ret += "A jagged rooftop pierces the sky, whispering of Netherese ambition.\n"
             if self.tent_owner:
@@ -461,7 +550,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         return ret
 
     def pretty_short(self, thing: MudObject = None) -> str:
-        dark = thing.check_dark(self.query_light()) if thing else 0
+        dark = thing.check_dark(lighting.query_light(self)) if thing else 0
         return self.short(dark)
 
     def query_visibility(self) -> int:
@@ -474,8 +563,8 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         if self.co_ord:
             return
         std_orders = STD_ORDERS
-        for i in range(0, len(self.dest_other), 2):
-            other = self.dest_other[i + 1][ROOM_DEST]
+        for direc, ex in self.exit_map.items():
+            other = ex.dest
             if not driver.find_object(other):
                 continue
             other_obj = driver.objects.get(other)
@@ -489,7 +578,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             if not self.can_use_for_co_ords(other):
                 continue
             j = -1
-            delta = self.dest_other[i + 1][ROOM_DELTA]
+            delta = ex.delta
             if delta:
                 self.co_ord = other_co_ord.copy()
                 if isinstance(delta, list):
@@ -497,40 +586,41 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
                         self.co_ord[k] -= delta[k]
                     continue
                 else:
-                    j = std_orders.index(delta)
+                    j = STD_INDEX.get(delta, -1)
             if j == -1:
-                j = std_orders.index(self.dest_other[i]) if self.dest_other[i] in std_orders else -1
+                j = STD_INDEX.get(direc, -1)
                 if j == -1:
                     continue
             self.co_ord = other_co_ord.copy()
             delta = self.query_room_size_array() + other_obj.query_room_size_array()
             for k in range(3):
                 self.co_ord[k] += std_orders[j + 1][k] * (delta[k] + delta[k + 3])
-            if j < 16 and self.dest_other[i + 1][ROOM_GRADE]:
+            if j < 16 and ex.grade:
                 shift = (delta[0] + delta[3]) if j in [0, 1] else (delta[1] + delta[4]) if j in [2, 3] else (delta[0] + delta[1] + delta[3] + delta[4])
-                self.co_ord[2] -= (self.dest_other[i + 1][ROOM_GRADE] * shift) // 100
+                self.co_ord[2] -= (ex.grade * shift) // 100
             self.co_ord_calculated = True
 
     def calc_exits(self):
-        self._exits = []
-        for i in range(0, len(self.dest_other), 2):
-            exit = self.dest_other[i]
-            if exit not in self._exits:
-                self._exits.append(exit)
-                word = SHORTEN.get(exit)
+        self._exits = list(self.query_exit_verbs())
+
+    def query_exit_verbs(self) -> Dict[str, str]:
+        """Returns the cached {verb: exit direction} table, short forms and aliases included."""
+        if self.exit_verbs is None:
+            verbs = {}
+            for direc in self.exit_map:
+                verbs.setdefault(direc, direc)
+                word = SHORTEN.get(direc)
                 if word:
-                    self._exits.append(word)
-            tmp_al = self.aliases.copy()
-            j = tmp_al.index(exit) if exit in tmp_al else -1
-            while j != -1:
-                if j % 2:
-                    j -= 1
-                else:
-                    word = tmp_al[j + 1]
-                    if word not in self._exits:
-                        self._exits.append(word)
-                tmp_al = tmp_al[:j] + tmp_al[j + 2:]
-                j = tmp_al.index(exit) if exit in tmp_al else -1
+                    verbs.setdefault(word, direc)
+            for i in range(0, len(self.aliases) - 1, 2):
+                if self.aliases[i] in self.exit_map:
+                    verbs.setdefault(self.aliases[i + 1], self.aliases[i])
+            self.exit_verbs = verbs
+        return self.exit_verbs
+
+    def match_exit(self, verb: str) -> Optional[str]:
+        """Returns the exit direction a verb or alias leads through, if any."""
+        return self.query_exit_verbs().get(verb)
 
     async def init(self):
         player = driver.this_player()
@@ -585,11 +675,14 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
                 self.set_keep_room_loaded(0)
                 await self.tell_room(f"The shadowsilk tent collapses into ethereal dust.\n")
 
-    async def tell_room(self, message: str):
-        """Broadcasts message to all players in the room."""
-        for obj in self.inventory:
-            if obj.attrs.get("player", False):
-                await obj.send(message)
+    async def tell_room(self, message: str, event: Optional[str] = None, sender: Optional[MudObject] = None):
+        """Broadcasts message to all players in the room not earmuffing event."""
+        players = [obj for obj in self.inventory if obj.attrs.get("player", False)]
+        if driver.handler("options_handler") is not None:
+            await driver.options_handler.tell_players(players, message, event, sender)
+            return
+        for obj in players:
+            await obj.send(message)
 
     def query_zones(self) -> List[str]:
         zones = self.attrs.get("room zone", [])
@@ -610,18 +703,18 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.add_zone(zone)
 
     def query_exit(self, direc: str) -> bool:
-        return direc in self.dest_other
+        return direc in self.exit_map
 
     def add_exit(self, direc: str, dest: Union[str, MudObject], type: str) -> bool:
-        if direc in self.dest_other:
+        if direc in self.exit_map:
             return False
         if isinstance(dest, MudObject):
             dest = dest.oid
         if not dest.startswith("/"):
             dest = f"/{dest}"
-        stuff = [dest] + driver.room_handler.query_exit_type(type, direc) if hasattr(driver, "room_handler") else [dest, None, None, 1, False, None, 0, 0, None, None, None, None]
-        self.dest_other.extend([direc, stuff])
-        door_stuff = driver.room_handler.query_door_type(type, direc, dest) if hasattr(driver, "room_handler") else None
+        stuff = [dest] + driver.room_handler.query_exit_type(type, direc) if driver.handler("room_handler") is not None else [dest, None, None, 1, False, None, 0, 0, None, None, None, None]
+        self.exit_map[direc] = RoomExit(stuff)
+        door_stuff = driver.room_handler.query_door_type(type, direc, dest) if driver.handler("room_handler") is not None else None
         if door_stuff:
             door = Door(f"door_{direc}", "door")
             door.setup_door(direc, self, dest, door_stuff, type)
@@ -629,9 +722,9 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             self.hidden_objects.append(door)
             key = f"{dest} {door.attrs.get('door_name', '')}" if door.attrs.get("door_name") else dest
             self.door_control[key] = direc
-        driver.call_out(self.calc_exits, 1)
-        self.long_exit = None
-        self.short_exit = None
+        self.invalidate_exits()
+        if driver.handler("pathfinding") is not None:
+            driver.pathfinding.index_room(self)
         return True
 
     def modify_exit(self, direc: Union[str, List[str]], data: List):
@@ -639,29 +732,32 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             for d in direc:
                 self.modify_exit(d, data)
             return 0
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        if i == -1:
+        ex = self.exit_map.get(direc)
+        if not ex:
             return 0
         for j in range(0, len(data), 2):
             key = data[j].lower()
             if key in ["message", "exit mess", "exit_mess"]:
-                self.dest_other[i + 1][ROOM_EXIT] = data[j + 1]
+                ex.exit_mess = data[j + 1]
             elif key == "move mess":
-                self.dest_other[i + 1][ROOM_MESS] = data[j + 1]
+                ex.message = data[j + 1]
             elif key == "linker mess":
-                self.dest_other[i + 1][ROOM_LINK_MESS] = data[j + 1]
+                ex.link_mess = data[j + 1]
             elif key == "obvious":
-                self.dest_other[i + 1][ROOM_OBV] = data[j + 1]
+                ex.obvious = data[j + 1]
                 if not isinstance(data[j + 1], int):
                     self.attrs["no exit cache"] = 1
                 self.long_exit = None
+                self.long_exit_mxp = None
                 self.short_exit = None
             elif key == "function":
-                self.dest_other[i + 1][ROOM_FUNC] = data[j + 1]
+                ex.function = data[j + 1]
             elif key == "size":
-                self.dest_other[i + 1][ROOM_SIZE] = data[j + 1]
+                ex.size = data[j + 1]
             elif key == "upgrade":
-                self.dest_other[i + 1][ROOM_GRADE] = data[j + 1]
+                ex.grade = data[j + 1]
+        if driver.handler("pathfinding") is not None:
+            driver.pathfinding.index_room(self)
         return 1
 
     def query_door_open(self, direc: str) -> int:
@@ -671,26 +767,22 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         return door.query_open()
 
     def query_relative(self, direc: str) -> bool:
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        return self.dest_other[i + 1][ROOM_REL] if i != -1 else False
+        ex = self.exit_map.get(direc)
+        return ex.relative if ex else False
 
     def query_look(self, direc: str) -> Optional[str]:
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        if i == -1 or not self.dest_other[i + 1]:
-            return None
-        return self.dest_other[i + 1][ROOM_LOOK]
+        ex = self.exit_map.get(direc)
+        return ex.look if ex else None
 
     def query_look_func(self, direc: str) -> Optional[List]:
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        if i == -1 or not self.dest_other[i + 1]:
-            return None
-        return self.dest_other[i + 1][ROOM_LOOK_FUNC]
+        ex = self.exit_map.get(direc)
+        return ex.look_func if ex else None
 
     def query_size(self, direc: str) -> int:
-        i = self.dest_other.index(direc) if direc in self.dest_other else -1
-        if i == -1:
+        ex = self.exit_map.get(direc)
+        if not ex:
             return 0
-        size = self.dest_other[i + 1][ROOM_SIZE]
+        size = ex.size
         if isinstance(size, str):
             return getattr(self, size)()
         elif isinstance(size, list):
@@ -852,6 +944,8 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
             things = [t for t in things if self.filter_inventory(t, looker)]
         if self.item:
             things.append(self.item)
+        if words and words != "all":
+            things = self.query_noun_index().find(words, things)
         return things
 
     def add_sign(self, sign_long: str, sign_read_mess: Union[str, List] = None, sign_short: str = None,
@@ -908,8 +1002,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         if isinstance(door, Door):
             return direc
         door = Door(f"door_{direc}", "door")
-        i = self.dest_other.index(direc)
-        door.setup_door(direc, self, dest, self.dest_other[i + 1])
+        door.setup_door(direc, self, dest, self.exit_map[direc].as_list())
         self.hidden_objects.append(door)
         self.door_control[direc] = door
         return direc
@@ -1009,9 +1102,7 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
         self.attrs["not_replaceable"] = replace
 
     def stats(self) -> List[Tuple[str, Union[int, str]]]:
-        stuff = []
-        for i in range(0, len(self.dest_other), 2):
-            stuff.append((self.dest_other[i], self.dest_other[i + 1][ROOM_DEST]))
+        stuff = [(direc, ex.dest) for direc, ex in self.exit_map.items()]
         if self.co_ord:
             stuff.extend([("co-ord x", self.co_ord[0]), ("co-ord y", self.co_ord[1]), ("co-ord z", self.co_ord[2])])
         return (light.Light.stats(self) + property.Property.stats(self) + effects.Effects.stats(self) + stuff +
@@ -1020,7 +1111,9 @@ class Room(MudObject, desc.Desc, extra_look.ExtraLook, light.Light, property.Pro
                  ("dynamic enchantment", self.dynamic_enchant),
                  ("enchantment time", self.enchant_time),
                  ("theft handler", self.theft_handler),
-                 ("magic aura", self.magic_aura)])
+                 ("magic aura", self.magic_aura),
+                 ("cached render segments", len(self.render_cache)),
+                 ("cached contents lines", len(self.contents_cache))])
 
     def set_day_long(self, str: str):
         if not self.variablelongs:
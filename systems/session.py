@@ -0,0 +1,214 @@
+# /mnt/home2/mud/systems/session.py
+# Imported to: driver.py
+# Imports from: driver.py, command_dispatch.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from ..driver import driver, logger
+from .command_dispatch import LENGTHEN
+import asyncio
+import re
+import time
+
+QUEUE_LIMIT = 32  # Commands a player may have waiting; input past this is refused, not buffered
+COMMAND_RATE = 6.0  # Commands executed per second once the burst is spent
+COMMAND_BURST = 12  # Commands a player may run back to back
+SPEEDWALK_LIMIT = 40  # Most steps one speed-walk may queue
+ALIAS_DEPTH = 5  # Aliases expanding to aliases stop here
+ALIAS_LIMIT = 50  # Aliases a player may keep
+WRITE_TIMEOUT = 30  # Seconds a client may leave output unread before it is dropped
+
+SPEEDWALK = re.compile(r"(\d{0,3})(ne|nw|se|sw|n|s|e|w|u|d)")  # Counts past SPEEDWALK_LIMIT are capped anyway
+
+def speedwalk(text: str) -> Optional[List[str]]:
+    """Expands '.3n2ew' into north, north, north, east, east, west, or None if text isn't a walk."""
+    if not text.startswith(".") or len(text) < 2:
+        return None
+    steps = []
+    pos = 1
+    while pos < len(text):
+        found = SPEEDWALK.match(text, pos)
+        if not found:
+            return None
+        count = int(found.group(1)) if found.group(1) else 1
+        steps.extend([LENGTHEN[found.group(2)]] * min(count, SPEEDWALK_LIMIT - len(steps)))
+        if len(steps) >= SPEEDWALK_LIMIT:
+            return steps
+        pos = found.end()
+    return steps
+
+def substitute(template: str, args: List[str]) -> str:
+    """Fills $1..$9 and $* in an alias body; a body without them gets the arguments appended."""
+    if "$" not in template:
+        return f"{template} {' '.join(args)}".rstrip()
+    out = template.replace("$*", " ".join(args))
+    for i in range(9, 0, -1):
+        out = out.replace(f"${i}", args[i - 1] if i <= len(args) else "")
+    return out
+
+class Session:
+    """Reader, executor and writer stages for one connection, joined by a bounded command queue."""
+    def __init__(self, player: Any):
+        self.player = player
+        self.commands: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_LIMIT)
+        self.output = asyncio.Event()  # Set by Player.send when there is something to drain
+        self.tokens = float(COMMAND_BURST)
+        self.refilled = time.monotonic()
+        self.high_water = 0
+        self.executed = 0
+        self.refused = 0
+        self.throttled = 0
+        self.errors = 0
+        self.closed = False
+
+    def expand(self, line: str, depth: int = 0) -> List[str]:
+        """Turns one input line into the commands it stands for: ';' separated, speed-walks and aliases."""
+        commands = []
+        for part in line.split(";") if depth == 0 else [line]:
+            part = part.strip()
+            if not part:
+                continue
+            steps = speedwalk(part)
+            if steps is not None:
+                commands.extend(steps)
+                continue
+            verb, *args = part.split()
+            body = sessions.aliases(self.player).get(verb)
+            if body is not None and depth < ALIAS_DEPTH:
+                for piece in body.split(";"):
+                    commands.extend(self.expand(substitute(piece, args), depth + 1))
+            else:
+                commands.append(part)
+        return commands
+
+    def enqueue(self, commands: List[str]) -> int:
+        """Queues commands until the queue is full, returning how many were refused."""
+        for i, command in enumerate(commands):
+            try:
+                self.commands.put_nowait(command)
+            except asyncio.QueueFull:
+                self.refused += len(commands) - i
+                return len(commands) - i
+        self.high_water = max(self.high_water, self.commands.qsize())
+        return 0
+
+    async def take_token(self):
+        """Waits until the player's command bucket allows another command."""
+        now = time.monotonic()
+        self.tokens = min(COMMAND_BURST, self.tokens + (now - self.refilled) * COMMAND_RATE)
+        self.refilled = now
+        if self.tokens < 1:
+            self.throttled += 1
+            await asyncio.sleep((1 - self.tokens) / COMMAND_RATE)
+            self.tokens = 1.0
+            self.refilled = time.monotonic()
+        self.tokens -= 1
+
+    async def reader(self):
+        """Reads lines as they arrive, whatever the executor is doing."""
+        while not self.closed:
+            line = await self.player.read_line()
+            if line is None:
+                return
+            self.player.last_active = time.time()
+            commands = self.expand(line)
+            if not commands:
+                await self.player.prompt()
+            elif self.enqueue(commands):
+                await self.player.send(f"You are too far ahead of yourself; {self.commands.qsize()} commands are still waiting.")
+
+    async def executor(self):
+        """Runs queued commands one at a time within the rate limit; a failing command only loses itself."""
+        while True:
+            command = await self.commands.get()
+            await self.take_token()
+            try:
+                await driver.execute(self.player, command)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Command '{command}' from {getattr(self.player, 'name', '?')} failed: {e}")
+                await self.player.send("Something went wrong with that command.")
+            self.executed += 1
+            if self.commands.empty():
+                await self.player.prompt()
+
+    async def writer(self):
+        """Drains output apart from execution, dropping clients that stop reading."""
+        while True:
+            await self.output.wait()
+            self.output.clear()
+            if self.player.protocol != "telnet":
+                continue
+            try:
+                await asyncio.wait_for(self.player.writer.drain(), WRITE_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropped {getattr(self.player, 'name', '?')}: output unread for {WRITE_TIMEOUT}s")
+                return
+
+    async def run(self):
+        """Runs the three stages until the client leaves or stops reading, or any stage dies."""
+        stages = [asyncio.create_task(self.reader()), asyncio.create_task(self.executor()),
+                  asyncio.create_task(self.writer())]
+        try:
+            await asyncio.wait(stages, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.closed = True
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+
+class SessionHandler:
+    def __init__(self):
+        self.sessions: Dict[Any, Session] = {}  # {player: running session}
+        self.refused = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def aliases(self, player: Any) -> Dict[str, str]:
+        attrs = getattr(player, "attrs", None)
+        return attrs.get("aliases", {}) if attrs else {}
+
+    def set_alias(self, player: Any, name: str, body: str) -> bool:
+        aliases = player.attrs.setdefault("aliases", {})
+        if name not in aliases and len(aliases) >= ALIAS_LIMIT:
+            return False
+        aliases[name] = body
+        return True
+
+    def remove_alias(self, player: Any, name: str) -> bool:
+        return player.attrs.get("aliases", {}).pop(name, None) is not None
+
+    def wake(self, player: Any):
+        """Tells the player's writer stage there is output to drain."""
+        session = self.sessions.get(player)
+        if session:
+            session.output.set()
+
+    async def run(self, player: Any):
+        session = self.sessions[player] = Session(player)
+        try:
+            await session.run()
+        finally:
+            self.sessions.pop(player, None)
+            self.refused += session.refused
+            self.throttled += session.throttled
+            self.errors += session.errors
+
+    def stats(self) -> List[Tuple[str, int]]:
+        depths = [s.commands.qsize() for s in self.sessions.values()]
+        return [
+            ("sessions", len(self.sessions)),
+            ("commands queued", sum(depths)),
+            ("deepest queue", max(depths, default=0)),
+            ("queue high water", max((s.high_water for s in self.sessions.values()), default=0)),
+            ("commands refused", self.refused + sum(s.refused for s in self.sessions.values())),
+            ("commands throttled", self.throttled + sum(s.throttled for s in self.sessions.values())),
+            ("command errors", self.errors + sum(s.errors for s in self.sessions.values())),
+        ]
+
+sessions = SessionHandler()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.sessions = sessions
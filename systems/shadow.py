@@ -1,12 +1,193 @@
 # /mnt/home2/mud/systems/shadow.py
-# Imported to: room.py, rooftop.py, wall.py, situation_changer.py
+# Imported to: room.py, rooftop.py, wall.py, terrain.py, situation_changer.py, core.py
 # Imports from: driver.py
 
-from typing import Optional, Callable, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from ..driver import driver, MudObject
+from functools import partial
 import asyncio
 
+# Shadow lifecycle methods never forward to or from the shadowed object
+SHADOW_INTERNALS = {"setup_shadow", "destruct_shadow", "query_shadowed", "call_shadow", "override_method"}
+Entry = Tuple[Optional[Callable], bool]  # (callable or None to look up on the object, is a coroutine function)
+MISSING = object()
+
+def _as_coroutine(func: Callable) -> Callable:
+    """Lets a plain shadow method stand in for an async one callers await."""
+    async def call(*args, **kwargs):
+        return func(*args, **kwargs)
+    return call
+
+class ShadowChain:
+    """The compiled method table for one shadowed object."""
+    __slots__ = ("obj", "shadows", "table", "successors", "installed")
+
+    def __init__(self, obj: MudObject):
+        self.obj = obj
+        self.shadows: List[Tuple[int, int, Any]] = []  # (priority, attach order, shadow), outermost last
+        self.table: Dict[str, Entry] = {}  # {method: outermost implementation}
+        self.successors: Dict[Tuple[int, str], Entry] = {}  # {(id(shadow), method): next implementation down}
+        self.installed: Dict[str, Any] = {}  # {method: obj's own instance attribute it replaced, or MISSING}
+
+class ShadowHandler:
+    def __init__(self):
+        self.chains: Dict[MudObject, ShadowChain] = {}
+        self.attach_order = 0
+        self.rebuilds = 0
+        self.forwarded = 0
+
+    def _provided(self, shadow: Any, obj: MudObject) -> Dict[str, Entry]:
+        """Collects the methods a shadow replaces, resolving sync/async once."""
+        provided: Dict[str, Entry] = {}
+        for cls in reversed(type(shadow).__mro__):
+            if cls in (object, MudObject, Shadow):
+                continue
+            for name, func in vars(cls).items():
+                if callable(func) and not name.startswith("_") and name not in SHADOW_INTERNALS:
+                    provided[name] = (getattr(shadow, name), asyncio.iscoroutinefunction(func))
+        for name, func in getattr(shadow, "overrides", {}).items():
+            provided[name] = (partial(func, obj), asyncio.iscoroutinefunction(func))
+        return provided
+
+    def _original(self, chain: ShadowChain, method: str) -> Entry:
+        """The shadowed object's own implementation, from before any shadow was installed over it."""
+        own = chain.installed.get(method, MISSING)
+        if own is MISSING:
+            own = getattr(chain.obj, "__dict__", {}).get(method, MISSING)
+        if own is not MISSING:
+            return (own, asyncio.iscoroutinefunction(own)) if callable(own) else (None, False)
+        func = getattr(type(chain.obj), method, None)
+        if callable(func):
+            return func.__get__(chain.obj), asyncio.iscoroutinefunction(func)
+        return None, False
+
+    def install(self, chain: ShadowChain):
+        """Puts the outermost implementations on the object itself, so every caller reaches them
+        by plain attribute access, and puts back whatever a method no longer shadowed replaced."""
+        slots = chain.obj.__dict__
+        for method in [method for method in chain.installed if method not in chain.table]:
+            own = chain.installed.pop(method)
+            if own is MISSING:
+                slots.pop(method, None)
+            else:
+                slots[method] = own
+        for method, (func, _) in chain.table.items():
+            if method not in chain.installed:
+                chain.installed[method] = slots.get(method, MISSING)
+            slots[method] = func
+
+    def compile(self, chain: ShadowChain):
+        """Rebuilds the method table and successor links after the shadow stack changes."""
+        chain.shadows.sort(key=lambda item: item[:2])
+        table: Dict[str, Entry] = {}
+        successors: Dict[Tuple[int, str], Entry] = {}
+        for _, _, shadow in chain.shadows:  # Innermost first; each layer covers the one below
+            for method, entry in self._provided(shadow, chain.obj).items():
+                below = successors[(id(shadow), method)] = table.get(method) or self._original(chain, method)
+                if below[1] and not entry[1]:
+                    entry = (_as_coroutine(entry[0]), True)
+                table[method] = entry
+        chain.table = table
+        chain.successors = successors
+        self.install(chain)
+        chain.obj.shadow = chain.shadows[-1][2] if chain.shadows else None
+        self.rebuilds += 1
+
+    def attach(self, obj: MudObject, shadow: Any, priority: int = 0):
+        """Stacks a shadow on obj; higher priority, then later attachment, sits outermost."""
+        chain = self.chains.get(obj)
+        if chain is None:
+            chain = self.chains[obj] = ShadowChain(obj)
+        chain.shadows = [item for item in chain.shadows if item[2] is not shadow]
+        self.attach_order += 1
+        chain.shadows.append((priority, self.attach_order, shadow))
+        self.compile(chain)
+
+    def refresh(self, obj: MudObject):
+        """Recompiles obj's table after one of its shadows gains an override."""
+        chain = self.chains.get(obj)
+        if chain is not None:
+            self.compile(chain)
+
+    def shadow_function(self, obj: MudObject, func: Callable, priority: int = 0) -> "Shadow":
+        """Shadows obj's method of the same name as func; func receives obj first."""
+        shadow = Shadow(f"{obj.oid}_shadow_{func.__name__}")
+        shadow.shadow_priority = priority
+        shadow.override_method(func.__name__, func)
+        shadow.setup_shadow(obj)
+        return shadow
+
+    def detach(self, obj: Optional[MudObject], shadow: Any):
+        """Removes a shadow from obj's stack."""
+        chain = self.chains.get(obj)
+        if chain is None:
+            return
+        chain.shadows = [item for item in chain.shadows if item[2] is not shadow]
+        if chain.shadows:
+            self.compile(chain)
+        else:
+            chain.table = {}
+            self.install(chain)  # Puts the object's own methods back
+            del self.chains[obj]
+            obj.shadow = None
+
+    def query_shadows(self, obj: MudObject) -> List[Any]:
+        """Returns obj's shadows, outermost first."""
+        chain = self.chains.get(obj)
+        return [shadow for _, _, shadow in reversed(chain.shadows)] if chain else []
+
+    def resolve_action(self, obj: MudObject, func: Callable) -> Callable:
+        """Returns the implementation an action bound to one of obj's own methods should reach."""
+        chain = self.chains.get(obj)
+        if chain is not None and getattr(func, "__self__", None) is obj:
+            entry = chain.table.get(func.__name__)
+            if entry is not None:
+                self.forwarded += 1
+                return entry[0]
+        return func
+
+    def resolve(self, obj: MudObject, method: str) -> Optional[Callable]:
+        """Returns the callable a call to obj.method should reach."""
+        chain = self.chains.get(obj)
+        if chain is not None:
+            func = chain.table.get(method)
+            if func is not None:
+                return func[0]
+        return getattr(obj, method, None)
+
+    async def call(self, obj: MudObject, method: str, *args, **kwargs):
+        """Calls method on obj through its shadows."""
+        chain = self.chains.get(obj)
+        entry = chain.table.get(method) if chain is not None else None
+        if entry is None:
+            func = getattr(obj, method, None)
+            if func is None:
+                return None
+            result = func(*args, **kwargs)
+            return await result if asyncio.iscoroutine(result) else result
+        self.forwarded += 1
+        func, is_async = entry
+        return await func(*args, **kwargs) if is_async else func(*args, **kwargs)
+
+    async def call_next(self, obj: MudObject, shadow: Any, method: str, *args, **kwargs):
+        """Calls the implementation beneath shadow, ending at obj's own method."""
+        chain = self.chains.get(obj)
+        func, is_async = chain.successors.get((id(shadow), method), (None, False)) if chain else (None, False)
+        if func is None:  # Nothing beneath; obj's attribute is this chain's own entry point
+            return None
+        return await func(*args, **kwargs) if is_async else func(*args, **kwargs)
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("shadowed objects", len(self.chains)),
+            ("shadows attached", sum(len(chain.shadows) for chain in self.chains.values())),
+            ("chain rebuilds", self.rebuilds),
+            ("forwarded calls", self.forwarded),
+        ]
+
 class Shadow:
+    shadow_priority = 0
+
     def __init__(self, oid: str = "shadow", name: str = "shadow"):
         self.oid = oid
         self.name = name
@@ -18,13 +199,12 @@ class Shadow:
         if not obj:
             return
         self.shadowed = obj
-        self.shadowed.shadow = self  # Link back to shadow
-        # Default overrides can be set here if needed
+        shadow_handler.attach(obj, self, self.shadow_priority)  # Also links obj.shadow back
 
     def destruct_shadow(self):
         """Removes the shadow from the object."""
         if self.shadowed:
-            self.shadowed.shadow = None
+            shadow_handler.detach(self.shadowed, self)
         self.shadowed = None
         self.overrides.clear()
         if self.oid in driver.objects:
@@ -33,15 +213,14 @@ class Shadow:
     def override_method(self, method: str, func: Callable):
         """Overrides a shadowed method with a custom function (2025 update)."""
         self.overrides[method] = func
+        if self.shadowed:
+            shadow_handler.refresh(self.shadowed)
 
     async def call_shadow(self, method: str, *args, **kwargs):
-        """Calls a shadowed method or falls back to the original."""
-        if method in self.overrides:
-            return await self.overrides[method](self.shadowed, *args, **kwargs) if asyncio.iscoroutinefunction(self.overrides[method]) else self.overrides[method](self.shadowed, *args, **kwargs)
-        if self.shadowed and hasattr(self.shadowed, method):
-            original = getattr(self.shadowed, method)
-            return await original(*args, **kwargs) if asyncio.iscoroutinefunction(original) else original(*args, **kwargs)
-        return None
+        """Calls the next implementation of method beneath this shadow, ending at the original."""
+        if not self.shadowed:
+            return None
+        return await shadow_handler.call_next(self.shadowed, self, method, *args, **kwargs)
 
     async def event_enter(self, obj: MudObject, from_room: Optional[MudObject]):
         """Handles entry with Forgotten Realms flair (2025 async update)."""
@@ -53,6 +232,9 @@ class Shadow:
         """Returns the shadowed object."""
         return self.shadowed
 
+shadow_handler = ShadowHandler()
+
 async def init(driver_instance):
     driver = driver_instance
-    # No global instance; shadows are instantiated per use (e.g., in rooftop.py)
\ No newline at end of file
+    driver.shadow_handler = shadow_handler
+    # Shadows themselves are instantiated per use (e.g., in rooftop.py)
\ No newline at end of file
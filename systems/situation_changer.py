@@ -18,6 +18,9 @@ WHEN_EVENING = 0x1E0000  # 6-9 PM
 WHEN_LATENIGHT = 0xE00000  # 10 PM-12 AM
 
 class Situation:
+    __slots__ = ("start_func", "end_func", "start_mess", "end_mess", "extra_look", "chat_rate", "chats",
+                 "add_items", "random_words")
+
     def __init__(self):
         self.start_func: Optional[Callable] = None
         self.end_func: Optional[Callable] = None
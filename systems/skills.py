@@ -123,11 +123,14 @@ class SkillsHandler:
         self._init_skill_tree()
 
     def _init_skill_tree(self):
-        """Builds skill tree from STAT_BONUS."""
-        for skill in STAT_BONUS.keys():
+        """Builds skill tree from STAT_BONUS in one pass, each skill filing itself under its parent."""
+        for skill in STAT_BONUS:
             self.skill_tree[skill] = self._create_skill_tree(skill)
-            children = [s for s in STAT_BONUS.keys() if s.startswith(skill + ".")]
-            self.immediate_children[skill] = [c[len(skill) + 1:] for c in children if c.count(".") == skill.count(".") + 1]
+            self.immediate_children[skill] = []
+        for skill in STAT_BONUS:
+            parent, _, leaf = skill.rpartition(".")
+            if parent in self.immediate_children:
+                self.immediate_children[parent].append(leaf)
 
     def _create_skill_tree(self, skill: str) -> List[str]:
         bits = skill.split(".")
@@ -0,0 +1,258 @@
+# /mnt/home2/mud/systems/startup.py
+# Imported to: driver.py
+# Imports from: none (built inside PyMudDriver.__init__, before the driver global exists)
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+
+PLUGIN_DIRS = ("systems", "efuns")
+HEADER_IMPORTS = re.compile(r"^# Imports from:(.*)$", re.M)
+RELATIVE_IMPORT = re.compile(r"^\s*from \.(\w+) import|^\s*from \. import ([\w, ]+)", re.M)
+PROVIDES = re.compile(r"\bdriver(?:_instance)?\.(\w+)\s*=(?!=)")
+INIT = re.compile(r"^async def init\(|^def init\(", re.M)
+EAGER = re.compile(r"^EAGER\s*=\s*True\b", re.M)  # A plugin's own declaration that it must load at boot
+
+logger = logging.getLogger("PyMudDriver")  # The driver's logger; the driver module isn't importable from here yet
+
+class PluginInfo:
+    __slots__ = ("name", "path", "requires", "provides", "eager", "loaded", "failed", "trigger",
+                 "started", "import_msec", "init_msec", "objects")
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.requires: List[str] = []  # Plugins this one imports
+        self.provides: List[str] = []  # Driver attributes its init sets
+        self.eager = False  # The plugin sets EAGER = True: it runs a loop or declares verbs, so it can't wait for first use
+        self.loaded = False
+        self.failed: Optional[str] = None  # Why it would not import or init; it isn't tried again
+        self.trigger: Optional[str] = None  # What caused the load: "boot", a driver attribute or a dependent
+        self.started = 0.0
+        self.import_msec = 0.0
+        self.init_msec = 0.0
+        self.objects = 0  # Objects its init added to driver.objects
+
+class Resume:
+    """Awaitable that lets a task take over a coroutine drive() already started, re-yielding the
+    future it stopped on so the task waits for it as if it had run the coroutine from the start."""
+    def __init__(self, coro: Any, pending: Any):
+        self.coro = coro
+        self.pending = pending
+
+    def __await__(self):
+        pending = self.pending
+        while True:
+            try:
+                value = yield pending
+            except BaseException as e:
+                try:
+                    pending = self.coro.throw(e)
+                except StopIteration as done:
+                    return done.value
+                continue
+            try:
+                pending = self.coro.send(value)
+            except StopIteration as done:
+                return done.value
+
+async def finish(coro: Any, pending: Any):
+    await Resume(coro, pending)
+
+def drive(result: Any):
+    """Runs an init that may be a coroutine as far as it goes without waiting, then hands the rest to a task.
+    Most plugin inits never actually suspend, so they finish before the caller continues."""
+    if not inspect.iscoroutine(result):
+        return
+    try:
+        pending = result.send(None)
+    except StopIteration:
+        return
+    asyncio.ensure_future(finish(result, pending))
+
+class Startup:
+    """The plugin graph: scanned from source without importing anything, then loaded in dependency
+    order, eagerly for plugins that run loops and on first use of their driver attribute otherwise."""
+    def __init__(self, driver: Any, root: Optional[str] = None):
+        self.driver = driver
+        module = sys.modules[type(driver).__module__]
+        self.root = root or os.path.dirname(os.path.abspath(module.__file__))
+        self.package = module.__package__ or ""  # Plugins load as <package>.systems.x, beside the driver they import
+        self.plugins: Dict[str, PluginInfo] = {}
+        self.providers: Dict[str, str] = {}  # {driver attribute: plugin that sets it}
+        self.loading: Set[str] = set()
+        self.failures: Dict[str, str] = {}  # {plugin: error} for every plugin that failed to load, listed or scanned
+        self.boot_started = time.perf_counter()
+        self.boot_msec = 0.0
+        self.scan_msec = 0.0
+        self.lazy_loads = 0
+        self.scan()
+
+    def scan(self):
+        start = time.perf_counter()
+        for folder in PLUGIN_DIRS:
+            directory = os.path.join(self.root, folder)
+            if not os.path.isdir(directory):
+                continue
+            for file in sorted(os.listdir(directory)):
+                if file.endswith(".py") and not file.startswith("_") and file != "startup.py":
+                    self.plugins[f"{folder}.{file[:-3]}"] = PluginInfo(f"{folder}.{file[:-3]}", os.path.join(directory, file))
+        for info in self.plugins.values():
+            with open(info.path, encoding="utf-8", errors="replace") as f:
+                source = f.read()
+            folder = info.name.split(".")[0]
+            names = set()
+            for header in HEADER_IMPORTS.findall(source):
+                names.update(part.strip().split(" ")[0][:-3] for part in header.split(",") if part.strip().split(" ")[0].endswith(".py"))
+            for single, several in RELATIVE_IMPORT.findall(source):
+                names.update([single] if single else [name.strip() for name in several.split(",")])
+            info.requires = sorted(f"{folder}.{name}" for name in names if f"{folder}.{name}" in self.plugins and f"{folder}.{name}" != info.name)
+            init = INIT.search(source)
+            if init:
+                info.provides = sorted(set(PROVIDES.findall(source[init.start():])))
+            info.eager = EAGER.search(source) is not None
+            for attr in info.provides:
+                self.providers.setdefault(attr, info.name)
+        self.scan_msec = (time.perf_counter() - start) * 1000
+
+    def order(self, names: List[str]) -> List[str]:
+        """Returns names with their dependencies, dependencies first. Cycles are broken where found."""
+        done: List[str] = []
+        seen: Set[str] = set()
+
+        def visit(name: str):
+            if name in seen or name not in self.plugins:
+                return
+            seen.add(name)
+            for dep in self.plugins[name].requires:
+                visit(dep)
+            done.append(name)
+
+        for name in names:
+            visit(name)
+        return done
+
+    def module_name(self, name: str) -> str:
+        return f"{self.package}.{name}" if self.package else name
+
+    def fail(self, name: str, error: BaseException) -> str:
+        """Records a plugin that would not load, so the rest of the boot carries on without it."""
+        reason = f"{type(error).__name__}: {error}"
+        self.failures[name] = reason
+        if name in self.plugins:
+            self.plugins[name].failed = reason
+        logger.error(f"Plugin {name} failed to load: {reason}")
+        return reason
+
+    def load(self, name: str, trigger: str = "boot") -> Any:
+        """Imports a plugin and its dependencies, running each init once, and records the timings.
+        Returns None if it or a dependency failed; the failure is logged and kept for timeline()."""
+        info = self.plugins.get(name)
+        if info is None:
+            if name in self.failures:
+                return None
+            try:
+                module = importlib.import_module(self.module_name(name))
+                drive(module.init(self.driver)) if hasattr(module, "init") else None
+            except Exception as e:
+                self.fail(name, e)
+                return None
+            self.driver.plugins[name] = module
+            return module
+        for dep in self.order([name]):
+            dep_info = self.plugins[dep]
+            if dep_info.loaded or dep_info.failed or dep in self.loading:
+                continue
+            broken = [req for req in dep_info.requires if self.plugins[req].failed]
+            if broken:
+                dep_info.failed = self.failures[dep] = f"needs {', '.join(broken)}"
+                continue
+            self.loading.add(dep)
+            try:
+                dep_info.trigger = trigger if dep == name else f"needed by {name}"
+                dep_info.started = (time.perf_counter() - self.boot_started) * 1000
+                start = time.perf_counter()
+                module = importlib.import_module(self.module_name(dep))
+                dep_info.import_msec = (time.perf_counter() - start) * 1000
+                objects = len(self.driver.objects)
+                start = time.perf_counter()
+                if hasattr(module, "init"):
+                    drive(module.init(self.driver))
+                dep_info.init_msec = (time.perf_counter() - start) * 1000
+                dep_info.objects = len(self.driver.objects) - objects
+                dep_info.loaded = True
+                self.driver.plugins[dep] = module
+            except Exception as e:  # SyntaxError included: one broken plugin must not stop the others
+                self.fail(dep, e)
+            finally:
+                self.loading.discard(dep)
+        return self.driver.plugins.get(name) if info.loaded else None
+
+    def load_provider(self, attr: str) -> bool:
+        """Loads whichever plugin sets driver.<attr>, returning whether the attribute is now set."""
+        name = self.providers.get(attr)
+        if name is None or self.plugins[name].loaded or self.plugins[name].failed or name in self.loading:
+            return False
+        self.lazy_loads += 1
+        self.load(name, trigger=f"driver.{attr}")
+        return attr in self.driver.__dict__
+
+    def boot(self, names: Optional[List[str]] = None, lazy: bool = True):
+        """Loads the plugins that must run from the start; with lazy=False, everything in names."""
+        names = names if names is not None else list(self.plugins)
+        for name in names:
+            if name not in self.plugins or self.plugins[name].eager or not lazy:
+                self.load(name)  # Listed plugins that were never written are recorded as failures
+        self.boot_msec = (time.perf_counter() - self.boot_started) * 1000
+
+    def timeline(self) -> List[Tuple[str, Any]]:
+        """The startup report: every loaded plugin in load order with its import and init time."""
+        loaded = sorted((info for info in self.plugins.values() if info.loaded), key=lambda info: info.started)
+        rows: List[Tuple[str, Any]] = [
+            ("plugins scanned", len(self.plugins)),
+            ("scan msec", round(self.scan_msec, 2)),
+            ("boot msec", round(self.boot_msec, 2)),
+            ("plugins loaded", len(loaded)),
+            ("plugins failed", len(self.failures)),
+            ("loaded on first use", self.lazy_loads),
+            ("objects loaded", len(self.driver.objects)),
+        ]
+        for info in loaded:
+            rows.append((info.name, f"at {info.started:.1f} msec: import {info.import_msec:.1f}, "
+                                    f"init {info.init_msec:.1f}, objects {info.objects}, by {info.trigger}"))
+        for name, reason in self.failures.items():
+            rows.append((name, f"failed: {reason}"))
+        return rows
+
+def main(argv: List[str]) -> int:
+    """Cold boot from the command line, for CI: prints the timeline, then one JSON line with the time.
+    'startup.py --boot lazy --budget 2.0' exits 1 if boot takes longer than the budget."""
+    mode = argv[argv.index("--boot") + 1] if "--boot" in argv else "lazy"
+    budget = float(argv[argv.index("--budget") + 1]) if "--budget" in argv else None
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(root))
+
+    async def boot():
+        # The driver takes the running loop as it's built and plugin inits start tasks, so both happen inside one
+        driver = importlib.import_module(f"{os.path.basename(root)}.driver").driver
+        driver.startup.boot(lazy=(mode == "lazy"))
+        return driver
+
+    start = time.perf_counter()
+    driver = asyncio.run(boot())
+    seconds = time.perf_counter() - start
+    for label, value in driver.startup.timeline():
+        print(f"{label}: {value}", file=sys.stderr)
+    print(json.dumps({"mode": mode, "seconds": seconds}))
+    return 1 if budget is not None and seconds > budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
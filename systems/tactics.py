@@ -6,6 +6,9 @@ from ..driver import driver, Player, MudObject
 import asyncio
 
 class Tactics:
+    __slots__ = ("attitude", "response", "parry", "attack", "parry_unarmed", "mercy", "focus_zone",
+                 "ideal_distance", "mystra_favor")
+
     def __init__(self):
         self.attitude: str = "neutral"
         self.response: str = "neutral"
@@ -43,45 +46,41 @@ class TacticsHandler:
             self.driver.save_object(obj)
 
     async def tactics_command(self, obj: MudObject, caller: Player, arg: str) -> str:
-    if not isinstance(caller, Player) or caller.oid != obj.oid:
-        return "Only players can adjust their own tactics."
-    tactics = obj.attrs["tactics"]
-    if not arg:
-        return (f"Your current tactics under Mystra’s watch:\n"
-                f"Attitude: {tactics.attitude}\n"
-                f"Response: {tactics.response}\n"
-                f"Parry: {tactics.parry}\n"
-                f"Attack: {tactics.attack}\n"
-                f"Parry Unarmed: {tactics.parry_unarmed}\n"
-                f"Mercy: {tactics.mercy}\n"
-                f"Focus Zone: {tactics.focus_zone}\n"
-                f"Ideal Distance: {tactics.ideal_distance}\n"
-                f"Mystra’s Favor: {tactics.mystra_favor}")
-    args = arg.lower().split()
-    if len(args) != 2:
-        return ("Syntax: tactics <setting> <value>\n"
-                "Settings: attitude, response, parry, attack, parry_unarmed, mercy, focus, distance\n"
-                "See 'tactics help' for details.")
-    setting, value = args
-    if setting == "distance":
-        if value not in self.DISTANCE_OPTIONS:
-            return f"Invalid distance. Options: {', '.join(self.DISTANCE_OPTIONS)}"
-        tactics.ideal_distance = value
-   
-
-      elif setting == "help":
-        return ("Tactics settings:\n"
-                f"distance [{', '.join(self.DISTANCE_OPTIONS)}]: Preferred combat range.\n"
+        if not isinstance(caller, Player) or caller.oid != obj.oid:
+            return "Only players can adjust their own tactics."
+        tactics = obj.attrs["tactics"]
+        if not arg:
+            return (f"Your current tactics under Mystra’s watch:\n"
+                    f"Attitude: {tactics.attitude}\n"
+                    f"Response: {tactics.response}\n"
+                    f"Parry: {tactics.parry}\n"
+                    f"Attack: {tactics.attack}\n"
+                    f"Parry Unarmed: {tactics.parry_unarmed}\n"
+                    f"Mercy: {tactics.mercy}\n"
+                    f"Focus Zone: {tactics.focus_zone}\n"
+                    f"Ideal Distance: {tactics.ideal_distance}\n"
+                    f"Mystra’s Favor: {tactics.mystra_favor}")
+        if arg.strip().lower() == "help":
+            return ("Tactics settings:\n"
+                    f"distance [{', '.join(self.DISTANCE_OPTIONS)}]: Preferred combat range.\n"
                     f"attitude [{', '.join(self.ATTITUDE_OPTIONS)}]: How aggressively you fight.\n"
                     f"response [{', '.join(self.RESPONSE_OPTIONS)}]: How you defend.\n"
                     f"parry [{', '.join(self.PARRY_OPTIONS)}]: Which hand to parry with.\n"
                     f"attack [{', '.join(self.ATTACK_OPTIONS)}]: Which hand to attack with.\n"
                     "parry_unarmed [yes|no]: Whether to parry unarmed if no weapon.\n"
                     f"mercy [{', '.join(self.MERCY_OPTIONS)}]: How you handle surrender.\n"
-                    f"focus [{'|'.join(self.FOCUS_OPTIONS)}]: Where to aim attacks.\n"
-                    "distance [number]: Ideal combat distance (0 for none).")
-
-        if setting == "attitude":
+                    f"focus [{'|'.join(self.FOCUS_OPTIONS)}]: Where to aim attacks.")
+        args = arg.lower().split()
+        if len(args) != 2:
+            return ("Syntax: tactics <setting> <value>\n"
+                    "Settings: attitude, response, parry, attack, parry_unarmed, mercy, focus, distance\n"
+                    "See 'tactics help' for details.")
+        setting, value = args
+        if setting == "distance":
+            if value not in self.DISTANCE_OPTIONS:
+                return f"Invalid distance. Options: {', '.join(self.DISTANCE_OPTIONS)}"
+            tactics.ideal_distance = value
+        elif setting == "attitude":
             if value not in self.ATTITUDE_OPTIONS:
                 return f"Invalid attitude. Options: {', '.join(self.ATTITUDE_OPTIONS)}"
             tactics.attitude = value
@@ -109,20 +108,11 @@ class TacticsHandler:
             if value not in self.FOCUS_OPTIONS:
                 return f"Invalid focus. Options: {'|'.join(self.FOCUS_OPTIONS)}"
             tactics.focus_zone = value
-        elif setting == "distance":
-            try:
-                distance = int(value)
-                if distance < 0:
-                    return "Distance must be a non-negative number."
-                tactics.ideal_distance = distance
-            except ValueError:
-                return "Distance must be a number."
         else:
             return "Unknown setting. Use 'tactics help' for options."
-
         self.tactics[obj.oid] = tactics
-    self.driver.save_object(obj)
-    return f"Tactics updated: {setting} set to {value}."
+        self.driver.save_object(obj)
+        return f"Tactics updated: {setting} set to {value}."
 
     def query_tactics(self, obj: MudObject) -> Tactics:
         self.init_tactics(obj)
@@ -134,14 +124,14 @@ class TacticsHandler:
         self.driver.save_object(obj)
 
     def query_combat_distance(self, obj: MudObject) -> str:
-    return self.query_tactics(obj).ideal_distance
+        return self.query_tactics(obj).ideal_distance
 
-def set_combat_distance(self, obj: MudObject, distance: str):
-    if distance not in self.DISTANCE_OPTIONS:
-        return
-    tactics = self.query_tactics(obj)
-    tactics.ideal_distance = distance
-    self.set_tactics(obj, tactics)
+    def set_combat_distance(self, obj: MudObject, distance: str):
+        if distance not in self.DISTANCE_OPTIONS:
+            return
+        tactics = self.query_tactics(obj)
+        tactics.ideal_distance = distance
+        self.set_tactics(obj, tactics)
 
     def query_combat_response(self, obj: MudObject) -> str:
         return self.query_tactics(obj).response
@@ -201,16 +191,6 @@ def set_combat_distance(self, obj: MudObject, distance: str):
         tactics.focus_zone = focus
         self.set_tactics(obj, tactics)
 
-    def query_combat_distance(self, obj: MudObject) -> int:
-        return self.query_tactics(obj).ideal_distance
-
-    def set_combat_distance(self, obj: MudObject, distance: int):
-        if distance < 0:
-            return
-        tactics = self.query_tactics(obj)
-        tactics.ideal_distance = distance
-        self.set_tactics(obj, tactics)
-
 # Initialize tactics handler
 tactics_handler = TacticsHandler()
 
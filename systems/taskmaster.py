@@ -7,7 +7,11 @@ import asyncio
 import random
 import math
 
+EAGER = True  # Loaded at boot, not on first use: its verb must exist before anyone types it
+
 class tasker_result:
+    __slots__ = ("result", "degree", "raw")
+
     def __init__(self, result: int, degree: int, raw: int):
         self.result = result
         self.degree = degree
@@ -66,10 +70,7 @@ class Taskmaster:
         self.driver = driver_instance
         seteuid("Root")  # Simulate LPC seteuid for persistence
         self.precompute_critical_chances()
-        for obj in self.driver.objects.values():
-            if isinstance(obj, (Player, MudObject)) and hasattr(obj, "attrs"):
-                self.init_skills(obj)
-                obj.add_action("skills", self.skills_command)
+        self.driver.declare_action("skills", self.skills_command, (Player, MudObject))
 
     def precompute_critical_chances(self):
         a = 0.93260  # Constants from create() for y = a*e^(b*i)
@@ -85,6 +86,7 @@ class Taskmaster:
     async def skills_command(self, obj: MudObject, caller: Player, arg: str) -> str:
         if not isinstance(caller, Player) or caller.oid != obj.oid:
             return "Only players can view their own skills."
+        self.init_skills(caller)  # Set up on first use rather than for every object at boot
         skills = self.skills.get(caller.oid, {})
         output = "Your skills:\n"
         for skill, level in skills.items():
@@ -0,0 +1,427 @@
+# /mnt/home2/mud/systems/telnet.py
+# Imported to: driver.py
+# Imports from: none
+
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+import json
+import zlib
+
+# Telnet commands
+IAC, DONT, DO, WONT, WILL, SB, GA, NOP, SE = 255, 254, 253, 252, 251, 250, 249, 241, 240
+IAC_BYTE = b"\xff"
+
+# Telnet options
+ECHO, SGA, TTYPE, NAWS, CHARSET = 1, 3, 24, 31, 42
+MSDP, MCCP2, ATCP, GMCP = 69, 86, 200, 201
+
+LOCAL_OPTIONS = {SGA, CHARSET, MSDP, MCCP2, ATCP, GMCP}  # Options the server will perform
+REMOTE_OPTIONS = {TTYPE, NAWS}  # Options the server asks the client to perform
+OFFERED = (SGA, MCCP2, GMCP, MSDP, ATCP, CHARSET)  # WILLs sent as a connection opens
+REQUESTED = (NAWS, TTYPE)  # DOs sent as a connection opens
+
+# Subnegotiation codes
+TTYPE_IS, TTYPE_SEND = 0, 1
+CHARSET_REQUEST, CHARSET_ACCEPTED, CHARSET_REJECTED = 1, 2, 3
+MSDP_VAR, MSDP_VAL, MSDP_TABLE_OPEN, MSDP_TABLE_CLOSE, MSDP_ARRAY_OPEN, MSDP_ARRAY_CLOSE = 1, 2, 3, 4, 5, 6
+
+LINE_MAX = 4096  # Longest input line kept; the rest is dropped
+SB_MAX = 65536  # Longest subnegotiation kept; the rest is dropped
+TTYPE_CYCLE = 4  # Terminal type requests before giving up on MTTS cycling
+
+# Parser states
+DATA, COMMAND, OPTION, SB_OPTION, SB_DATA, SB_COMMAND = range(6)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def escape_iac(data: bytes) -> bytes:
+    return data.replace(IAC_BYTE, IAC_BYTE + IAC_BYTE)
+
+def negotiate(verb: int, option: int) -> bytes:
+    return bytes((IAC, verb, option))
+
+def subnegotiate(option: int, payload: bytes) -> bytes:
+    return bytes((IAC, SB, option)) + escape_iac(payload) + bytes((IAC, SE))
+
+def encode_msdp_value(value: Any) -> bytes:
+    if isinstance(value, dict):
+        return bytes((MSDP_TABLE_OPEN,)) + encode_msdp(value) + bytes((MSDP_TABLE_CLOSE,))
+    if isinstance(value, (list, tuple)):
+        return bytes((MSDP_ARRAY_OPEN,)) + b"".join(bytes((MSDP_VAL,)) + encode_msdp_value(v) for v in value) + bytes((MSDP_ARRAY_CLOSE,))
+    return str(value).encode("utf-8")
+
+def encode_msdp(variables: Dict[str, Any]) -> bytes:
+    """Encodes a dict as MSDP VAR/VAL pairs, nesting dicts as tables and lists as arrays."""
+    return b"".join(bytes((MSDP_VAR,)) + str(name).encode("utf-8") + bytes((MSDP_VAL,)) + encode_msdp_value(value)
+                    for name, value in variables.items())
+
+def decode_msdp(data: bytes) -> Dict[str, Any]:
+    """Decodes MSDP VAR/VAL pairs; a variable given several values becomes a list."""
+    found, _ = _msdp_table(data, 0, None)
+    return found
+
+def _msdp_scalar(data: bytes, pos: int) -> Tuple[str, int]:
+    end = pos
+    while end < len(data) and data[end] > MSDP_ARRAY_CLOSE:
+        end += 1
+    return data[pos:end].decode("utf-8", "replace"), end
+
+def _msdp_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    if pos < len(data) and data[pos] == MSDP_TABLE_OPEN:
+        return _msdp_table(data, pos + 1, MSDP_TABLE_CLOSE)
+    if pos < len(data) and data[pos] == MSDP_ARRAY_OPEN:
+        values = []
+        pos += 1
+        while pos < len(data) and data[pos] != MSDP_ARRAY_CLOSE:
+            if data[pos] == MSDP_VAL:
+                value, pos = _msdp_value(data, pos + 1)
+                values.append(value)
+            else:
+                pos += 1
+        return values, pos + 1
+    return _msdp_scalar(data, pos)
+
+def _msdp_table(data: bytes, pos: int, close: Optional[int]) -> Tuple[Dict[str, Any], int]:
+    table: Dict[str, Any] = {}
+    while pos < len(data):
+        byte = data[pos]
+        if byte == close:
+            return table, pos + 1
+        if byte != MSDP_VAR:
+            pos += 1
+            continue
+        name, pos = _msdp_scalar(data, pos + 1)
+        while pos < len(data) and data[pos] == MSDP_VAL:
+            value, pos = _msdp_value(data, pos + 1)
+            if name in table:
+                previous = table[name]
+                table[name] = previous + [value] if isinstance(previous, list) else [previous, value]
+            else:
+                table[name] = value
+    return table, pos
+
+class TelnetParser:
+    """Incremental IAC/SB state machine; feed it reads of any size and it yields whole events.
+
+    Events are ("line", text), ("command", verb, option or None) and ("sb", option, payload)."""
+    __slots__ = ("state", "verb", "sb_option", "sb", "line")
+
+    def __init__(self):
+        self.state = DATA
+        self.verb = 0
+        self.sb_option = 0
+        self.sb = bytearray()
+        self.line = bytearray()
+
+    def feed(self, data: Buffer) -> List[Tuple]:
+        raw = data if isinstance(data, (bytes, bytearray)) else bytes(data)
+        view = memoryview(raw)
+        events: List[Tuple] = []
+        pos, end = 0, len(raw)
+        while pos < end:
+            state = self.state
+            if state == DATA or state == SB_DATA:
+                # Runs between IACs are copied in one slice, never byte by byte
+                stop = raw.find(IAC_BYTE, pos)
+                if stop < 0:
+                    stop = end
+                if state == DATA:
+                    self._text(raw, view, pos, stop, events)
+                else:
+                    if len(self.sb) < SB_MAX:
+                        self.sb += view[pos:min(stop, pos + SB_MAX - len(self.sb))]
+                if stop < end:
+                    self.state = COMMAND if state == DATA else SB_COMMAND
+                pos = stop + 1
+                continue
+            byte = raw[pos]
+            pos += 1
+            if state == COMMAND:
+                if byte == IAC:
+                    self._append(view[pos - 1:pos])
+                    self.state = DATA
+                elif WILL <= byte <= DONT:
+                    self.verb = byte
+                    self.state = OPTION
+                elif byte == SB:
+                    self.state = SB_OPTION
+                else:
+                    events.append(("command", byte, None))
+                    self.state = DATA
+            elif state == OPTION:
+                events.append(("command", self.verb, byte))
+                self.state = DATA
+            elif state == SB_OPTION:
+                self.sb_option = byte
+                self.sb = bytearray()
+                self.state = SB_DATA
+            elif state == SB_COMMAND:
+                if byte == IAC:
+                    if len(self.sb) < SB_MAX:
+                        self.sb.append(IAC)
+                    self.state = SB_DATA
+                else:
+                    events.append(("sb", self.sb_option, bytes(self.sb)))
+                    self.sb = bytearray()
+                    self.state = DATA
+                    if byte != SE:
+                        pos -= 1  # Unterminated subnegotiation: read the byte as a command
+                        self.state = COMMAND
+        return events
+
+    def _append(self, chunk: memoryview):
+        room = LINE_MAX - len(self.line)
+        if room > 0:
+            self.line += chunk[:room]
+
+    def _text(self, raw: bytes, view: memoryview, start: int, stop: int, events: List[Tuple]):
+        while True:
+            newline = raw.find(b"\n", start, stop)
+            if newline < 0:
+                self._append(view[start:stop])
+                return
+            self._append(view[start:newline])
+            events.append(("line", self.line.decode("utf-8", "replace").replace("\r", "").replace("\0", "")))
+            self.line = bytearray()
+            start = newline + 1
+
+class TelnetSession:
+    """One connection's option state, compressor and framing on top of a TelnetParser."""
+    def __init__(self, offer: bool = True):
+        self.parser = TelnetParser()
+        self.local: Set[int] = set()  # Options the server has agreed to perform
+        self.remote: Set[int] = set()  # Options the client has agreed to perform
+        self.offered: Set[int] = set()  # WILLs sent and not yet answered
+        self.requested: Set[int] = set()  # DOs sent and not yet answered
+        self.pending = bytearray()  # Wire bytes waiting for the next write
+        self.compressor: Optional[Any] = None
+        self.width, self.height = 80, 24
+        self.terminal_types: List[str] = []
+        self.charset = "utf-8"
+        self.client: Dict[str, Any] = {}  # GMCP Core.Hello
+        self.gmcp_supports: Dict[str, int] = {}  # {package: version} from Core.Supports
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.raw_out = 0
+        if offer:
+            self.start()
+
+    def start(self):
+        """Queues the opening offers."""
+        for option in OFFERED:
+            self.offered.add(option)
+            self._queue(negotiate(WILL, option))
+        for option in REQUESTED:
+            self.requested.add(option)
+            self._queue(negotiate(DO, option))
+
+    def enabled(self, option: int) -> bool:
+        return option in self.local or option in self.remote
+
+    @property
+    def compressing(self) -> bool:
+        return self.compressor is not None
+
+    @property
+    def gmcp(self) -> bool:
+        return GMCP in self.local
+
+    @property
+    def msdp(self) -> bool:
+        return MSDP in self.local
+
+    @property
+    def atcp(self) -> bool:
+        return ATCP in self.local
+
+    def _queue(self, data: bytes):
+        self.raw_out += len(data)
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.pending += data
+
+    def wire(self, data: bytes = b"") -> bytes:
+        """Returns pending negotiation followed by data, compressed once MCCP2 is running."""
+        if data:
+            self._queue(data)
+        out = bytes(self.pending)
+        self.pending = bytearray()
+        self.bytes_out += len(out)
+        return out
+
+    def encode_text(self, text: str) -> bytes:
+        """Encodes game text for the wire: CRLF line ends, IAC doubled if the charset can produce it."""
+        text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+        if self.charset == "utf-8":
+            return text.encode("utf-8")  # UTF-8 never contains byte 255
+        return escape_iac(text.encode(self.charset, "replace"))
+
+    def gmcp_frame(self, package: str, data: Any = None) -> bytes:
+        payload = package if data is None else f"{package} {json.dumps(data)}"
+        return subnegotiate(GMCP, payload.encode("utf-8"))
+
+    def msdp_frame(self, variables: Dict[str, Any]) -> bytes:
+        return subnegotiate(MSDP, encode_msdp(variables))
+
+    def atcp_frame(self, package: str, data: Any) -> bytes:
+        return subnegotiate(ATCP, f"{package} {data if isinstance(data, str) else json.dumps(data)}".encode("utf-8"))
+
+    def feed(self, data: Buffer) -> List[Tuple]:
+        """Parses a read, answering negotiation itself and returning ("line", text),
+        ("gmcp", package, data) and ("msdp", variables) events for the game."""
+        self.bytes_in += len(data)
+        events = []
+        for event in self.parser.feed(data):
+            kind = event[0]
+            if kind == "line":
+                events.append(event)
+            elif kind == "command":
+                if event[2] is not None:
+                    self._negotiate(event[1], event[2])
+            else:
+                found = self._subnegotiation(event[1], event[2])
+                if found:
+                    events.append(found)
+        return events
+
+    def _negotiate(self, verb: int, option: int):
+        if verb == DO:
+            if option in self.local:
+                return
+            if option in LOCAL_OPTIONS:
+                self.local.add(option)
+                if option in self.offered:
+                    self.offered.discard(option)
+                else:
+                    self._queue(negotiate(WILL, option))
+                self._local_enabled(option)
+            else:
+                self._queue(negotiate(WONT, option))
+        elif verb == DONT:
+            self.offered.discard(option)
+            if option in self.local:
+                self.local.discard(option)
+                self._queue(negotiate(WONT, option))
+                if option == MCCP2:
+                    self.stop_compression()
+        elif verb == WILL:
+            if option in self.remote:
+                return
+            if option in REMOTE_OPTIONS:
+                self.remote.add(option)
+                if option in self.requested:
+                    self.requested.discard(option)
+                else:
+                    self._queue(negotiate(DO, option))
+                if option == TTYPE:
+                    self._queue(subnegotiate(TTYPE, bytes((TTYPE_SEND,))))
+            else:
+                self._queue(negotiate(DONT, option))
+        elif verb == WONT:
+            self.requested.discard(option)
+            if option in self.remote:
+                self.remote.discard(option)
+                self._queue(negotiate(DONT, option))
+
+    def _local_enabled(self, option: int):
+        if option == MCCP2:
+            self.start_compression()
+        elif option == CHARSET:
+            self._queue(subnegotiate(CHARSET, bytes((CHARSET_REQUEST,)) + b";UTF-8"))
+
+    def start_compression(self):
+        """Starts the MCCP2 stream; everything queued afterwards goes through one compressor."""
+        if self.compressor is None:
+            self._queue(bytes((IAC, SB, MCCP2, IAC, SE)))
+            self.compressor = zlib.compressobj(6)
+
+    def stop_compression(self):
+        if self.compressor is not None:
+            self.pending += self.compressor.flush(zlib.Z_FINISH)
+            self.compressor = None
+
+    def export(self) -> Dict[str, Any]:
+        """Returns the negotiated state as plain values, e.g. to carry a connection across a copyover."""
+        return {"local": sorted(self.local - {MCCP2}), "remote": sorted(self.remote), "width": self.width,
+                "height": self.height, "terminal_types": list(self.terminal_types), "charset": self.charset,
+                "client": dict(self.client), "gmcp_supports": dict(self.gmcp_supports),
+                "compressing": MCCP2 in self.local}
+
+    def restore(self, state: Dict[str, Any]):
+        """Takes over exported state without renegotiating; MCCP2 is offered afresh since the
+        old process ended its stream."""
+        self.local = set(state["local"])
+        self.remote = set(state["remote"])
+        self.width, self.height = state["width"], state["height"]
+        self.terminal_types = list(state["terminal_types"])
+        self.charset = state["charset"]
+        self.client = dict(state["client"])
+        self.gmcp_supports = dict(state["gmcp_supports"])
+        if state["compressing"]:
+            self.offered.add(MCCP2)
+            self._queue(negotiate(WILL, MCCP2))
+
+    def _subnegotiation(self, option: int, payload: bytes) -> Optional[Tuple]:
+        if option == NAWS and len(payload) >= 4:
+            self.width = (payload[0] << 8) | payload[1]
+            self.height = (payload[2] << 8) | payload[3]
+        elif option == TTYPE and payload[:1] == bytes((TTYPE_IS,)):
+            name = payload[1:].decode("ascii", "replace")
+            if name in self.terminal_types or len(self.terminal_types) >= TTYPE_CYCLE:
+                return None
+            self.terminal_types.append(name)
+            self._queue(subnegotiate(TTYPE, bytes((TTYPE_SEND,))))  # MTTS clients report more on each request
+        elif option == CHARSET and payload[:1] == bytes((CHARSET_ACCEPTED,)):
+            charset = payload[1:].decode("ascii", "replace").strip().lower()
+            if charset in ("utf-8", "utf8"):
+                self.charset = "utf-8"
+        elif option == CHARSET and payload[:1] == bytes((CHARSET_REJECTED,)):
+            self.charset = "latin-1"
+        elif option == GMCP:
+            package, _, text = payload.decode("utf-8", "replace").partition(" ")
+            try:
+                data = json.loads(text) if text else None
+            except ValueError:
+                data = text
+            self._gmcp_core(package, data)
+            return ("gmcp", package, data)
+        elif option == MSDP:
+            return ("msdp", decode_msdp(payload))
+        return None
+
+    def _gmcp_core(self, package: str, data: Any):
+        lowered = package.lower()
+        if lowered == "core.hello" and isinstance(data, dict):
+            self.client = data
+        elif lowered in ("core.supports.set", "core.supports.add", "core.supports.remove") and isinstance(data, list):
+            if lowered == "core.supports.set":
+                self.gmcp_supports = {}
+            for entry in data:
+                name, _, version = str(entry).partition(" ")
+                if lowered == "core.supports.remove":
+                    self.gmcp_supports.pop(name.lower(), None)
+                else:
+                    self.gmcp_supports[name.lower()] = int(version) if version.isdigit() else 1
+
+class TelnetService:
+    def __init__(self):
+        self.sessions = 0
+
+    def session(self) -> TelnetSession:
+        self.sessions += 1
+        return TelnetSession()
+
+    def resume(self, state: Dict[str, Any]) -> TelnetSession:
+        """Rebuilds a session exported by another process."""
+        self.sessions += 1
+        session = TelnetSession(offer=False)
+        session.restore(state)
+        return session
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [("telnet sessions opened", self.sessions)]
+
+telnet = TelnetService()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.telnet = telnet
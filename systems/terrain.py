@@ -4,7 +4,8 @@ from ..driver import driver, MudObject, Player
 import asyncio
 import random
 import time
-import hashlib
+from .terrain_noise import terrain_noise
+from .shadow import shadow_handler
 
 # Terrain types and properties based on DWWiki and Discworld sources
 TERRAIN_TYPES = {
@@ -18,6 +19,8 @@ TERRAIN_TYPES = {
 }
 
 class Terrain(MudObject):
+    shadow_priority = 10  # Innermost of the room shadows
+
     def __init__(self, oid: str, name: str):
         super().__init__(oid, name)
         self.room: Optional[MudObject] = None
@@ -40,10 +43,13 @@ class Terrain(MudObject):
         self.blocking_flag: int = 0
         self.installed_flag: int = 0
         self.terrain_char: str = "."
+        self.hash_compat: bool = True  # Keep MD5 hashing so existing descriptions don't change
+        self.noise_seed: int = 0
 
     def setup_shadow(self, room: MudObject, terrain_name: str):
         """Sets up the terrain shadow with coordinates and effects."""
         self.room = room
+        shadow_handler.attach(room, self, self.shadow_priority)
         self.terrain_name = terrain_name.lower()
         self.zones = self._determine_zones()
         self.apply_terrain_effects()
@@ -130,15 +136,37 @@ class Terrain(MudObject):
 
     def hash(self, mod: int) -> int:
         """Generates a deterministic hash based on coordinates."""
-        coord_str = f"{self.x_coord}:{self.y_coord}:{self.z_coord}"
-        val = int(hashlib.md5(coord_str.encode()).hexdigest(), 16) % mod
-        return val if val >= 0 else -val
+        if self.hash_compat:
+            return terrain_noise.md5_hash(f"{self.x_coord}:{self.y_coord}:{self.z_coord}", mod)
+        return terrain_noise.hash(self.x_coord, self.y_coord, self.z_coord, mod, self.noise_seed)
 
     def hash_time(self, mod: int, period: int) -> int:
         """Generates a time-based deterministic hash."""
-        coord_str = f"{self.x_coord}:{self.y_coord}:{self.z_coord}:{time.time() // period}"
-        val = int(hashlib.md5(coord_str.encode()).hexdigest(), 16) % mod
-        return val if val >= 0 else -val
+        if self.hash_compat:
+            return terrain_noise.md5_hash(f"{self.x_coord}:{self.y_coord}:{self.z_coord}:{time.time() // period}", mod)
+        return terrain_noise.hash_time(self.x_coord, self.y_coord, self.z_coord, mod, period, time.time(), self.noise_seed)
+
+    def set_hash_compat(self, compat: bool):
+        """Chooses MD5-compatible hashing (old saves) or the fast integer hash."""
+        self.hash_compat = bool(compat)
+
+    def query_hash_compat(self) -> bool:
+        """Returns whether MD5-compatible hashing is in use."""
+        return self.hash_compat
+
+    def set_noise_seed(self, seed: int):
+        """Sets the seed for fast hashing and noise fields."""
+        self.noise_seed = seed
+
+    def query_noise(self, scale: float = 32.0, octaves: int = 4) -> float:
+        """Returns the terrain noise field (0-1) at this room's coordinates."""
+        return terrain_noise.fractal(self.x_coord, self.y_coord, self.noise_seed, scale, octaves)
+
+    def add_noise_desc(self, bands: List[Tuple[float, str]], scale: float = 32.0):
+        """Adds a random description picked from noise-field bands."""
+        desc = terrain_noise.choose_by_field(bands, self.x_coord, self.y_coord, self.noise_seed, scale)
+        if desc:
+            self.add_random_desc(desc)
 
     def set_terrain_handler(self, handler: str):
         """Sets the terrain handler path."""
@@ -342,6 +370,7 @@ class Terrain(MudObject):
     def destruct_shadow(self):
         """Removes terrain effects and destroys the shadow."""
         if self.room:
+            shadow_handler.detach(self.room, self)
             self.room.attrs.pop("move_speed", None)
             self.room.attrs.pop("visibility", None)
             self.room.attrs.pop("track_difficulty", None)
@@ -103,6 +103,8 @@ class TerrainHandler(MudObject):
                 self.fixed_locations.clear()
                 self.floating_locations.clear()
                 # Assume restore_object logic here
+                if driver.handler("pathfinding") is not None:
+                    driver.pathfinding.index_terrain(word)  # Routes can cross rooms nobody has loaded yet
             else:
                 self.init_data(word)
                 return False
@@ -0,0 +1,162 @@
+# /mnt/home2/mud/systems/terrain_noise.py
+# Imported to: terrain.py
+# Imports from: driver.py
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..driver import driver
+import hashlib
+import math
+
+try:
+    import numpy as np  # Optional: vectorised region evaluation
+except ImportError:
+    np = None
+
+MASK64 = (1 << 64) - 1
+COORD_BITS = 21  # Bits per axis when packing co-ordinates into one integer
+COORD_MASK = (1 << COORD_BITS) - 1
+COORD_OFFSET = 1 << (COORD_BITS - 1)  # Lets negative co-ordinates pack cleanly
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+UNIT = 1.0 / (1 << 53)
+GRADIENTS = [(1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0),
+             (0.7071, 0.7071), (-0.7071, 0.7071), (0.7071, -0.7071), (-0.7071, -0.7071)]
+MD5_CACHE_SIZE = 65536
+
+def pack_coords(x: int, y: int, z: int) -> int:
+    """Packs a co-ordinate triple into a single 63-bit integer."""
+    return (((x + COORD_OFFSET) & COORD_MASK) << (2 * COORD_BITS) |
+            ((y + COORD_OFFSET) & COORD_MASK) << COORD_BITS |
+            ((z + COORD_OFFSET) & COORD_MASK))
+
+def splitmix64(value: int) -> int:
+    """Returns the splitmix64 finaliser of a 64-bit integer."""
+    value = (value + GOLDEN_GAMMA) & MASK64
+    value = ((value ^ (value >> 30)) * MIX_1) & MASK64
+    value = ((value ^ (value >> 27)) * MIX_2) & MASK64
+    return value ^ (value >> 31)
+
+def md5_coord_hash(key: str) -> int:
+    """Reproduces the original Terrain MD5 hash of a co-ordinate string."""
+    return int(hashlib.md5(key.encode()).hexdigest(), 16)
+
+class TerrainNoise:
+    def __init__(self):
+        self.md5_cache: Dict[str, int] = {}  # {coord string: digest} for compat mode
+
+    def hash(self, x: int, y: int, z: int, mod: int, seed: int = 0) -> int:
+        """Returns a fast deterministic hash of a co-ordinate in [0, mod)."""
+        # splitmix64(pack_coords(x, y, z) ^ seed), inlined for the per-room hot path
+        value = ((((x + COORD_OFFSET) & COORD_MASK) << (2 * COORD_BITS) | ((y + COORD_OFFSET) & COORD_MASK) << COORD_BITS |
+                  ((z + COORD_OFFSET) & COORD_MASK)) ^ seed) + GOLDEN_GAMMA & MASK64
+        value = ((value ^ (value >> 30)) * MIX_1) & MASK64
+        value = ((value ^ (value >> 27)) * MIX_2) & MASK64
+        return (value ^ (value >> 31)) % mod
+
+    def hash_time(self, x: int, y: int, z: int, mod: int, period: int, now: float, seed: int = 0) -> int:
+        """Returns a hash that changes once every period seconds."""
+        return splitmix64(pack_coords(x, y, z) ^ splitmix64(int(now // period) ^ seed)) % mod
+
+    def md5_hash(self, key: str, mod: int) -> int:
+        """Returns the MD5 compatibility hash, memoising the digest."""
+        digest = self.md5_cache.get(key)
+        if digest is None:
+            if len(self.md5_cache) >= MD5_CACHE_SIZE:
+                self.md5_cache.clear()
+            digest = self.md5_cache[key] = md5_coord_hash(key)
+        return digest % mod
+
+    def hash_region(self, x: int, y: int, width: int, height: int, z: int, mod: int,
+                    step: int = 1, seed: int = 0) -> List[List[int]]:
+        """Hashes a width x height block of co-ordinates, one row per y."""
+        if np is not None:
+            xs = np.arange(x, x + width * step, step, dtype=np.int64)
+            ys = np.arange(y, y + height * step, step, dtype=np.int64)
+            gx, gy = np.meshgrid(xs, ys)
+            packed = (((gx + COORD_OFFSET) & COORD_MASK).astype(np.uint64) << np.uint64(2 * COORD_BITS) |
+                      ((gy + COORD_OFFSET) & COORD_MASK).astype(np.uint64) << np.uint64(COORD_BITS) |
+                      np.uint64((z + COORD_OFFSET) & COORD_MASK))
+            return (self._splitmix64_array(packed ^ np.uint64(seed & MASK64)) % np.uint64(mod)).astype(np.int64).tolist()
+        return [[splitmix64(pack_coords(x + i * step, y + j * step, z) ^ seed) % mod
+                 for i in range(width)] for j in range(height)]
+
+    def _splitmix64_array(self, values):
+        """Applies splitmix64 elementwise to a uint64 array; overflow wraps."""
+        with np.errstate(over="ignore"):
+            values = values + np.uint64(GOLDEN_GAMMA)
+            values = (values ^ (values >> np.uint64(30))) * np.uint64(MIX_1)
+            values = (values ^ (values >> np.uint64(27))) * np.uint64(MIX_2)
+        return values ^ (values >> np.uint64(31))
+
+    def lattice(self, ix: int, iy: int, seed: int) -> float:
+        """Returns the lattice value in [0, 1) at an integer grid point."""
+        return (splitmix64(pack_coords(ix, iy, 0) ^ seed) >> 11) * UNIT
+
+    def value_noise(self, x: float, y: float, seed: int = 0, scale: float = 1.0) -> float:
+        """Returns smooth value noise in [0, 1)."""
+        x, y = x / scale, y / scale
+        ix, iy = math.floor(x), math.floor(y)
+        fx, fy = x - ix, y - iy
+        sx, sy = fx * fx * (3 - 2 * fx), fy * fy * (3 - 2 * fy)
+        top = self.lattice(ix, iy, seed) + sx * (self.lattice(ix + 1, iy, seed) - self.lattice(ix, iy, seed))
+        bottom = self.lattice(ix, iy + 1, seed) + sx * (self.lattice(ix + 1, iy + 1, seed) - self.lattice(ix, iy + 1, seed))
+        return top + sy * (bottom - top)
+
+    def _gradient(self, ix: int, iy: int, seed: int, dx: float, dy: float) -> float:
+        """Dots the lattice gradient at (ix, iy) with an offset vector."""
+        gx, gy = GRADIENTS[splitmix64(pack_coords(ix, iy, 0) ^ seed) & 7]
+        return gx * dx + gy * dy
+
+    def perlin(self, x: float, y: float, seed: int = 0, scale: float = 1.0) -> float:
+        """Returns Perlin-style gradient noise, roughly in [-1, 1]."""
+        x, y = x / scale, y / scale
+        ix, iy = math.floor(x), math.floor(y)
+        fx, fy = x - ix, y - iy
+        u = fx * fx * fx * (fx * (fx * 6 - 15) + 10)
+        v = fy * fy * fy * (fy * (fy * 6 - 15) + 10)
+        n00 = self._gradient(ix, iy, seed, fx, fy)
+        n10 = self._gradient(ix + 1, iy, seed, fx - 1, fy)
+        n01 = self._gradient(ix, iy + 1, seed, fx, fy - 1)
+        n11 = self._gradient(ix + 1, iy + 1, seed, fx - 1, fy - 1)
+        top = n00 + u * (n10 - n00)
+        bottom = n01 + u * (n11 - n01)
+        return (top + v * (bottom - top)) * 1.4142
+
+    def fractal(self, x: float, y: float, seed: int = 0, scale: float = 32.0, octaves: int = 4,
+                persistence: float = 0.5) -> float:
+        """Sums octaves of Perlin noise into a field normalised to [0, 1]."""
+        total, amplitude, norm = 0.0, 1.0, 0.0
+        for octave in range(octaves):
+            total += amplitude * self.perlin(x, y, seed + octave, scale)
+            norm += amplitude
+            amplitude *= persistence
+            scale /= 2
+        return max(0.0, min(1.0, 0.5 + 0.5 * total / norm))
+
+    def noise_region(self, x: int, y: int, width: int, height: int, seed: int = 0, scale: float = 32.0,
+                     octaves: int = 4, step: int = 1) -> List[List[float]]:
+        """Evaluates the fractal field over a block of map co-ordinates."""
+        return [[self.fractal(x + i * step, y + j * step, seed, scale, octaves)
+                 for i in range(width)] for j in range(height)]
+
+    def choose(self, options: Sequence, x: int, y: int, z: int, seed: int = 0):
+        """Deterministically picks one option for a co-ordinate."""
+        if not options:
+            return None
+        return options[self.hash(x, y, z, len(options), seed)]
+
+    def choose_by_field(self, bands: List[Tuple[float, str]], x: int, y: int, seed: int = 0,
+                        scale: float = 32.0) -> Optional[str]:
+        """Picks the first description band whose threshold the noise field is under."""
+        value = self.fractal(x, y, seed, scale)
+        for threshold, text in bands:
+            if value < threshold:
+                return text
+        return bands[-1][1] if bands else None
+
+terrain_noise = TerrainNoise()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.terrain_noise = terrain_noise
@@ -0,0 +1,126 @@
+# /mnt/home2/mud/systems/vocabulary.py
+# Imported to: id.py, description.py, object.py, cmr_handler.py, noun_index.py
+# Imports from: driver.py
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from ..driver import driver
+import sys
+
+Tokens = Tuple[int, ...]
+
+# Plurals the suffix rules get wrong
+IRREGULAR_PLURALS = {
+    "man": "men", "woman": "women", "child": "children", "person": "people", "foot": "feet",
+    "tooth": "teeth", "goose": "geese", "mouse": "mice", "louse": "lice", "ox": "oxen",
+    "elf": "elves", "dwarf": "dwarves", "wolf": "wolves", "knife": "knives", "leaf": "leaves",
+    "loaf": "loaves", "thief": "thieves", "shelf": "shelves", "half": "halves", "staff": "staves",
+    "life": "lives", "wife": "wives", "calf": "calves", "scarf": "scarves", "hoof": "hooves",
+    "sheep": "sheep", "deer": "deer", "fish": "fish", "moose": "moose", "armour": "armour",
+    "die": "dice", "cactus": "cacti", "fungus": "fungi", "index": "indices",
+}
+
+def default_plural(word: str) -> str:
+    """Applies the English suffix rules Desc.pluralize has always used."""
+    if word.endswith("s") or word.endswith("sh") or word.endswith("ch") or word.endswith("x") or word.endswith("z"):
+        return word + "es"
+    if word.endswith("y") and len(word) > 1 and word[-2] not in "aeiou":
+        return word[:-1] + "ies"
+    return word + "s"
+
+class Vocabulary:
+    def __init__(self):
+        self.token_ids: Dict[str, int] = {}  # {word: token id}
+        self.words: List[str] = []  # Token id -> interned word
+        self.plural_ids: Dict[int, int] = {}  # {token id: token id of its plural}
+        self.kinds: Dict[int, str] = {}  # {token id: "material" or "colour"} from the CMR tables
+        self.tuples: Dict[Tokens, Tokens] = {}  # Canonical copy of each token tuple in use
+        self.sets: Dict[Tokens, FrozenSet[str]] = {}  # {token tuple: its words as a frozenset}
+
+    def intern(self, word: str) -> int:
+        """Returns the token id for word, adding it the first time it is seen."""
+        token = self.token_ids.get(word)
+        if token is None:
+            word = sys.intern(word)
+            token = self.token_ids[word] = len(self.words)
+            self.words.append(word)
+        return token
+
+    def word(self, token: int) -> str:
+        return self.words[token]
+
+    def canonical(self, word: str) -> str:
+        """Returns the shared interned copy of word."""
+        return self.words[self.intern(word)]
+
+    def share(self, tokens: Iterable[int]) -> Tokens:
+        """Returns the one shared tuple equal to tokens, so identical identifier lists cost one tuple."""
+        tokens = tuple(tokens)
+        return self.tuples.setdefault(tokens, tokens)
+
+    def encode(self, words: Iterable[str]) -> Tokens:
+        """Turns words into a shared, de-duplicated token tuple, keeping first-seen order."""
+        return self.share(dict.fromkeys(self.intern(word) for word in words if isinstance(word, str)))
+
+    def decode(self, tokens: Tokens) -> List[str]:
+        words = self.words
+        return [words[token] for token in tokens]
+
+    def extend(self, tokens: Tokens, words: Iterable[str]) -> Tokens:
+        """Returns tokens with any new words appended."""
+        added = [self.intern(word) for word in words if isinstance(word, str)]
+        return self.share(dict.fromkeys(tokens + tuple(added)))
+
+    def without(self, tokens: Tokens, word: str) -> Tokens:
+        """Returns tokens with word removed."""
+        token = self.token_ids.get(word)
+        if token is None or token not in tokens:
+            return tokens
+        return self.share(t for t in tokens if t != token)
+
+    def word_set(self, tokens: Tokens) -> FrozenSet[str]:
+        """Returns the words of a token tuple as a frozenset shared by every object using that tuple."""
+        found = self.sets.get(tokens)
+        if found is None:
+            found = self.sets[tokens] = frozenset(self.decode(tokens))
+        return found
+
+    def plural(self, word: str) -> str:
+        """Returns the plural of word, computing it only the first time."""
+        token = self.intern(word)
+        plural = self.plural_ids.get(token)
+        if plural is None:
+            plural = self.plural_ids[token] = self.intern(IRREGULAR_PLURALS.get(word) or default_plural(word))
+        return self.words[plural]
+
+    def set_kind(self, word: str, kind: Optional[str]):
+        """Records whether word names a CMR material or colour."""
+        token = self.intern(word)
+        if kind:
+            self.kinds[token] = kind
+        else:
+            self.kinds.pop(token, None)
+
+    def query_kind(self, word: str) -> Optional[str]:
+        token = self.token_ids.get(word)
+        return None if token is None else self.kinds.get(token)
+
+    def load_cmr(self, colours: Iterable[str], materials: Iterable[str]):
+        """Interns the CMR colour and material names so adjective lookups resolve by token."""
+        for word in colours:
+            self.set_kind(word, "colour")
+        for word in materials:
+            self.set_kind(word, "material")
+
+    def stats(self) -> List[Tuple[str, int]]:
+        return [
+            ("interned tokens", len(self.words)),
+            ("shared token tuples", len(self.tuples)),
+            ("precomputed plurals", len(self.plural_ids)),
+            ("cmr words", len(self.kinds)),
+        ]
+
+vocabulary = Vocabulary()
+
+async def init(driver_instance):
+    driver = driver_instance
+    driver.vocabulary = vocabulary
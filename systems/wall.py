@@ -3,8 +3,11 @@
 # /mnt/home2/mud/systems/wall.py
 from typing import List, Optional, Union, Tuple
 from ..driver import driver, MudObject, Player
+from .shadow import shadow_handler
 
 class Wall(MudObject):
+    shadow_priority = 20  # Above terrain, below rooftops
+
     def __init__(self, oid: str, name: str):
         super().__init__(oid, name)
         self.belows: List[str] = []  # Paths to rooms below
@@ -19,10 +22,12 @@ class Wall(MudObject):
     def setup_shadow(self, thing: MudObject):
         """Sets up the wall shadow on the given room."""
         self.room = thing
+        shadow_handler.attach(thing, self, self.shadow_priority)
 
     def destruct_shadow(self):
         """Destroys the wall shadow and cleans up."""
         if self.room:
+            shadow_handler.detach(self.room, self)
             if self.old_here:
                 self.room.add_property("here", self.old_here)
             else:
@@ -8,6 +8,8 @@ import random
 import math
 
 class Weapon:
+    __slots__ = ("oid", "name", "attrs")
+
     def __init__(self, oid: str, name: str, damage: int, weight: int, length: int, damage_type: str, condition: int = 100):
         self.oid = oid
         self.name = name
@@ -3,10 +3,13 @@
 # /mnt/home2/mud/systems/weather.py
 from typing import Dict, List, Optional, Tuple
 from ..driver import driver, MudObject, Player
+import asyncio
 import math
 import random
 import time
 import os
+import weakref
+from collections import deque
 
 # Constants adapted from Forgotten Realms and Discworld MUD mechanics
 FILE_NAME = "/save/fr_weather"
@@ -22,6 +25,8 @@ NOTIFY_TEMPERATURE = 1
 NOTIFY_CLOUD = 2
 NOTIFY_RAIN = 4
 NOTIFY_DAY = 8
+BROADCAST_SPREAD = 3  # Ticks a weather broadcast is spread across
+BROADCAST_MIN_BATCH = 25  # Fewest notifications delivered per tick
 TEMP, CLOUD, WINDSP = 0, 1, 2
 WEATHER_NO_RAIN_TYPE, WEATHER_SNOW_TYPE, WEATHER_SLEET_TYPE, WEATHER_RAIN_TYPE = 0, 1, 2, 3
 
@@ -31,7 +36,10 @@ class WeatherHandler(MudObject):
         self._pattern: Dict[str, List[int]] = {}
         self._current: Dict[str, List[int]] = {}
         self._variance: List[int] = [10, 75, 20]  # Temp, cloud, wind variance
-        self._rooms: Dict[MudObject, int] = {}
+        self._rooms: "weakref.WeakKeyDictionary[MudObject, int]" = weakref.WeakKeyDictionary()
+        self._broadcast: deque = deque()  # Pending (kind, ref, args) notifications
+        self._broadcast_batch: int = BROADCAST_MIN_BATCH
+        self._broadcast_scheduled: bool = False
         self._lastupdate: int = 0
         self._day: int = 0
         self._sunrise: int = 0
@@ -41,29 +49,29 @@ class WeatherHandler(MudObject):
         self.moonupdate: int = 0
 
     def setup(self):
-    self.set_name("weather controller")
-    self.set_short("weather controller")
-    self.set_long("A mystical orb attuned to Faerûn’s skies, blessed by Aerdrie Faenya.\n")
-    if os.path.exists(FILE_NAME):
-        data = driver.load_object(FILE_NAME)
-        if data:
-            self._pattern = data.get("_pattern", {})
-            self._current = data.get("_current", {})
-            self._variance = data.get("_variance", [10, 75, 20])
-            self._lastupdate = data.get("_lastupdate", 0)
-            self._day = data.get("_day", 0)
-            self._sunrise = data.get("_sunrise", 0)
-            self._sunset = data.get("_sunset", 0)
-            self._toy = data.get("_toy", 0)
-            self.mooncycle = data.get("mooncycle", 0)
-            self.moonupdate = data.get("moonupdate", 0)
-    for climate in CLIMATES:
-        self._pattern.setdefault(climate, [0, 0, 0])
-        self._current.setdefault(climate, [0, 0, 0])
-    driver.call_out(self.update_weather, UPDATE_SPEED // 2)  # 2025: 2.5 min updates
-    self.set_day()
-    self.update_pattern()
-    
+        self.set_name("weather controller")
+        self.set_short("weather controller")
+        self.set_long("A mystical orb attuned to Faerûn’s skies, blessed by Aerdrie Faenya.\n")
+        if os.path.exists(FILE_NAME):
+            data = driver.load_object(FILE_NAME)
+            if data:
+                self._pattern = data.get("_pattern", {})
+                self._current = data.get("_current", {})
+                self._variance = data.get("_variance", [10, 75, 20])
+                self._lastupdate = data.get("_lastupdate", 0)
+                self._day = data.get("_day", 0)
+                self._sunrise = data.get("_sunrise", 0)
+                self._sunset = data.get("_sunset", 0)
+                self._toy = data.get("_toy", 0)
+                self.mooncycle = data.get("mooncycle", 0)
+                self.moonupdate = data.get("moonupdate", 0)
+        for climate in CLIMATES:
+            self._pattern.setdefault(climate, [0, 0, 0])
+            self._current.setdefault(climate, [0, 0, 0])
+        driver.call_out(self.update_weather, UPDATE_SPEED // 2)  # 2025: 2.5 min updates
+        self.set_day()
+        self.update_pattern()
+
     def weather_notify(self, room: MudObject, notifications: int) -> bool:
         """Adds a room to the notification list."""
         if notifications < 0 or notifications > (NOTIFY_TEMPERATURE | NOTIFY_CLOUD | NOTIFY_RAIN | NOTIFY_DAY):
@@ -458,16 +466,8 @@ class WeatherHandler(MudObject):
         """Updates the current weather every 5 minutes."""
         self._lastupdate = int(time.time())
         driver.call_out(self.update_weather, UPDATE_SPEED)
-        list_ = {}
-        roomlist = {}
-        for user in [u for u in driver.users() if u and u.environment() and u.environment().query_property("location") == "outside"]:
-            temp, cloud, wind = self._get_weather_values(user.environment())
-            list_[user] = [temp, cloud, self.rain_index(user.environment()), self._day]
-        newrooms = {r: n for r, n in self._rooms.items() if r}
-        self._rooms = newrooms
-        for room, notifications in self._rooms.items():
-            temp, cloud, wind = self._get_weather_values(room)
-            roomlist[room] = [temp, cloud, self.rain_index(room), self._day]
+        old_current = {climate: list(values) for climate, values in self._current.items()}
+        old_day = self._day
 
         if self.moonupdate + (SECONDS_PER_DAY * 2) < int(time.time()):
             self.mooncycle = (self.mooncycle + 1) % 14  # Selûne’s 28-day cycle, approximated
@@ -479,15 +479,128 @@ class WeatherHandler(MudObject):
         self.set_day()
         self.save_object(FILE_NAME)
 
-        for user, warray in list_.items():
-            self.do_inform(user, *warray)
-        for room, notifications in self._rooms.items():
-            self.do_room_inform(room, *roomlist[room], notifications)
+        changed = self.diff_snapshot(old_current, old_day)
+        self.queue_room_informs(changed, old_current, old_day)
+        self.queue_user_informs(changed, old_current, old_day)
+        self.schedule_broadcast()
+
+    def diff_snapshot(self, old_current: Dict[str, List[int]], old_day: int) -> Dict[str, int]:
+        """Returns {climate: mask} for climates whose weather moved since the snapshot."""
+        changed = {}
+        for climate in CLIMATES:
+            old = old_current.get(climate, [0, 0, 0])
+            new = self._current[climate]
+            # Day changes shift diurnal temperatures too, so they touch everything
+            mask = NOTIFY_DAY | NOTIFY_TEMPERATURE | NOTIFY_CLOUD | NOTIFY_RAIN if self._day != old_day else 0
+            if old[TEMP] != new[TEMP] or old[WINDSP] != new[WINDSP]:
+                mask |= NOTIFY_TEMPERATURE
+            if old[CLOUD] != new[CLOUD]:
+                mask |= NOTIFY_CLOUD | NOTIFY_TEMPERATURE
+            if old[TEMP] != new[TEMP] or old[CLOUD] != new[CLOUD]:
+                mask |= NOTIFY_RAIN
+            if mask:
+                changed[climate] = mask
+        return changed
+
+    def _climate_of(self, env: MudObject) -> str:
+        """Returns the climate key a room reads its weather from."""
+        climate = env.query_climate() or DEFAULT_CLIMATE
+        return climate if climate in self._current else DEFAULT_CLIMATE
+
+    def _snapshot_values(self, env: MudObject) -> Tuple[int, int, int]:
+        """Returns (temp, cloud, rain) for a room under the current snapshot."""
+        temp, cloud, wind = self._get_weather_values(env)
+        return temp, cloud, self.rain_index(env)
+
+    def _old_values(self, envs: List[MudObject], old_current: Dict[str, List[int]], old_day: int) -> Dict[MudObject, Tuple[int, int, int]]:
+        """Evaluates rooms against the pre-update snapshot."""
+        new_current, new_day = self._current, self._day
+        self._current, self._day = old_current, old_day
+        try:
+            return {env: self._snapshot_values(env) for env in envs}
+        finally:
+            self._current, self._day = new_current, new_day
+
+    def queue_room_informs(self, changed: Dict[str, int], old_current: Dict[str, List[int]], old_day: int):
+        """Groups registered rooms in changed climates by change type and queues them."""
+        if not changed:
+            return
+        rooms = [(room, notifications) for room, notifications in list(self._rooms.items())
+                 if changed.get(self._climate_of(room), 0) & notifications]
+        if not rooms:
+            return
+        old_values = self._old_values([room for room, _ in rooms], old_current, old_day)
+        groups: Dict[int, List[Tuple[MudObject, Tuple[int, int, int]]]] = {}
+        for room, notifications in rooms:
+            new = self._snapshot_values(room)
+            has_changed = self.room_change_mask(old_values[room], old_day, new, notifications)
+            if has_changed:
+                groups.setdefault(has_changed, []).append((room, new))
+        for has_changed, members in groups.items():
+            for room, (temp, cloud, rain) in members:
+                self._broadcast.append(("room", weakref.ref(room), (has_changed, self._day, temp, cloud, rain)))
+
+    def queue_user_informs(self, changed: Dict[str, int], old_current: Dict[str, List[int]], old_day: int):
+        """Groups outside players by room so each room's weather is worked out once."""
+        by_env: Dict[MudObject, List[Player]] = {}
+        for user in driver.users():
+            env = user.environment() if user else None
+            if env and env.query_property("location") == "outside":
+                by_env.setdefault(env, []).append(user)
+        if not by_env:
+            return
+        stale = [env for env in by_env if self._climate_of(env) in changed]
+        old_values = self._old_values(stale, old_current, old_day) if stale else {}
+        for env, users in by_env.items():
+            new = self._snapshot_values(env)
+            old = old_values.get(env, new)
+            message = self.inform_string(old, old_day if env in old_values else self._day, new)
+            for user in users:
+                self._broadcast.append(("user", weakref.ref(user), (message, new[0], new[2])))
+
+    def schedule_broadcast(self):
+        """Spreads the queued notifications over the next few ticks."""
+        if not self._broadcast:
+            return
+        self._broadcast_batch = max(BROADCAST_MIN_BATCH, -(-len(self._broadcast) // BROADCAST_SPREAD))
+        if not self._broadcast_scheduled:
+            self._broadcast_scheduled = True
+            asyncio.create_task(driver.call_out(1, self.flush_broadcast))
+
+    async def flush_broadcast(self):
+        """Delivers one tick's share of queued weather notifications."""
+        self._broadcast_scheduled = False
+        for _ in range(min(self._broadcast_batch, len(self._broadcast))):
+            kind, ref, args = self._broadcast.popleft()
+            target = ref()
+            if not target:
+                continue
+            if kind == "room":
+                self.notify_room(target, *args)
+            else:
+                self.deliver_inform(target, *args)
+        if self._broadcast:
+            self._broadcast_scheduled = True
+            asyncio.create_task(driver.call_out(1, self.flush_broadcast))
+
+    def query_last_update(self) -> int:
+        """Returns when the weather last changed, for callers caching weather text."""
+        return self._lastupdate
+
+    def query_broadcast_pending(self) -> int:
+        """Returns the number of undelivered weather notifications."""
+        return len(self._broadcast)
 
     def do_inform(self, who: Player, old_temp: int, old_cloud: int, old_rain: int, old_day: int):
         """Informs players of weather changes."""
-        temp, cloud, wind = self._get_weather_values(who.environment())
-        new_rain = self.rain_index(who.environment())
+        new = self._snapshot_values(who.environment())
+        message = self.inform_string((old_temp, old_cloud, old_rain), old_day, new)
+        self.deliver_inform(who, message, new[0], new[2])
+
+    def inform_string(self, old: Tuple[int, int, int], old_day: int, new: Tuple[int, int, int]) -> str:
+        """Builds the weather change message shared by everyone in one room."""
+        old_temp, old_cloud, old_rain = old
+        temp, cloud, new_rain = new
         old_rt = self.query_rain_type(old_temp, old_rain)
         new_rt = self.query_rain_type(temp, new_rain)
         str_ = ""
@@ -517,26 +630,36 @@ class WeatherHandler(MudObject):
             str_ += ["", "snow begins to fall", "sleet starts", "rain begins"][new_rt] + ".\n"
         elif new_rt > 0:
             str_ += f"The {['', 'snow', 'sleet', 'rain'][new_rt]} persists.\n"
-        if new_rt and not any(o.query_property("umbrella") for o in who.query_holding() + who.query_wearing()) or not random.randint(0, 50):
-            who.add_effect("/std/effects/other/wetness", (new_rain * new_rt // 2) * (UPDATE_SPEED // 60))
-        if str_:
-            who.tell(f"ORANGE: {str_}\n")
+        return str_
 
-    def do_room_inform(self, room: MudObject, old_temp: int, old_cloud: int, old_rain: int, old_day: int, notifications: int):
-        """Informs rooms of weather changes."""
-        temp, cloud, wind = self._get_weather_values(room)
-        new_rain = self.rain_index(room)
+    def deliver_inform(self, who: Player, message: str, temp: int, rain: int):
+        """Sends a prepared weather message and soaks the player if needed."""
+        rt = self.query_rain_type(temp, rain)
+        if rt and not any(o.query_property("umbrella") for o in who.query_holding() + who.query_wearing()) or not random.randint(0, 50):
+            who.add_effect("/std/effects/other/wetness", (rain * rt // 2) * (UPDATE_SPEED // 60))
+        if message:
+            who.tell(f"ORANGE: {message}\n")
+
+    def room_change_mask(self, old: Tuple[int, int, int], old_day: int, new: Tuple[int, int, int], notifications: int) -> int:
+        """Returns the NOTIFY_* bits a room asked for that actually changed."""
         has_changed = 0
         if self._day != old_day and notifications & NOTIFY_DAY:
             has_changed |= NOTIFY_DAY
-        if old_temp != temp and notifications & NOTIFY_TEMPERATURE:
+        if old[0] != new[0] and notifications & NOTIFY_TEMPERATURE:
             has_changed |= NOTIFY_TEMPERATURE
-        if old_cloud != cloud and notifications & NOTIFY_CLOUD:
+        if old[1] != new[1] and notifications & NOTIFY_CLOUD:
             has_changed |= NOTIFY_CLOUD
-        if old_rain != new_rain and notifications & NOTIFY_RAIN:
+        if old[2] != new[2] and notifications & NOTIFY_RAIN:
             has_changed |= NOTIFY_RAIN
+        return has_changed
+
+    def do_room_inform(self, room: MudObject, old_temp: int, old_cloud: int, old_rain: int, old_day: int, notifications: int):
+        """Informs rooms of weather changes."""
+        temp, cloud, new_rain = self._snapshot_values(room)
+        has_changed = self.room_change_mask((old_temp, old_cloud, old_rain), old_day, (temp, cloud, new_rain), notifications)
         if has_changed:
-            driver.call_out(lambda: self.notify_room(room, has_changed, self._day, temp, cloud, new_rain), 1)
+            self._broadcast.append(("room", weakref.ref(room), (has_changed, self._day, temp, cloud, new_rain)))
+            self.schedule_broadcast()
 
     def notify_room(self, room: MudObject, has_changed: int, day: int, temp: int, cloud: int, rain: int):
         """Notifies a room of weather changes."""
@@ -566,19 +689,19 @@ class WeatherHandler(MudObject):
         return (18 * MINUTES_PER_HOUR) - adjust
 
     def save_object(self, filename: str):
-    data = {
-        "_pattern": self._pattern,
-        "_current": self._current,
-        "_variance": self._variance,
-        "_lastupdate": self._lastupdate,
-        "_day": self._day,
-        "_sunrise": self._sunrise,
-        "_sunset": self._sunset,
-        "_toy": self._toy,
-        "mooncycle": self.mooncycle,
-        "moonupdate": self.moonupdate
-    }
-    driver.save_object(filename, data)
+        data = {
+            "_pattern": self._pattern,
+            "_current": self._current,
+            "_variance": self._variance,
+            "_lastupdate": self._lastupdate,
+            "_day": self._day,
+            "_sunrise": self._sunrise,
+            "_sunset": self._sunset,
+            "_toy": self._toy,
+            "mooncycle": self.mooncycle,
+            "moonupdate": self.moonupdate
+        }
+        driver.save_object(filename, data)
 
     def restore_object(self, filename: str):
         """Placeholder for restoring state."""